@@ -1,4 +1,10 @@
-"""Validated, idempotent multipart publication of posts with local assets."""
+"""Validated, idempotent multipart publication of posts with local assets.
+
+Sync packages (``post.sync``) let clients skip unchanged notes and assets:
+the server stores a ``source_hash`` of the post fields and asset digests, and
+an asset spec with ``"stored": true`` carries no upload part but reuses the
+existing media row with the same ``original_filename`` and ``sha256``.
+"""
 
 from __future__ import annotations
 
@@ -16,10 +22,11 @@ from django.utils import timezone
 from blog.content_import.obsidian import is_standalone_player_media_embed
 from blog.content_import.timecodes import time_to_seconds
 from blog.models import AuditLog, Category, Post, PostMedia, Series, Tag
+from blog.related import defer_related_refresh
 from blog.slug_utils import build_slug
 
 from .models import PublishPackage
-from .serializers import serialize_post
+from .serializers import serialize_near_duplicates, serialize_post
 
 logger = logging.getLogger("api.package_publish")
 
@@ -56,6 +63,14 @@ class PackageConflict(PackageError):
     """Safe conflict raised for reused keys or existing posts."""
 
 
+class PackageMissingAssets(PackageConflict):
+    """Stored asset references that the server cannot reuse; upload them."""
+
+    def __init__(self, asset_ids: list[str]):
+        self.asset_ids = asset_ids
+        super().__init__("stored assets are not available; upload them")
+
+
 @dataclass
 class ValidatedAsset:
     spec: dict
@@ -74,6 +89,17 @@ def canonical_package_hash(manifest: dict) -> str:
     return hashlib.sha256(encoded).hexdigest()
 
 
+def package_source_hash(post_data: dict, assets: list[ValidatedAsset]) -> str:
+    """Hash what the published post depends on, independent of upload mode."""
+    post = {key: value for key, value in post_data.items() if key not in {"replace", "sync"}}
+    digests = sorted(
+        (asset.spec["original_filename"], asset.spec["sha256"], sorted(asset.spec["roles"]), asset.spec["source_refs"])
+        for asset in assets
+    )
+    encoded = json.dumps([post, digests], sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
 def _safe_source_ref(value: object) -> str:
     if not isinstance(value, str) or not value or "\x00" in value:
         raise PackageError("asset source_refs must contain non-empty strings")
@@ -173,9 +199,12 @@ def validate_request(request, manifest: dict) -> tuple[dict, list[ValidatedAsset
         filename = spec.get("original_filename")
         roles = spec.get("roles", [])
         refs = spec.get("source_refs", [])
+        stored = spec.get("stored") is True
         if not isinstance(asset_id, str) or not ASSET_ID_RE.fullmatch(asset_id):
             raise PackageError("invalid asset id")
-        if part != f"asset_{asset_id}" or part in parts or asset_id in ids:
+        # Stored assets reuse server-side media and carry no upload part.
+        expected_part = None if stored else f"asset_{asset_id}"
+        if part != expected_part or part in parts or asset_id in ids:
             raise PackageError(f"asset {asset_id}: invalid or duplicate part")
         if not isinstance(filename, str) or PurePosixPath(filename).name != filename or "\\" in filename:
             raise PackageError(f"asset {asset_id}: original_filename must be a basename")
@@ -196,6 +225,15 @@ def validate_request(request, manifest: dict) -> tuple[dict, list[ValidatedAsset
                 role_counts[role] += 1
         if "cover" in roles and media_kind != "image":
             raise PackageError(f"asset {asset_id}: cover must be an image")
+        spec["media_kind"] = media_kind
+        if stored:
+            sha256 = spec.get("sha256")
+            if not isinstance(sha256, str) or not re.fullmatch(r"[0-9a-f]{64}", sha256):
+                raise PackageError(f"asset {asset_id}: stored asset requires sha256")
+            ids.add(asset_id)
+            names.add(name_key)
+            assets.append(ValidatedAsset(spec, None, extension, media_kind))
+            continue
         upload = request.FILES.get(part)
         if upload is None:
             raise PackageError(f"asset {asset_id}: upload part is missing")
@@ -219,7 +257,6 @@ def validate_request(request, manifest: dict) -> tuple[dict, list[ValidatedAsset
         declared_mime = spec.get("content_type") or getattr(upload, "content_type", "")
         if declared_mime and declared_mime != expected_mime:
             raise PackageError(f"asset {asset_id}: MIME type mismatch")
-        spec["media_kind"] = media_kind
         ids.add(asset_id)
         parts.add(part)
         names.add(name_key)
@@ -301,12 +338,56 @@ def _strip_primary_embed(content: str, primary: ValidatedAsset | None) -> str:
     return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
 
 
+def _find_existing_post(post_data: dict, slug: str, *, lock: bool = False):
+    queryset = Post.objects.select_for_update() if lock else Post.objects.all()
+    source_id = str(post_data.get("source_id") or "").strip() or None
+    existing = None
+    if source_id:
+        existing = queryset.filter(source_id=source_id, deleted_at__isnull=True).first()
+    if existing is None:
+        existing = queryset.filter(slug=slug, deleted_at__isnull=True).first()
+    return existing
+
+
+def _match_stored_assets(existing, assets: list[ValidatedAsset]) -> dict[str, int]:
+    """Return ``{asset id: PostMedia pk}`` for stored assets or raise with the missing ids."""
+    stored = [asset for asset in assets if asset.upload is None]
+    if not stored:
+        return {}
+    media_by_digest = {}
+    if existing is not None:
+        media_by_digest = {
+            (original_filename, sha256): pk
+            for pk, original_filename, sha256 in existing.media_files.exclude(sha256="").values_list(
+                "pk", "original_filename", "sha256"
+            )
+        }
+    matched = {}
+    missing = []
+    for asset in stored:
+        pk = media_by_digest.get((asset.spec["original_filename"], asset.spec["sha256"]))
+        if pk is None:
+            missing.append(asset.spec["id"])
+        else:
+            matched[asset.spec["id"]] = pk
+    if missing:
+        raise PackageMissingAssets(missing)
+    return matched
+
+
 def publish_validated_package(*, request, manifest: dict, post_data: dict, assets: list[ValidatedAsset], payload_hash: str):
     api_key = request.api_key
     idempotency_key = request.headers.get("Idempotency-Key", "").strip()
     if not IDEMPOTENCY_RE.fullmatch(idempotency_key):
         raise PackageError("valid Idempotency-Key header is required")
 
+    slug = str(post_data.get("slug") or "").strip() or build_slug(post_data["title"], fallback="post")
+    source_hash = package_source_hash(post_data, assets)
+    current = _find_existing_post(post_data, slug)
+    if post_data.get("sync") and current is not None and current.source_hash == source_hash:
+        return {**serialize_post(current), "unchanged": True}, 200
+    kept_by_id = _match_stored_assets(current, assets)
+
     try:
         with transaction.atomic():
             package, created = PublishPackage.objects.select_for_update().get_or_create(
@@ -324,12 +405,12 @@ def publish_validated_package(*, request, manifest: dict, post_data: dict, asset
             return package.response, 200
         raise PackageConflict("package with this idempotency key is already pending or failed")
 
-    slug = str(post_data.get("slug") or "").strip() or build_slug(post_data["title"], fallback="post")
     storage = PostMedia._meta.get_field("file").storage
+    uploads = [asset for asset in assets if asset.upload is not None]
     stored_names: list[str] = []
     old_names: list[str] = []
     try:
-        for asset in assets:
+        for asset in uploads:
             desired = f"posts/{slug}/packages/{idempotency_key}/{asset.spec['id']}{asset.extension}"
             actual = storage.save(desired, asset.upload)
             if actual != desired:
@@ -338,16 +419,14 @@ def publish_validated_package(*, request, manifest: dict, post_data: dict, asset
         package.storage_names = stored_names
         package.save(update_fields=["storage_names", "updated_at"])
 
-        with transaction.atomic():
+        with transaction.atomic(), defer_related_refresh():
             source_id = str(post_data.get("source_id") or "").strip() or None
-            existing = None
-            if source_id:
-                existing = Post.objects.select_for_update().filter(source_id=source_id, deleted_at__isnull=True).first()
-            if existing is None:
-                existing = Post.objects.select_for_update().filter(slug=slug, deleted_at__isnull=True).first()
-            replace = bool(post_data.get("replace")) or bool(source_id and existing)
+            existing = _find_existing_post(post_data, slug, lock=True)
+            replace = bool(post_data.get("replace") or post_data.get("sync")) or bool(source_id and existing)
             if existing and not replace:
                 raise PackageConflict(f"post with slug '{slug}' already exists; use replace=true")
+            if kept_by_id and (existing is None or current is None or existing.pk != current.pk):
+                raise PackageConflict("stored assets changed concurrently; retry")
 
             category_name = str(post_data.get("category") or "").strip()
             series_name = str(post_data.get("series") or "").strip()
@@ -368,44 +447,61 @@ def publish_validated_package(*, request, manifest: dict, post_data: dict, asset
                 "series": series,
                 "series_order": int(post_data.get("series_order", 0) or 0),
                 "source_id": source_id,
+                "source_hash": source_hash,
                 "deleted_at": None,
             }
             if existing:
                 post = existing
+                body_changed = post.content != content
                 for name, value in fields.items():
                     setattr(post, name, value)
-                for media in post.media_files.all():
-                    old_names.extend(name for name in (media.file.name, media.thumbnail_og.name, media.thumbnail_card.name) if name)
-                post.media_files.all().delete()
-                post.save()
+                kept_pks = set(kept_by_id.values())
+                if post.media_files.filter(pk__in=kept_pks).count() != len(kept_pks):
+                    raise PackageConflict("stored assets changed concurrently; retry")
+                replaced_media = post.media_files.exclude(pk__in=kept_pks).prefetch_related("derivatives")
+                for media in replaced_media:
+                    old_names.extend(media.stored_names)
+                media_changed = bool(uploads or old_names)
+                replaced_media.delete()
+                # Content is written (and rendered) once, after media rows exist.
+                post.save(update_fields=[name for name in fields if name != "content"] + ["updated_at"])
                 action = AuditLog.Action.UPDATED
             else:
-                post = Post.objects.create(**fields)
+                post = Post.objects.create(**{**fields, "content": ""})
+                body_changed = media_changed = True
                 action = AuditLog.Action.PUBLISHED
 
-            asset_storage_names = list(stored_names)
             storage_by_id = {
                 asset.spec["id"]: storage_name
-                for asset, storage_name in zip(assets, asset_storage_names, strict=True)
+                for asset, storage_name in zip(uploads, list(stored_names), strict=True)
             }
-            ordered_assets = sorted(
-                assets,
+            ordered_uploads = sorted(
+                uploads,
                 key=lambda asset: (
                     0 if "cover" in asset.spec["roles"] else 1 if "primary" in asset.spec["roles"] else 2,
                     asset.spec["id"],
                 ),
             )
-            for asset in ordered_assets:
+            for asset in ordered_uploads:
                 storage_name = storage_by_id[asset.spec["id"]]
                 media = PostMedia.objects.create(
                     post=post,
                     file=storage_name,
                     original_filename=asset.spec["original_filename"],
+                    sha256=asset.spec["sha256"],
                 )
-                stored_names.extend(name for name in (media.thumbnail_og.name, media.thumbnail_card.name) if name)
+                if "cover" in asset.spec["roles"] and kept_by_id:
+                    media.order_first()
+                stored_names.extend(name for name in media.stored_names if name != storage_name)
+            # ``order_first`` moves rows with QuerySet.update; settle the pointers
+            # before the full save below writes this instance back.
+            Post.refresh_media_pointers([post.pk], instances=[post])
             post.content = content
             post.status = Post.Status.DRAFT if post_data.get("status") == "draft" else Post.Status.PUBLISHED
-            post.save()
+            if body_changed or media_changed:
+                post.save()
+            else:
+                post.save(update_fields=["status", "published_at", "updated_at"])
             tag_names = post_data.get("tags") or []
             if not isinstance(tag_names, list):
                 raise PackageError("post tags must be a list")
@@ -416,7 +512,7 @@ def publish_validated_package(*, request, manifest: dict, post_data: dict, asset
                 api_key=api_key,
                 detail={"source_id": source_id, "content_type": post.content_type, "package_id": package.pk, "asset_count": len(assets)},
             )
-            response = serialize_post(post)
+            response = {**serialize_post(post), "near_duplicates": serialize_near_duplicates(post)}
             package.post = post
             package.state = PublishPackage.State.DONE
             package.storage_names = stored_names
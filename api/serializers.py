@@ -1,6 +1,7 @@
 """Response serialization helpers for API endpoints."""
 
 from blog.models import Post
+from blog.similarity import find_near_duplicates
 
 
 def _base_post_dict(post: Post) -> dict:
@@ -11,6 +12,10 @@ def _base_post_dict(post: Post) -> dict:
         "title": post.title,
         "slug": post.slug,
         "description": post.description,
+        "excerpt": post.plain_text_excerpt,
+        "word_count": post.word_count,
+        "reading_time": post.reading_time,
+        "heading_count": post.heading_count,
         "content_type": post.content_type,
         "status": post.status,
         "media_url": post.media_url,
@@ -36,3 +41,11 @@ def serialize_post(post: Post) -> dict:
 def serialize_post_list_item(post: Post) -> dict:
     """Compact serializer for post list endpoints."""
     return _base_post_dict(post)
+
+
+def serialize_near_duplicates(post: Post) -> list[dict]:
+    """Published posts whose text nearly matches ``post`` — a warning for publishers."""
+    return [
+        {"slug": other.slug, "title": other.title, "score": score}
+        for other, score in find_near_duplicates(post.title, post.content, exclude=[post.pk])
+    ]
@@ -188,3 +188,48 @@ def test_api_e2e_publish_list_detail_unpublish_delete(api_client):
     )
     assert delete.status_code == 204
     assert not Post.objects.filter(slug=slug, deleted_at__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_api_list_posts_filters_and_sorts_by_reading_time(api_client):
+    client, key = api_client
+    Post.objects.create(title="Short", description="S", content="word " * 10, slug="short")
+    Post.objects.create(title="Long", description="L", content="word " * 900, slug="long")
+
+    response = client.get(
+        "/api/v1/posts/?min_reading_time=2&sort=-reading_time",
+        HTTP_AUTHORIZATION="Bearer " + key.token,
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["slug"] for item in results] == ["long"]
+    assert results[0]["reading_time"] == 5
+    assert results[0]["word_count"] == 900
+
+    response = client.get("/api/v1/posts/?max_reading_time=x", HTTP_AUTHORIZATION="Bearer " + key.token)
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_api_publish_reports_near_duplicates(api_client):
+    client, key = api_client
+    body = "Кэширование Django шаблонов через fragment cache ускоряет ленту постов и карточки. " * 5
+    original = Post.objects.create(
+        title="Кэширование шаблонов", description="d", content=body, status=Post.Status.PUBLISHED
+    )
+    Post.objects.create(
+        title="Рецепт борща", description="d", content="Свекла, капуста и сметана. " * 5, status=Post.Status.PUBLISHED
+    )
+
+    publish = client.post(
+        "/api/v1/posts/publish/",
+        data=json.dumps({"title": "Кэширование шаблонов", "description": "copy", "content": body, "slug": "copy"}),
+        content_type="application/json",
+        HTTP_AUTHORIZATION="Bearer " + key.token,
+    )
+
+    assert publish.status_code == 201
+    duplicates = json.loads(publish.content)["near_duplicates"]
+    assert [item["slug"] for item in duplicates] == [original.slug]
+    assert duplicates[0]["score"] >= 0.9
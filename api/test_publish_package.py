@@ -12,6 +12,7 @@ from PIL import Image
 
 from api.models import ApiKey, PublishPackage
 from blog.models import AuditLog, Post, PostMedia
+from publisher.cli import main as publisher_main
 from publisher.client import publish_package as client_publish_package
 from publisher.package import build_publish_package
 from publisher.parser import parse_markdown_file
@@ -320,3 +321,57 @@ def test_replace_stays_committed_when_old_storage_cleanup_fails(tmp_path, settin
     assert PublishPackage.objects.get(
         idempotency_key="replace-cleanup-new"
     ).state == PublishPackage.State.DONE
+
+
+@pytest.mark.django_db
+def test_publisher_sync_skips_unchanged_note_and_uploads_only_changed_assets(tmp_path, settings, live_server, capsys):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    key = ApiKey.objects.create(name="Sync Agent")
+    note = tmp_path / "note.md"
+    (tmp_path / "cover.png").write_bytes(png_bytes())
+    (tmp_path / "diagram.png").write_bytes(png_bytes())
+    note.write_text(
+        "---\ntitle: Sync Note\ndescription: synced\ncover: cover.png\n---\nBody\n\n![[diagram.png]]\n",
+        encoding="utf-8",
+    )
+    argv = ["publish", str(note), "--url", live_server.url, "--key", key.token, "--sync"]
+
+    assert publisher_main(argv) == 0
+    post = Post.objects.get(slug="sync-note")
+    cover = post.media_files.get(original_filename="cover.png")
+    diagram = post.media_files.get(original_filename="diagram.png")
+    assert len(post.source_hash) == 64 and cover.sha256 == hashlib.sha256(png_bytes()).hexdigest()
+
+    assert publisher_main(argv) == 0
+    assert "= Unchanged: Sync Note" in capsys.readouterr().out
+    assert PublishPackage.objects.filter(state=PublishPackage.State.DONE).count() == 1
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), "blue").save(buffer, format="PNG")
+    (tmp_path / "diagram.png").write_bytes(buffer.getvalue())
+    assert publisher_main(argv) == 0
+    done = PublishPackage.objects.filter(state=PublishPackage.State.DONE).order_by("pk").last()
+    assert [name for name in done.storage_names if "/packages/" in name] == [new_name := done.storage_names[0]]
+    post.refresh_from_db()
+    assert post.media_files.get(original_filename="cover.png").pk == cover.pk
+    new_diagram = post.media_files.get(original_filename="diagram.png")
+    assert new_diagram.pk != diagram.pk and new_diagram.file.name == new_name
+    assert post.cover_media.pk == cover.pk
+    assert new_diagram.file.url in post.content_html
+
+
+@pytest.mark.django_db
+def test_publish_package_reports_missing_stored_assets(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    key = ApiKey.objects.create(name="Stored Agent")
+    spec = {**asset_spec(png_bytes()), "stored": True}
+    spec.pop("part")
+    manifest = package_manifest(
+        {"title": "Stored", "description": "d", "content": "![[cover.png]]", "sync": True}, [spec]
+    )
+
+    response = post_package(Client(), key, manifest, {})
+
+    assert response.status_code == 409
+    assert response.json()["missing_assets"] == ["a001"]
+    assert not PublishPackage.objects.exists()
@@ -153,10 +153,14 @@ def test_cli_live_http_article_assets_idempotency_and_secure_social_contract(
         assert structured["url"] == canonical
         assert structured["image"] == meta["og:image"]
 
-        sitemap = secure.get("/sitemap.xml", secure=True, HTTP_HOST="blog.example")
+        index = secure.get("/sitemap.xml", secure=True, HTTP_HOST="blog.example")
+        section_url = f"https://blog.example/sitemap-posts-{post.content_type}.xml"
+        sitemap = secure.get(section_url, secure=True, HTTP_HOST="blog.example")
         robots = secure.get("/robots.txt", secure=True, HTTP_HOST="blog.example")
-        assert sitemap.status_code == robots.status_code == 200
+        assert index.status_code == sitemap.status_code == robots.status_code == 200
+        assert section_url in index.content.decode()
         assert canonical in sitemap.content.decode()
+        assert "<image:loc>https://blog.example/media/" in sitemap.content.decode()
         assert "Sitemap: https://blog.example/sitemap.xml" in robots.content.decode()
 
 
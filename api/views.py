@@ -13,17 +13,19 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST
 
 from blog.models import AuditLog, Category, Post, PostView, Series, Tag
+from blog.related import defer_related_refresh
 from blog.slug_utils import build_slug
 
 from .decorators import require_api_key
 from .package_publish import (
     PackageConflict,
     PackageError,
+    PackageMissingAssets,
     parse_manifest,
     publish_validated_package,
     validate_request,
 )
-from .serializers import serialize_post, serialize_post_list_item
+from .serializers import serialize_near_duplicates, serialize_post, serialize_post_list_item
 
 logger = logging.getLogger("api.views")
 
@@ -39,6 +41,8 @@ VALID_SORT_FIELDS = {
     "-view_count",
     "published_at",
     "-published_at",
+    "reading_time",
+    "-reading_time",
 }
 
 # Timecode format: M:SS, MM:SS, H:MM:SS, HH:MM:SS
@@ -221,7 +225,7 @@ def publish_post(request):
     }
     content_type_value = type_aliases.get(content_type, Post.ContentType.ARTICLE)
 
-    with transaction.atomic():
+    with transaction.atomic(), defer_related_refresh():
         post = Post.objects.create(
             title=title,
             description=description,
@@ -258,7 +262,7 @@ def publish_post(request):
         },
     )
 
-    return JsonResponse(serialize_post(post), status=201)
+    return JsonResponse({**serialize_post(post), "near_duplicates": serialize_near_duplicates(post)}, status=201)
 
 
 @csrf_exempt
@@ -278,6 +282,8 @@ def publish_package(request):
             assets=assets,
             payload_hash=payload_hash,
         )
+    except PackageMissingAssets as exc:
+        return JsonResponse({"error": str(exc), "missing_assets": exc.asset_ids}, status=409)
     except PackageConflict as exc:
         return JsonResponse({"error": str(exc)}, status=409)
     except PackageError as exc:
@@ -490,6 +496,14 @@ def list_posts(request):
             | Q(content__icontains=search)
         )
 
+    for param, lookup in (("min_reading_time", "reading_time__gte"), ("max_reading_time", "reading_time__lte")):
+        value = (request.GET.get(param) or "").strip()
+        if not value:
+            continue
+        if not value.isdigit():
+            return JsonResponse({"error": f"{param} must be a non-negative integer"}, status=400)
+        posts = posts.filter(**{lookup: int(value)})
+
     # Sort parameter
     sort = (request.GET.get("sort") or "-created_at").strip()
     if sort not in VALID_SORT_FIELDS:
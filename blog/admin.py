@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from unfold.admin import ModelAdmin
 from unfold.decorators import display
@@ -11,7 +12,13 @@ from .models import (
     Series,
     SessionPostInteraction,
     Tag,
+    ThumbnailJob,
 )
+from .media_urls import media_url
+from .pagination import invalidate_post_counts
+from .related import refresh_related_posts
+from .series import refresh_series_positions
+from .taxonomy import invalidate_taxonomy
 
 
 class PostMediaInline(admin.TabularInline):
@@ -48,10 +55,10 @@ class PostMediaInline(admin.TabularInline):
         if obj.media_type == PostMedia.MediaType.IMAGE:
             return format_html(
                 '<img src="{}" alt="{}" style="max-width: 160px; max-height: 90px; object-fit: contain;" />',
-                obj.file.url,
+                media_url(obj.file),
                 obj.original_filename,
             )
-        return format_html('<a href="{}" target="_blank">{}</a>', obj.file.url, obj.original_filename)
+        return format_html('<a href="{}" target="_blank">{}</a>', media_url(obj.file), obj.original_filename)
 
 
 @admin.register(Category)
@@ -74,9 +81,12 @@ class SeriesAdmin(ModelAdmin):
     search_fields = ("name", "description")
     prepopulated_fields = {"slug": ("name",)}
 
-    @display(description="Постов")
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(post_total=Count("posts"))
+
+    @display(description="Постов", ordering="post_total")
     def post_count(self, obj):
-        return obj.posts.count()
+        return obj.post_total
 
 
 @admin.register(PostMedia)
@@ -87,6 +97,14 @@ class PostMediaAdmin(ModelAdmin):
     readonly_fields = ("original_filename", "file_slug", "media_type", "created_at")
 
 
+@admin.register(ThumbnailJob)
+class ThumbnailJobAdmin(ModelAdmin):
+    list_display = ("media", "state", "attempts", "last_error", "updated_at")
+    list_filter = ("state",)
+    search_fields = ("media__original_filename", "media__post__title")
+    readonly_fields = ("media", "attempts", "last_error", "created_at", "updated_at")
+
+
 @admin.register(SessionPostInteraction)
 class SessionPostInteractionAdmin(ModelAdmin):
     list_display = ("session_key", "post", "viewed_at", "liked_at", "updated_at")
@@ -135,11 +153,25 @@ class PostAdmin(ModelAdmin):
 
     @admin.action(description="Перевести в черновики")
     def unpublish_posts(self, request, queryset):
+        # Read before the update: a changelist filtered by status matches nothing after it.
+        pks = list(queryset.values_list("pk", flat=True))
+        series_ids = list(queryset.values_list("series_id", flat=True))
         queryset.update(status=Post.Status.DRAFT)
+        invalidate_taxonomy()
+        invalidate_post_counts()
+        refresh_related_posts(pks)
+        refresh_series_positions(series_ids)
 
     @admin.action(description="В архив")
     def archive_posts(self, request, queryset):
+        # Read before the update: a changelist filtered by status matches nothing after it.
+        pks = list(queryset.values_list("pk", flat=True))
+        series_ids = list(queryset.values_list("series_id", flat=True))
         queryset.update(status=Post.Status.ARCHIVED)
+        invalidate_taxonomy()
+        invalidate_post_counts()
+        refresh_related_posts(pks)
+        refresh_series_positions(series_ids)
 
     @admin.action(description="Отметить как рекомендуемые")
     def feature_posts(self, request, queryset):
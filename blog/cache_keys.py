@@ -0,0 +1,76 @@
+"""Namespaced cache keys with shared version counters.
+
+Every cached artefact of the blog lives in a namespace (``NAMESPACES``) and
+its key carries the current version of that namespace::
+
+    blog:<namespace>:<version>:<parts...>
+
+Retiring a whole namespace is one ``incr`` of its counter instead of finding
+and deleting keys, and because the counter lives in the configured cache
+(``CACHES``), a bump from one Gunicorn worker or a management command is seen
+by every other worker on the next read. Old entries are never read again and
+age out with their timeouts.
+
+A lost counter (eviction, restart of the cache service, ``cache.clear()``) is
+recreated from the clock, not from ``0``, so it can never coincide with a
+version that is still cached under old keys.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.core.cache import cache
+
+NAMESPACES = (
+    "post_html",
+    "post_card",
+    "post_count",
+    "series_toc",
+    "taxonomy",
+    "feed",
+    "sitemap",
+    "media_url",
+)
+
+
+def _version_key(namespace: str) -> str:
+    if namespace not in NAMESPACES:
+        raise ValueError(f"Unknown cache namespace: {namespace}")
+    return f"blog:{namespace}:version"
+
+
+def _fresh_version() -> int:
+    return time.time_ns() // 1000
+
+
+def namespace_versions(*namespaces: str) -> dict[str, int]:
+    """Current versions of ``namespaces`` (all by default) with one ``get_many``."""
+    namespaces = namespaces or NAMESPACES
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    for key in keys.keys() - found.keys():
+        cache.add(key, _fresh_version(), None)
+        found[key] = cache.get(key)
+    return {namespace: found[key] for key, namespace in keys.items()}
+
+
+def namespace_version(namespace: str) -> int:
+    return namespace_versions(namespace)[namespace]
+
+
+def versioned_key(namespace: str, *parts, version: int | None = None) -> str:
+    """Key of ``parts`` under the current (or given) version of ``namespace``."""
+    if version is None:
+        version = namespace_version(namespace)
+    return ":".join(str(part) for part in ("blog", namespace, version, *parts))
+
+
+def bump_namespace(*namespaces: str) -> None:
+    """Retire every key of ``namespaces`` at once, in every worker."""
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _fresh_version(), None)
@@ -0,0 +1,98 @@
+"""Fragment cache for post cards on the public list.
+
+A card re-evaluated its tag loop, labels, URL reversing and cover thumbnail
+URL (a signing round for S3 with ``querystring_auth``) on every request.
+``render_post_cards`` reads the cards of a page with one ``get_many`` and
+renders only the misses through the ``post_card`` component.
+
+The key is ``(post.pk, post.updated_at, cover_media_id, origin, render
+version)``. View and like counters change on every visit, so instead of
+bucketing them into the key the cached markup keeps ``STATS_MARKER`` and the
+live stats line is spliced in per request: counters stay exact and a view
+does not evict the card.
+
+With signed media URLs a card lives no longer than the cover URL inside it
+(``blog.media_urls.embeddable_timeout``).
+
+Writes that change a card without touching ``Post.updated_at`` — category and
+tag edits, tag assignment, thumbnail generation — retire every card at once
+by bumping the ``post_card`` namespace (see ``blog.signals``).
+"""
+
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.utils.html import format_html
+from django.utils.safestring import SafeString, mark_safe
+
+from .cache_keys import bump_namespace, namespace_version, versioned_key
+from .media_urls import embeddable_timeout, prime_media_urls
+
+# Bump when the card markup changes so cached fragments are not reused.
+CARD_RENDER_VERSION = 1
+CARD_CACHE_TIMEOUT = 24 * 60 * 60
+STATS_MARKER = mark_safe("<!--post-card-stats-->")
+
+
+def render_card_stats(post) -> SafeString:
+    reading_time = (
+        format_html('<span><i class="bi bi-clock"></i> {}</span>', post.reading_time_label)
+        if post.reading_time
+        else ""
+    )
+    return format_html(
+        '<span><i class="bi bi-eye"></i> {}</span>\n'
+        '        <span><i class="bi bi-heart"></i> {}</span>\n'
+        "        {}",
+        post.view_count_label,
+        post.like_count_label,
+        reading_time,
+    )
+
+
+def render_post_cards(request, posts) -> list[SafeString]:
+    """Return card HTML for ``posts`` in order, rendering only cache misses."""
+    from .components.post_card.post_card import PostCard  # imports this module
+
+    posts = list(posts)
+    version = namespace_version("post_card")
+    origin = f"{request.scheme}://{request.get_host()}"
+    keys = {
+        post.pk: versioned_key(
+            "post_card",
+            CARD_RENDER_VERSION,
+            post.pk,
+            post.updated_at.timestamp(),
+            post.cover_media_id,
+            origin,
+            version=version,
+        )
+        for post in posts
+    }
+    cached = cache.get_many(list(keys.values()))
+    misses = [post for post in posts if keys[post.pk] not in cached]
+    if misses:
+        prefetch_related_objects(misses, "tags")
+        covers = [post.cover_media for post in misses if post.cover_media]
+        prime_media_urls(media.thumbnail_card or media.file for media in covers)
+        rendered = {
+            keys[post.pk]: str(
+                PostCard.render(
+                    kwargs={"post": post, "stats_html": STATS_MARKER},
+                    request=request,
+                    # Keep the dependency markers: the page render collects
+                    # the card CSS from them on hits as well as misses.
+                    deps_strategy="ignore",
+                )
+            )
+            for post in misses
+        }
+        cache.set_many(rendered, embeddable_timeout(CARD_CACHE_TIMEOUT))
+        cached.update(rendered)
+    return [mark_safe(cached[keys[post.pk]].replace(STATS_MARKER, render_card_stats(post))) for post in posts]
+
+
+def invalidate_post_cards() -> None:
+    """Retire every cached card at once by bumping the key version."""
+    bump_namespace("post_card")
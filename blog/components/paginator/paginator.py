@@ -7,7 +7,7 @@ SEO-friendly компонент пагинации с поддержкой HTMX.
     {% component "paginator" page_obj=page_obj filter_params=filter_params %}
 
 Параметры:
-    - page_obj: Django Paginator page object
+    - page_obj: Django Paginator page object (``next_cursor`` — курсор догрузки)
     - filter_params: текущий QueryDict фильтров
     - show_load_more: показывать кнопку "Загрузить еще" (по умолчанию True)
 """
@@ -66,6 +66,8 @@ class Paginator(Component):
             if page_obj.has_previous()
             else None,
             "next_page": next_page,
+            # Keyset cursor for "Загрузить еще" (см. blog/pagination.py).
+            "next_cursor": getattr(page_obj, "next_cursor", None),
         }
 
     class Media:
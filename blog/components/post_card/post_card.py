@@ -5,10 +5,16 @@ PostCard Component
 
 Использование:
     {% component "post_card" post=post %}
+
+Список постов рендерит карточки через ``blog.card_cache``: он передаёт
+``stats_html=STATS_MARKER`` и подставляет живые счётчики в закэшированную
+разметку.
 """
 
 from django_components import Component, register
 
+from blog.card_cache import render_card_stats
+
 
 @register("post_card")
 class PostCard(Component):
@@ -20,6 +26,7 @@ class PostCard(Component):
 
         Args:
             post (Post): Объект поста из модели
+            stats_html (str): Готовая строка статистики (по умолчанию — живые счётчики)
         """
         post = kwargs.get("post")
 
@@ -28,6 +35,7 @@ class PostCard(Component):
 
         return {
             "post": post,
+            "stats_html": kwargs.get("stats_html") or render_card_stats(post),
         }
 
     class Media:
@@ -1,9 +1,19 @@
-"""Content import helpers for Markdown/Obsidian notes."""
+"""Content import helpers for Markdown/Obsidian notes.
 
-from .frontmatter import split_frontmatter
-from .media_links import collect_broken_local_links, collect_local_media_references
-from .media_bundle import collect_note_media_bundle
-from .timecodes import extract_timecode_blocks, parse_timecodes
+Submodules load on first use: ``blog.models`` imports the tokenizer and
+timecodes from here, and every ``manage.py`` run imports ``blog.models``.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "collect_broken_local_links": ".media_links",
+    "collect_local_media_references": ".media_links",
+    "collect_note_media_bundle": ".media_bundle",
+    "extract_timecode_blocks": ".timecodes",
+    "parse_timecodes": ".timecodes",
+    "split_frontmatter": ".frontmatter",
+}
 
 __all__ = [
     "collect_broken_local_links",
@@ -13,3 +23,11 @@ __all__ = [
     "parse_timecodes",
     "split_frontmatter",
 ]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,131 @@
+"""Copy-free placement of local asset files.
+
+Importing a vault used to copy every asset twice (into the bundle folder and
+again into ``MEDIA_ROOT``). When source and destination share a filesystem the
+bytes do not need to move at all:
+
+- ``link`` — ``os.link`` hard link (same inode; an in-place edit of the source
+  also changes the stored copy), then reflink, then a kernel copy;
+- ``reflink`` — ``FICLONE`` copy-on-write clone (btrfs, XFS, bcachefs…), then a
+  kernel copy;
+- ``copy`` — a kernel copy only.
+
+The kernel copy uses ``copy_file_range`` (which may itself clone or do a
+server-side copy on NFS), then ``sendfile``, then a plain read/write loop.
+Every function returns the method that actually placed the file, so callers
+can report it per asset.
+
+This module has no Django dependencies.
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+LINK_MODES = ("copy", "reflink", "link")
+# _IOW(0x94, 9, int) from linux/fs.h
+FICLONE = 0x40049409
+CHUNK_SIZE = 64 * 1024 * 1024
+# Errors meaning "this fast path is unavailable here", not a broken file.
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTTY,
+    errno.EBADF,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EMLINK,
+}
+
+
+def transfer_file(source: Path, destination: Path, *, mode: str = "copy") -> str:
+    """Place ``source`` at the new path ``destination`` without moving bytes if possible.
+
+    ``destination`` must not exist (``FileExistsError`` otherwise), so callers
+    can pick another name without racing. Metadata is copied like
+    ``shutil.copy2`` unless the file was hard-linked.
+
+    Returns:
+        ``"hardlink"``, ``"reflink"``, ``"copy_file_range"``, ``"sendfile"`` or
+        ``"copy"``.
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {mode!r}")
+    if mode == "link":
+        try:
+            os.link(source, destination)
+            return "hardlink"
+        except OSError as exc:
+            if exc.errno not in _UNSUPPORTED:
+                raise
+
+    with open(source, "rb") as source_file, open(destination, "xb") as destination_file:
+        try:
+            method = None
+            if mode in {"link", "reflink"}:
+                method = _clone(source_file, destination_file)
+            if method is None:
+                method = _kernel_copy(source_file, destination_file)
+        except BaseException:
+            destination_file.close()
+            os.unlink(destination)
+            raise
+    shutil.copystat(source, destination)
+    return method
+
+
+def _clone(source_file, destination_file) -> str | None:
+    if fcntl is None:
+        return None
+    try:
+        fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+    except OSError as exc:
+        if exc.errno not in _UNSUPPORTED:
+            raise
+        return None
+    return "reflink"
+
+
+def _kernel_copy(source_file, destination_file) -> str:
+    source_fd = source_file.fileno()
+    destination_fd = destination_file.fileno()
+    size = os.fstat(source_fd).st_size
+    for method, copy_chunk in (
+        ("copy_file_range", getattr(os, "copy_file_range", None)),
+        ("sendfile", _sendfile_chunk if hasattr(os, "sendfile") else None),
+    ):
+        if copy_chunk is None:
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                copied = copy_chunk(source_fd, destination_fd, min(CHUNK_SIZE, size - offset))
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError as exc:
+            # Only fall back before anything was written; a failure halfway
+            # through is a real I/O error.
+            if offset or exc.errno not in _UNSUPPORTED:
+                raise
+            continue
+        if offset == size:
+            return method
+        raise OSError(errno.EIO, f"short {method} copy", str(source_file.name))
+    shutil.copyfileobj(source_file, destination_file, CHUNK_SIZE)
+    return "copy"
+
+
+def _sendfile_chunk(source_fd: int, destination_fd: int, count: int) -> int:
+    # ``offset=None`` advances the source file position like copy_file_range.
+    return os.sendfile(destination_fd, source_fd, None, count)
@@ -2,17 +2,16 @@
 
 from __future__ import annotations
 
-import re
 import shutil
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
 from urllib.parse import unquote
 
+from blog.content_import.file_transfer import transfer_file
 from blog.content_import.frontmatter import split_frontmatter
+from blog.content_import.markdown_tokens import MEDIA_KINDS, tokenize
 from blog.content_import.media_links import is_external_or_absolute, iter_local_document_targets
-
-OBSIDIAN_EMBED_RE = re.compile(r"!\[\[([^\]|]+)(?:\|[^\]]+)?\]\]")
-MARKDOWN_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
+from blog.content_import.vault_index import get_vault_index, vault_index_run
 
 
 @dataclass(frozen=True)
@@ -22,6 +21,7 @@ class BundleItem:
     source_name: str
     source_path: Path
     copied_path: Path
+    method: str = "copy"
 
 
 @dataclass(frozen=True)
@@ -34,6 +34,7 @@ class BundleResult:
     missing: list[str]
 
 
+@vault_index_run()
 def collect_note_media_bundle(
     note_path: Path,
     output_dir: Path,
@@ -43,12 +44,18 @@ def collect_note_media_bundle(
     clean: bool = False,
     title: str | None = None,
     description: str | None = None,
+    index_cache: Path | None = None,
+    link_mode: str = "copy",
 ) -> BundleResult:
     """Copy all local image/media references from a note into ``output_dir``.
 
     Supports Obsidian embeds such as ``![[999_files/img.webp|500]]`` and standard
     Markdown images such as ``![Alt](../media/img.webp)``. The output directory is
     intentionally flat so it can be passed to ``import_obsidian_note --assets-dir``.
+    Basename fallbacks use one shared vault index (optionally persisted to
+    ``index_cache``) instead of walking the vault for every target.
+    ``link_mode`` selects hard links/reflinks over copies (see
+    ``file_transfer``); each item records the method used.
     """
 
     note_path = Path(note_path).expanduser().resolve()
@@ -73,7 +80,9 @@ def collect_note_media_bundle(
         iter_local_document_targets(markdown_body)
     )
     for target in targets:
-        source_path = resolve_media_target(target, note_path=note_path, vault_root=vault_root)
+        source_path = resolve_media_target(
+            target, note_path=note_path, vault_root=vault_root, index_cache=index_cache
+        )
         if source_path is None:
             missing.append(target)
             continue
@@ -81,8 +90,11 @@ def collect_note_media_bundle(
             continue
         copied_sources.add(source_path)
         copied_path = output_dir / unique_filename(source_path.name, used_names)
-        shutil.copy2(source_path, copied_path)
-        copied.append(BundleItem(source_name=target, source_path=source_path, copied_path=copied_path))
+        copied_path.unlink(missing_ok=True)
+        method = transfer_file(source_path, copied_path, mode=link_mode)
+        copied.append(
+            BundleItem(source_name=target, source_path=source_path, copied_path=copied_path, method=method)
+        )
 
     bundled_note_path = None
     if copy_note:
@@ -98,19 +110,11 @@ def collect_note_media_bundle(
 def iter_media_targets_for_bundle(markdown_text: str):
     """Yield local media targets with relative path parts preserved."""
 
-    matches: list[tuple[int, str]] = []
-    for match in OBSIDIAN_EMBED_RE.finditer(markdown_text):
-        target = normalize_bundle_target(match.group(1))
-        if target and not is_external_or_absolute(target):
-            matches.append((match.start(), target))
-    for match in MARKDOWN_IMAGE_RE.finditer(markdown_text):
-        raw_target = match.group(2).strip().strip("<>")
-        target = normalize_bundle_target(raw_target)
-        if target and not is_external_or_absolute(target):
-            matches.append((match.start(), target))
-
     seen: set[str] = set()
-    for _position, target in sorted(matches, key=lambda item: item[0]):
+    for token in tokenize(markdown_text).of(*MEDIA_KINDS):
+        target = normalize_bundle_target(token.target)
+        if not target or is_external_or_absolute(target):
+            continue
         key = target.casefold()
         if key in seen:
             continue
@@ -126,8 +130,18 @@ def normalize_bundle_target(target: str) -> str:
     return target.replace("\\", "/")
 
 
-def resolve_media_target(target: str, *, note_path: Path, vault_root: Path | None = None) -> Path | None:
-    """Resolve a target from note-relative, vault-relative, or basename lookup."""
+def resolve_media_target(
+    target: str,
+    *,
+    note_path: Path,
+    vault_root: Path | None = None,
+    index_cache: Path | None = None,
+) -> Path | None:
+    """Resolve a target from note-relative, vault-relative, or basename lookup.
+
+    Basename lookup prefers files under the note directory, then the vault,
+    in sorted path order.
+    """
 
     target_path = PurePosixPath(target)
     candidates: list[Path] = []
@@ -140,16 +154,23 @@ def resolve_media_target(target: str, *, note_path: Path, vault_root: Path | Non
         if candidate.exists() and candidate.is_file():
             return candidate
 
-    names = {target_path.name.casefold(), target_path.stem.casefold()}
-    search_roots = [note_path.parent]
+    names = (target_path.name, target_path.stem)
+    note_dir = note_path.parent
+    if vault_root is not None:
+        vault_root = Path(vault_root).expanduser().resolve()
+        if vault_root.is_dir() and note_dir.is_relative_to(vault_root):
+            found = get_vault_index(vault_root, cache_path=index_cache).lookup(*names, prefer=note_dir)
+            return found.resolve() if found else None
+
+    search_roots = [(note_dir, None)]
     if vault_root is not None:
-        search_roots.append(Path(vault_root).expanduser().resolve())
-    for root in search_roots:
-        if not root.exists():
+        search_roots.append((vault_root, index_cache))
+    for root, cache_path in search_roots:
+        if not root.is_dir():
             continue
-        for path in sorted(root.rglob("*")):
-            if path.is_file() and (path.name.casefold() in names or path.stem.casefold() in names):
-                return path.resolve()
+        found = get_vault_index(root, cache_path=cache_path).lookup(*names)
+        if found is not None:
+            return found.resolve()
     return None
 
 
@@ -2,15 +2,12 @@
 
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
 from urllib.parse import unquote, urlparse
 
-OBSIDIAN_EMBED_RE = re.compile(r"!\[\[([^\]|]+)(?:\|[^\]]+)?\]\]")
-OBSIDIAN_NOTE_LINK_RE = re.compile(r"(?<!!)\[\[([^\]|]+)(?:\|[^\]]+)?\]\]")
-MARKDOWN_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
-MARKDOWN_LINK_RE = re.compile(r"(?<!!)\[([^\]]+)\]\(([^)]+)\)")
+from blog.content_import.markdown_tokens import EMBED, LINK_KINDS, MEDIA_KINDS, WIKILINK, tokenize
+from blog.content_import.vault_index import get_vault_index
 
 
 @dataclass(frozen=True)
@@ -40,14 +37,13 @@ def collect_local_media_references(markdown_text: str, assets_dir: Path) -> Medi
     External URLs and absolute paths are ignored because they are not local assets to copy.
     """
 
-    assets_dir = Path(assets_dir)
-    index = build_asset_index(assets_dir)
+    index = _assets_index(assets_dir)
     found: list[MediaReference] = []
     missing: list[str] = []
     seen_paths: set[Path] = set()
 
     for source_name in iter_local_media_targets(markdown_text):
-        resolved = index.get(normalize_target(source_name))
+        resolved = index.lookup(normalize_target(source_name)) if index else None
         if resolved is None:
             missing.append(source_name)
             continue
@@ -62,8 +58,7 @@ def collect_local_media_references(markdown_text: str, assets_dir: Path) -> Medi
 def collect_broken_local_links(markdown_text: str, assets_dir: Path) -> list[str]:
     """Return unresolved local media and document links from Markdown/Obsidian source."""
 
-    assets_dir = Path(assets_dir)
-    index = build_asset_index(assets_dir)
+    index = _assets_index(assets_dir)
     missing: list[str] = []
     seen: set[str] = set()
 
@@ -72,7 +67,7 @@ def collect_broken_local_links(markdown_text: str, assets_dir: Path) -> list[str
         if normalized in seen:
             continue
         seen.add(normalized)
-        if normalized not in index:
+        if index is None or not index.contains(normalized):
             missing.append(target)
 
     return missing
@@ -81,19 +76,14 @@ def collect_broken_local_links(markdown_text: str, assets_dir: Path) -> list[str
 def iter_local_media_targets(markdown_text: str):
     """Yield local media targets from source Markdown in source order."""
 
-    matches = []
-    for match in OBSIDIAN_EMBED_RE.finditer(markdown_text):
-        matches.append((match.start(), clean_target(match.group(1))))
-    for match in MARKDOWN_IMAGE_RE.finditer(markdown_text):
-        raw_target = match.group(2).strip().strip("<>")
-        if is_external_or_absolute(raw_target):
-            continue
-        target = clean_target(raw_target)
-        matches.append((match.start(), target))
-
     seen_targets = set()
-    for _position, target in sorted(matches, key=lambda item: item[0]):
-        normalized = normalize_target(target)
+    for token in tokenize(markdown_text).of(*MEDIA_KINDS):
+        if token.kind != EMBED:
+            raw_target = token.target.strip("<>")
+            if is_external_or_absolute(raw_target):
+                continue
+        target = clean_target(token.target)
+        normalized = target.casefold()
         if normalized in seen_targets:
             continue
         seen_targets.add(normalized)
@@ -103,37 +93,34 @@ def iter_local_media_targets(markdown_text: str):
 def iter_local_document_targets(markdown_text: str):
     """Yield local non-image Markdown links and Obsidian wikilinks in source order."""
 
-    matches = []
-    for match in OBSIDIAN_NOTE_LINK_RE.finditer(markdown_text):
-        matches.append((match.start(), clean_target(match.group(1))))
-    for match in MARKDOWN_LINK_RE.finditer(markdown_text):
-        raw_target = match.group(2).strip().strip("<>")
-        if is_external_or_absolute(raw_target) or raw_target.startswith("#"):
-            continue
-        matches.append((match.start(), clean_target(raw_target)))
-
     seen_targets = set()
-    for _position, target in sorted(matches, key=lambda item: item[0]):
-        normalized = normalize_target(target)
+    for token in tokenize(markdown_text).of(*LINK_KINDS):
+        if token.kind != WIKILINK:
+            raw_target = token.target.strip("<>")
+            if is_external_or_absolute(raw_target) or raw_target.startswith("#"):
+                continue
+        target = clean_target(token.target)
+        normalized = target.casefold()
         if normalized in seen_targets:
             continue
         seen_targets.add(normalized)
         yield target
 
 
+def _assets_index(assets_dir: Path):
+    """Return the shared flat index of ``assets_dir`` or ``None`` if it is missing."""
+
+    assets_dir = Path(assets_dir)
+    if not assets_dir.is_dir():
+        return None
+    return get_vault_index(assets_dir, recursive=False)
+
+
 def build_asset_index(assets_dir: Path) -> dict[str, Path]:
     """Build a case-insensitive lookup by file name and stem for assets_dir files."""
 
-    index: dict[str, Path] = {}
-    if not assets_dir.exists() or not assets_dir.is_dir():
-        return index
-
-    for path in sorted(assets_dir.iterdir()):
-        if not path.is_file():
-            continue
-        for key in {path.name, path.stem}:
-            index.setdefault(normalize_target(key), path)
-    return index
+    index = _assets_index(assets_dir)
+    return index.first_by_key() if index else {}
 
 
 def clean_target(target: str) -> str:
@@ -2,21 +2,26 @@
 
 from __future__ import annotations
 
+import os
 import re
 from ast import literal_eval
 from pathlib import Path
 
 from django.core.files import File
+from django.core.files.storage import FileSystemStorage
 
+from blog.content_import.file_transfer import transfer_file
 from blog.content_import.frontmatter import split_frontmatter
+from blog.content_import.markdown_tokens import WIKILINK, tokenize
 from blog.content_import.media_links import clean_target, collect_local_media_references
 from blog.content_import.timecodes import extract_timecode_blocks
-from blog.models import Category, Post, PostMedia, Tag
+from blog.content_import.vault_index import vault_index_run
+from blog.models import Category, Post, PostMedia, Tag, build_file_slug
 
-OBSIDIAN_NOTE_LINK_RE = re.compile(r"(?<!!)\[\[([^\]|]+)(?:\|([^\]]+))?\]\]")
 LEADING_H1_RE = re.compile(r"\A\s*#\s+(.+?)\s*(?:\n+|\Z)")
 
 
+@vault_index_run()
 def import_obsidian_note_to_post(
     note_path: Path,
     assets_dir: Path | None = None,
@@ -25,8 +30,14 @@ def import_obsidian_note_to_post(
     description: str | None = None,
     content_type: str | None = None,
     media_url: str | None = None,
+    link_mode: str = "copy",
 ) -> Post:
-    """Create a Post and PostMedia rows from a local Markdown/Obsidian note."""
+    """Create a Post and PostMedia rows from a local Markdown/Obsidian note.
+
+    ``link_mode`` (see ``file_transfer``) lets local assets be hard-linked or
+    reflinked into ``MEDIA_ROOT``; ``post.media_transfers`` lists
+    ``(original_filename, method)`` for every attached file.
+    """
 
     note_path = Path(note_path)
     assets_dir = Path(assets_dir) if assets_dir else note_path.parent
@@ -63,16 +74,17 @@ def import_obsidian_note_to_post(
     if tag_names:
         post.tags.set(Tag.objects.get_or_create(name=tag_name)[0] for tag_name in tag_names)
 
+    post.media_transfers = []
     cover_reference = resolve_cover_reference(metadata.get("cover", ""), assets_dir)
     if cover_reference:
-        create_post_media(post, cover_reference)
+        create_post_media(post, cover_reference, link_mode=link_mode)
 
     references = collect_local_media_references(markdown_body, assets_dir)
     existing_originals = set(post.media_files.values_list("original_filename", flat=True))
     for reference in references.found:
         if reference.path.name in existing_originals:
             continue
-        create_post_media(post, reference.path)
+        create_post_media(post, reference.path, link_mode=link_mode)
         existing_originals.add(reference.path.name)
 
     markdown_body = remove_primary_player_media_embeds(
@@ -87,15 +99,50 @@ def import_obsidian_note_to_post(
     return post
 
 
-def create_post_media(post: Post, source_path: Path) -> PostMedia:
+def create_post_media(post: Post, source_path: Path, *, link_mode: str = "copy") -> PostMedia:
     """Attach a local media file to a post preserving original filename order."""
 
-    with source_path.open("rb") as source_file:
-        return PostMedia.objects.create(
-            post=post,
-            file=File(source_file, name=source_path.name),
-            original_filename=source_path.name,
-        )
+    # ``post_media_upload_to`` names the stored file after ``file_slug``.
+    media = PostMedia(post=post, original_filename=source_path.name, file_slug=build_file_slug(source_path.name))
+    method = store_local_file(media.file, source_path, link_mode=link_mode)
+    media.save()
+    if hasattr(post, "media_transfers"):
+        post.media_transfers.append((source_path.name, method))
+    return media
+
+
+def store_local_file(field_file, source_path: Path, *, link_mode: str = "copy") -> str:
+    """Store a local file as ``field_file`` without saving the model row.
+
+    With ``link_mode="copy"`` or a non-filesystem storage (S3) the file goes
+    through the storage backend as before and ``"storage"`` is returned.
+    Otherwise it is placed under the storage location by
+    ``file_transfer.transfer_file`` and the transfer method is returned.
+    """
+
+    storage = field_file.storage
+    if link_mode == "copy" or not isinstance(storage, FileSystemStorage):
+        with source_path.open("rb") as source_file:
+            field_file.save(source_path.name, File(source_file), save=False)
+        return "storage"
+
+    field = field_file.field
+    name = field.generate_filename(field_file.instance, source_path.name)
+    while True:
+        name = storage.get_available_name(name, max_length=field.max_length)
+        destination = Path(storage.path(name))
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            method = transfer_file(source_path, destination, mode=link_mode)
+        except FileExistsError:
+            continue
+        break
+    # A hard link shares the source inode: never chmod the user's vault file.
+    if method != "hardlink" and storage.file_permissions_mode is not None:
+        os.chmod(destination, storage.file_permissions_mode)
+    field_file.name = name
+    field_file._committed = True
+    return method
 
 
 def resolve_cover_reference(raw_cover: str, assets_dir: Path) -> Path | None:
@@ -106,15 +153,9 @@ def resolve_cover_reference(raw_cover: str, assets_dir: Path) -> Path | None:
     card cover is user-facing metadata, not optional prose.
     """
 
-    cover = (raw_cover or "").strip().strip('"\'')
+    cover = cover_target(raw_cover)
     if not cover:
         return None
-    obsidian_match = re.fullmatch(r"!?\[\[([^\]|]+)(?:\|[^\]]+)?\]\]", cover)
-    if obsidian_match:
-        cover = obsidian_match.group(1).strip()
-    markdown_match = re.fullmatch(r"!?\[[^\]]*\]\(([^)]+)\)", cover)
-    if markdown_match:
-        cover = markdown_match.group(1).strip()
     assets_root = Path(assets_dir).resolve()
     cover_path = Path(cover)
     if not cover_path.is_absolute():
@@ -131,6 +172,19 @@ def resolve_cover_reference(raw_cover: str, assets_dir: Path) -> Path | None:
     return cover_path
 
 
+def cover_target(raw_cover: str) -> str:
+    """Return the path inside a frontmatter cover value (plain, embed or image)."""
+
+    cover = (raw_cover or "").strip().strip('"\'')
+    obsidian_match = re.fullmatch(r"!?\[\[([^\]|]+)(?:\|[^\]]+)?\]\]", cover)
+    if obsidian_match:
+        cover = obsidian_match.group(1).strip()
+    markdown_match = re.fullmatch(r"!?\[[^\]]*\]\(([^)]+)\)", cover)
+    if markdown_match:
+        cover = markdown_match.group(1).strip()
+    return cover
+
+
 def remove_primary_player_media_embeds(
     markdown_text: str,
     references,
@@ -264,15 +318,21 @@ def tags_from_metadata(metadata: dict[str, str]) -> list[str]:
 def category_from_metadata(metadata: dict[str, str]) -> Category | None:
     """Create a category from the Obsidian series value, if present."""
 
-    series = metadata.get("series", "").strip()
-    if not series:
-        return None
-    name = humanize_taxonomy_name(series.removesuffix("-course"))
+    name = category_name_from_metadata(metadata)
     if not name:
         return None
     return Category.objects.get_or_create(name=name)[0]
 
 
+def category_name_from_metadata(metadata: dict[str, str]) -> str:
+    """Return the readable category name derived from the Obsidian series value."""
+
+    series = metadata.get("series", "").strip()
+    if not series:
+        return ""
+    return humanize_taxonomy_name(series.removesuffix("-course"))
+
+
 def humanize_taxonomy_name(value: str) -> str:
     """Convert frontmatter slugs such as 'lm-studio' to readable labels."""
 
@@ -288,9 +348,7 @@ def humanize_taxonomy_name(value: str) -> str:
 def normalize_obsidian_note_links(markdown_text: str) -> str:
     """Replace non-embedded Obsidian wikilinks with readable text."""
 
-    def replace(match):
-        target = match.group(1).strip()
-        alias = match.group(2)
-        return (alias or target).strip()
+    def replace(token):
+        return (token.label or token.target).strip()
 
-    return OBSIDIAN_NOTE_LINK_RE.sub(replace, markdown_text)
+    return tokenize(markdown_text).rewrite(replace, (WIKILINK,))
@@ -5,9 +5,8 @@ from __future__ import annotations
 import re
 from typing import Any
 
-TIMECODE_FENCE_RE = re.compile(
-    r"(?ms)^```timecodes\s*\n(?P<body>.*?)\n```\s*$"
-)
+from blog.content_import.markdown_tokens import FENCE, tokenize
+
 TIMECODE_LINE_RE = re.compile(
     r"^\s*(?P<time>\d{1,2}:\d{2}(?::\d{2})?)\s*(?:[-–—|:]\s*)?(?P<label>.+?)\s*$"
 )
@@ -76,11 +75,13 @@ def extract_timecode_blocks(
 
     entries: list[dict[str, Any]] = []
 
-    def replace(match: re.Match[str]) -> str:
-        entries.extend(parse_timecodes(match.group("body"), strict=strict))
+    def replace(token):
+        if token.label.strip() != "timecodes":
+            return None
+        entries.extend(parse_timecodes(token.body, strict=strict))
         return ""
 
-    cleaned_markdown = TIMECODE_FENCE_RE.sub(replace, markdown_text or "")
+    cleaned_markdown = tokenize(markdown_text or "").rewrite(replace, (FENCE,))
     cleaned_markdown = re.sub(r"\n{3,}", "\n\n", cleaned_markdown).strip()
     return cleaned_markdown, entries
 
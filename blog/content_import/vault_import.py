@@ -0,0 +1,586 @@
+"""Import a whole Obsidian vault into blog posts in batches.
+
+Notes are discovered from the shared vault index, parsed (frontmatter,
+timecodes, link targets) in a process pool, and written per batch in one
+transaction: taxonomy is upserted in bulk, posts, tag links and media rows
+use ``bulk_create``, and ``content_html`` is rendered once after the media
+rows exist.
+
+In sync mode every post remembers ``source_hash`` (the note text plus the
+path, size and mtime of each resolved asset) and every media row its
+``sha256``. Unchanged notes are skipped after a ``stat`` per asset; changed
+notes update the existing post in place, copy only assets whose content
+changed and re-render ``content_html`` only when the body or media changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from blog.cache_keys import namespace_version, versioned_key
+from blog.card_cache import invalidate_post_cards
+from blog.content_import.frontmatter import split_frontmatter
+from blog.content_import.media_bundle import iter_media_targets_for_bundle, resolve_media_target
+from blog.content_import.media_links import MediaReference
+from blog.content_import.obsidian import (
+    category_name_from_metadata,
+    cover_target,
+    normalize_content_type,
+    normalize_obsidian_note_links,
+    remove_duplicate_leading_h1,
+    remove_primary_player_media_embeds,
+    store_local_file,
+    tags_from_metadata,
+    title_from_leading_h1,
+)
+from blog.content_import.timecodes import extract_timecode_blocks
+from blog.content_import.vault_index import get_vault_index, vault_index_run
+from blog.models import Category, Post, PostMedia, Tag, ThumbnailJob, build_file_slug
+from blog.pagination import invalidate_post_counts
+from blog.related import defer_related_refresh, schedule_related_refresh
+from blog.series import invalidate_series_tocs
+from blog.similarity import store_text_vectors
+from blog.services import convert_markdown_to_html
+from blog.slug_utils import build_slug
+from blog.taxonomy import invalidate_taxonomy
+
+PLAYER_CONTENT_TYPES = {Post.ContentType.VIDEO, Post.ContentType.AUDIO, Post.ContentType.PODCAST}
+
+
+@dataclass(frozen=True)
+class ParsedNote:
+    """Database-free parse result of one note, produced in a worker process."""
+
+    relative_path: str
+    title: str = ""
+    slug: str = ""
+    description: str = ""
+    content_type: str = ""
+    media_url: str = ""
+    status: str = ""
+    body: str = ""
+    timecodes: tuple = ()
+    category_name: str = ""
+    tag_names: tuple[str, ...] = ()
+    cover: str = ""
+    media_targets: tuple[str, ...] = ()
+    text_hash: str = ""
+    skip_reason: str = ""
+    error: str = ""
+
+
+@dataclass
+class NotePlan:
+    """A parsed note with resolved assets, ready for one batch write."""
+
+    note: ParsedNote
+    cover_path: Path | None
+    references: list[MediaReference]
+    source_hash: str = ""
+    action: str = "create"
+
+
+@dataclass
+class VaultImportReport:
+    notes: int = 0
+    created: int = 0
+    replaced: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: list[tuple[str, str]] = field(default_factory=list)
+    errors: list[tuple[str, str]] = field(default_factory=list)
+    media: int = 0
+    plans: list[NotePlan] = field(default_factory=list)
+    # (post slug, original filename, transfer method) per stored asset.
+    transfers: list[tuple[str, str, str]] = field(default_factory=list)
+
+
+@dataclass
+class BatchFiles:
+    """Files placed by one batch: storage names to compensate, transfer methods."""
+
+    link_mode: str = "copy"
+    stored: list[tuple[object, str]] = field(default_factory=list)
+    transfers: list[tuple[str, str, str]] = field(default_factory=list)
+
+
+def discover_notes(vault_root: Path, include: list[str] | None = None, *, index_cache: Path | None = None) -> list[str]:
+    """Return vault-relative Markdown note paths, optionally filtered by globs."""
+
+    index = get_vault_index(vault_root, cache_path=index_cache)
+    notes = [relative for relative in index.paths if relative.lower().endswith(".md")]
+    if include:
+        notes = [relative for relative in notes if any(fnmatch(relative, pattern) for pattern in include)]
+    return notes
+
+
+def parse_note(vault_root: str, relative_path: str) -> ParsedNote:
+    """Parse one note without touching the database (process-pool safe)."""
+
+    note_path = Path(vault_root) / relative_path
+    try:
+        text = note_path.read_text(encoding="utf-8")
+        metadata, body = split_frontmatter(text)
+        description = metadata.get("description", "").strip()
+        if not description:
+            return ParsedNote(relative_path, skip_reason="no frontmatter description")
+        content_type = normalize_content_type(metadata.get("content_type") or metadata.get("type"))
+        body = normalize_obsidian_note_links(body)
+        body, timecodes = extract_timecode_blocks(body, strict=content_type in PLAYER_CONTENT_TYPES)
+        title = metadata.get("title") or title_from_leading_h1(body) or note_path.stem
+        body = remove_duplicate_leading_h1(body, title)
+        return ParsedNote(
+            relative_path,
+            title=title,
+            slug=metadata.get("slug", "").strip() or build_slug(title, fallback="post", max_length=200),
+            description=description,
+            content_type=content_type,
+            media_url=metadata.get("media_url", "").strip(),
+            status=Post.Status.DRAFT if metadata.get("status", "done") == "draft" else Post.Status.PUBLISHED,
+            body=body,
+            timecodes=tuple(timecodes),
+            category_name=category_name_from_metadata(metadata),
+            tag_names=tuple(tags_from_metadata(metadata)),
+            cover=cover_target(metadata.get("cover", "")),
+            media_targets=tuple(iter_media_targets_for_bundle(body)),
+            text_hash=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        )
+    except (OSError, UnicodeDecodeError, ValueError) as exc:
+        return ParsedNote(relative_path, error=str(exc))
+
+
+def parse_notes(vault_root: Path, relative_paths: list[str], *, workers: int) -> list[ParsedNote]:
+    """Parse notes in a spawn process pool; ``workers=1`` parses inline."""
+
+    root = str(vault_root)
+    if workers <= 1 or len(relative_paths) < 2:
+        return [parse_note(root, relative) for relative in relative_paths]
+    chunksize = max(1, len(relative_paths) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        # Referenced from ``django`` itself: unpickling it must not import
+        # this module (and blog.models) before the app registry is ready.
+        initializer=django.setup,
+    ) as executor:
+        return list(executor.map(parse_note, [root] * len(relative_paths), relative_paths, chunksize=chunksize))
+
+
+def plan_note(note: ParsedNote, vault_root: Path, *, index_cache: Path | None = None) -> NotePlan:
+    """Resolve cover and body assets through the shared vault index."""
+
+    note_path = vault_root / note.relative_path
+    cover_path = None
+    if note.cover:
+        cover_path = resolve_media_target(note.cover, note_path=note_path, vault_root=vault_root, index_cache=index_cache)
+        if cover_path is None:
+            raise ValueError(f"Cover file not found: {note.cover}")
+        if cover_path.suffix.lower() not in PostMedia.IMAGE_EXTENSIONS:
+            raise ValueError(f"Cover must be an image file: {note.cover}")
+    references = []
+    missing = []
+    for target in note.media_targets:
+        path = resolve_media_target(target, note_path=note_path, vault_root=vault_root, index_cache=index_cache)
+        if path is None:
+            missing.append(target)
+        else:
+            references.append(MediaReference(source_name=target, path=path))
+    if missing:
+        raise ValueError("Broken local links: " + ", ".join(missing))
+    return NotePlan(
+        note=note,
+        cover_path=cover_path,
+        references=references,
+        source_hash=source_hash(note, vault_root, _plan_sources(cover_path, references)),
+    )
+
+
+def source_hash(note: ParsedNote, vault_root: Path, sources: list[Path]) -> str:
+    """Hash the note text and a stat fingerprint of its assets (no file reads)."""
+
+    digest = hashlib.sha256(note.text_hash.encode("ascii"))
+    for path in sources:
+        stat_result = path.stat()
+        try:
+            name = path.relative_to(vault_root).as_posix()
+        except ValueError:
+            name = str(path)
+        digest.update(f"\0{name}\0{stat_result.st_size}\0{stat_result.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as source:
+        while chunk := source.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _plan_sources(cover_path: Path | None, references: list[MediaReference]) -> list[Path]:
+    """Return the note's asset files in attach order, one per name/file slug."""
+
+    sources = []
+    seen_names: set[str] = set()
+    seen_slugs: set[str] = set()
+    for source_path in ([cover_path] if cover_path else []) + [reference.path for reference in references]:
+        file_slug = build_file_slug(source_path.name)
+        if source_path.name in seen_names or file_slug in seen_slugs:
+            continue
+        seen_names.add(source_path.name)
+        seen_slugs.add(file_slug)
+        sources.append(source_path)
+    return sources
+
+
+@vault_index_run()
+def import_vault(
+    vault_root: Path,
+    *,
+    include: list[str] | None = None,
+    workers: int = 1,
+    batch_size: int = 50,
+    replace: bool = False,
+    sync: bool = False,
+    dry_run: bool = False,
+    index_cache: Path | None = None,
+    link_mode: str = "copy",
+) -> VaultImportReport:
+    """Discover, parse, plan and (unless ``dry_run``) import a vault.
+
+    Existing slugs are skipped by default, deleted and re-imported with
+    ``replace`` and updated in place when their ``source_hash`` differs with
+    ``sync``. ``link_mode`` places assets by hard link or reflink when
+    ``MEDIA_ROOT`` is on the vault's filesystem (see ``file_transfer``).
+    """
+
+    vault_root = Path(vault_root).expanduser().resolve()
+    report = VaultImportReport()
+    relative_paths = discover_notes(vault_root, include, index_cache=index_cache)
+    report.notes = len(relative_paths)
+
+    plans: list[NotePlan] = []
+    seen_slugs: set[str] = set()
+    for note in parse_notes(vault_root, relative_paths, workers=workers):
+        if note.skip_reason:
+            report.skipped.append((note.relative_path, note.skip_reason))
+            continue
+        if note.error:
+            report.errors.append((note.relative_path, note.error))
+            continue
+        if note.slug in seen_slugs:
+            report.errors.append((note.relative_path, f"duplicate slug in vault: {note.slug}"))
+            continue
+        try:
+            plan = plan_note(note, vault_root, index_cache=index_cache)
+        except ValueError as exc:
+            report.errors.append((note.relative_path, str(exc)))
+            continue
+        seen_slugs.add(note.slug)
+        plans.append(plan)
+
+    existing = dict(Post.objects.filter(slug__in=seen_slugs).values_list("slug", "source_hash"))
+    for plan in plans:
+        if plan.note.slug not in existing:
+            continue
+        if replace:
+            plan.action = "replace"
+        elif sync and existing[plan.note.slug] == plan.source_hash:
+            plan.action = "skip"
+            report.unchanged += 1
+        elif sync:
+            plan.action = "update"
+        else:
+            plan.action = "skip"
+            report.skipped.append((plan.note.relative_path, f"post exists: {plan.note.slug}"))
+    plans = [plan for plan in plans if plan.action != "skip"]
+    report.plans = plans
+    if dry_run:
+        return report
+
+    for start in range(0, len(plans), batch_size):
+        batch = plans[start : start + batch_size]
+        files = BatchFiles(link_mode=link_mode)
+        try:
+            media_count = _write_batch(batch, files)
+        except Exception as exc:
+            report.errors.extend((plan.note.relative_path, f"batch failed: {exc}") for plan in batch)
+            continue
+        report.media += media_count
+        report.transfers.extend(files.transfers)
+        report.created += sum(plan.action == "create" for plan in batch)
+        report.replaced += sum(plan.action == "replace" for plan in batch)
+        report.updated += sum(plan.action == "update" for plan in batch)
+    return report
+
+
+def upsert_taxonomy(model, names) -> dict[str, object]:
+    """Return ``{name: instance}``, creating missing rows with one ``bulk_create``."""
+
+    names = sorted(set(filter(None, names)))
+    if not names:
+        return {}
+    by_name = {item.name: item for item in model.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        used_slugs = set(model.objects.values_list("slug", flat=True))
+        rows = []
+        max_length = model._meta.get_field("slug").max_length
+        fallback = model._meta.model_name
+        for name in missing:
+            base = build_slug(name, fallback=fallback, max_length=max_length)
+            slug, suffix = base, 2
+            while slug in used_slugs:
+                slug = f"{base[: max_length - len(str(suffix)) - 1].rstrip('-')}-{suffix}"
+                suffix += 1
+            used_slugs.add(slug)
+            rows.append(model(name=name, slug=slug))
+        model.objects.bulk_create(rows)
+        by_name.update((item.name, item) for item in model.objects.filter(name__in=missing))
+    return by_name
+
+
+def _write_batch(batch: list[NotePlan], files: BatchFiles) -> int:
+    """Write one batch atomically; remove stored files if the transaction fails."""
+
+    try:
+        with transaction.atomic(), defer_related_refresh():
+            media_count, replaced_names = _write_batch_rows(batch, files)
+            transaction.on_commit(lambda: _delete_storage_names(replaced_names))
+            # Bulk writes skip model signals; refresh the sidebar and list counts here.
+            transaction.on_commit(invalidate_taxonomy)
+            transaction.on_commit(invalidate_post_counts)
+            return media_count
+    except Exception:
+        for storage, name in reversed(files.stored):
+            try:
+                storage.delete(name)
+            except Exception:
+                pass
+        raise
+
+
+def _delete_storage_names(names: list[tuple[object, str]]) -> None:
+    """Best-effort removal of files replaced by a committed sync batch."""
+
+    for storage, name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            pass
+
+
+def _write_batch_rows(batch: list[NotePlan], files: BatchFiles) -> tuple[int, list]:
+    """Write one batch; return the media count and storage names to drop on commit."""
+
+    categories = upsert_taxonomy(Category, (plan.note.category_name for plan in batch))
+    tags = upsert_taxonomy(Tag, (name for plan in batch for name in plan.note.tag_names))
+
+    replaced = [plan.note.slug for plan in batch if plan.action == "replace"]
+    if replaced:
+        Post.objects.filter(slug__in=replaced).delete()
+
+    now = timezone.now()
+    creates = [plan for plan in batch if plan.action != "update"]
+    posts = []
+    for plan in creates:
+        note = plan.note
+        post = Post(
+            title=note.title,
+            slug=note.slug,
+            description=note.description,
+            content=note.body,
+            content_type=note.content_type,
+            media_url=note.media_url,
+            timecodes=list(note.timecodes),
+            status=note.status,
+            category=categories.get(note.category_name),
+            published_at=now if note.status == Post.Status.PUBLISHED else None,
+            source_hash=plan.source_hash,
+        )
+        post.clean()
+        posts.append(post)
+    Post.objects.bulk_create(posts)
+
+    Post.tags.through.objects.bulk_create(
+        Post.tags.through(post_id=post.pk, tag_id=tags[name].pk)
+        for post, plan in zip(posts, creates, strict=True)
+        for name in plan.note.tag_names
+    )
+
+    media_rows = []
+    for post, plan in zip(posts, creates, strict=True):
+        for source_path in _plan_sources(plan.cover_path, plan.references):
+            media_rows.append(_copy_media(post, source_path, file_sha256(source_path), files))
+
+    updated, rerender, replaced_names, new_covers = _update_posts(
+        [plan for plan in batch if plan.action == "update"], categories, tags, media_rows, files, now
+    )
+    PostMedia.objects.bulk_create(media_rows)
+    for media in new_covers:
+        media.order_first()
+    # bulk_create skips the PostMedia signals that maintain the pointers.
+    Post.refresh_media_pointers([post.pk for post in [*posts, *updated]], instances=[*posts, *updated])
+
+    images = [media for media in media_rows if media.is_raster_image]
+    if getattr(settings, "MEDIA_THUMBNAILS_DEFERRED", False):
+        ThumbnailJob.objects.bulk_create(ThumbnailJob(media=media) for media in images)
+    else:
+        for media in images:
+            media.store_derivatives()
+            files.stored.extend((media.file.storage, name) for name in media.stored_names[1:])
+
+    for post, plan in [*zip(posts, creates, strict=True), *rerender]:
+        post.content = remove_primary_player_media_embeds(
+            plan.note.body, plan.references, content_type=post.content_type
+        )
+        post.content_html = convert_markdown_to_html(post.content, post=post) if post.content else ""
+        post.refresh_text_stats()
+    Post.objects.bulk_update(
+        posts + [post for post, _plan in rerender], ["content", "content_html", *Post.TEXT_STATS_FIELDS]
+    )
+    version = namespace_version("post_html")
+    cache.delete_many([versioned_key("post_html", post.pk, version=version) for post in updated])
+    store_text_vectors([*posts, *updated])
+    schedule_related_refresh(post.pk for post in [*posts, *updated])
+    return len(media_rows), replaced_names
+
+
+def _copy_media(post: Post, source_path: Path, sha256: str, files: BatchFiles) -> PostMedia:
+    """Place one asset into storage and return its unsaved media row."""
+
+    media = PostMedia(
+        post=post,
+        original_filename=source_path.name,
+        file_slug=build_file_slug(source_path.name),
+        sha256=sha256,
+    )
+    media.media_type = media.detect_media_type()
+    method = store_local_file(media.file, source_path, link_mode=files.link_mode)
+    files.stored.append((media.file.storage, media.file.name))
+    files.transfers.append((post.slug, source_path.name, method))
+    return media
+
+
+SYNC_FIELDS = [
+    "title",
+    "description",
+    "content_type",
+    "media_url",
+    "timecodes",
+    "status",
+    "category",
+    "published_at",
+    "source_hash",
+    "updated_at",
+    *Post.TEXT_STATS_FIELDS,
+]
+
+
+def _update_posts(plans: list[NotePlan], categories, tags, media_rows: list, files: BatchFiles, now):
+    """Apply changed notes to their posts in place.
+
+    Assets whose ``sha256`` still matches the stored media row are kept; only
+    new or changed files are copied (appended to ``media_rows``). Returns the
+    updated posts, ``(post, plan)`` pairs whose body or media changed and so
+    need re-rendering, storage names of dropped media to delete on commit and
+    re-copied covers that must sort before the kept media.
+    """
+
+    if not plans:
+        return [], [], [], []
+    posts = {
+        post.slug: post
+        for post in Post.objects.filter(slug__in=[plan.note.slug for plan in plans]).prefetch_related(
+            "media_files__derivatives"
+        )
+    }
+    updated, rerender, replaced_names, dropped, new_covers = [], [], [], [], []
+    tag_ids: dict[int, set[int]] = {}
+    for plan in plans:
+        note = plan.note
+        post = posts[note.slug]
+        post.title = note.title
+        post.description = note.description
+        post.content_type = note.content_type
+        post.media_url = note.media_url
+        post.timecodes = list(note.timecodes)
+        post.status = note.status
+        post.category = categories.get(note.category_name)
+        if note.status == Post.Status.PUBLISHED and not post.published_at:
+            post.published_at = now
+        post.source_hash = plan.source_hash
+        post.updated_at = now
+        post.refresh_text_stats()
+        post.clean()
+        tag_ids[post.pk] = {tags[name].pk for name in note.tag_names}
+
+        current = {media.original_filename: media for media in post.media_files.all()}
+        stale = []
+        copied = len(media_rows)
+        for source_path in _plan_sources(plan.cover_path, plan.references):
+            sha256 = file_sha256(source_path)
+            media = current.pop(source_path.name, None)
+            if media is not None and media.sha256 == sha256:
+                continue
+            if media is not None:
+                stale.append(media)
+            media_rows.append(_copy_media(post, source_path, sha256, files))
+        stale.extend(current.values())
+        recopied = media_rows[copied:]
+        media_changed = bool(stale or recopied)
+        if plan.cover_path and recopied and recopied[0].original_filename == plan.cover_path.name:
+            new_covers.append(recopied[0])
+        for media in stale:
+            replaced_names.extend((media.file.storage, name) for name in media.stored_names)
+            dropped.append(media.pk)
+
+        content = remove_primary_player_media_embeds(note.body, plan.references, content_type=post.content_type)
+        if media_changed or content != post.content:
+            rerender.append((post, plan))
+        updated.append(post)
+    # Free (post, original_filename) and (post, file_slug) before new rows land.
+    PostMedia.objects.filter(pk__in=dropped).delete()
+    Post.objects.bulk_update(updated, SYNC_FIELDS)
+    if _sync_post_tags(tag_ids):
+        # The bulk statements skip the m2m_changed receivers: retire the
+        # cached cards and series TOCs that show tags once per batch.
+        transaction.on_commit(invalidate_post_cards)
+        transaction.on_commit(invalidate_series_tocs)
+    return updated, rerender, replaced_names, new_covers
+
+
+def _sync_post_tags(tag_ids: dict[int, set[int]]) -> bool:
+    """Make the tag links of each post equal ``tag_ids``; return whether any changed.
+
+    One query reads the current links of the whole batch, then stale links
+    are removed and missing ones added with one statement each.
+    """
+
+    through = Post.tags.through
+    stale, kept = [], set()
+    for pk, post_id, tag_id in through.objects.filter(post_id__in=tag_ids).values_list("pk", "post_id", "tag_id"):
+        if tag_id in tag_ids[post_id]:
+            kept.add((post_id, tag_id))
+        else:
+            stale.append(pk)
+    missing = [
+        through(post_id=post_id, tag_id=tag_id)
+        for post_id, wanted in tag_ids.items()
+        for tag_id in wanted
+        if (post_id, tag_id) not in kept
+    ]
+    through.objects.filter(pk__in=stale).delete()
+    through.objects.bulk_create(missing)
+    return bool(stale or missing)
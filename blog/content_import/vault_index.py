@@ -0,0 +1,203 @@
+"""Name/stem lookup index over an Obsidian vault or a flat assets directory.
+
+The index is built once with ``os.scandir`` and shared per process by
+``get_vault_index``, so resolving many embeds no longer walks the vault once
+per target. Freshness is checked through directory mtimes: adding, removing or
+renaming a file changes its parent directory mtime, so stale indexes are
+rebuilt without rescanning unchanged trees. Outside a run every request checks
+freshness; inside ``vault_index_run`` (vault import, bundle collection,
+package build, single-note import) the check runs once per root for the whole
+run instead of once per lookup. An optional JSON cache file keeps the index
+between runs.
+
+This module has no Django dependencies; ``publisher.package`` uses it too.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+
+INDEX_VERSION = 1
+
+_INDEXES: dict[tuple[str, bool], VaultIndex] = {}
+# Roots already checked (or built) in the enclosing ``vault_index_run``.
+_verified: ContextVar[set[tuple[str, bool]] | None] = ContextVar("vault_index_verified", default=None)
+
+
+@dataclass
+class VaultIndex:
+    """Sorted relative file paths plus a casefolded name/stem lookup."""
+
+    root: Path
+    recursive: bool
+    paths: list[str]
+    dir_mtimes: dict[str, int]
+    _positions: dict[str, list[int]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        for position, relative in enumerate(self.paths):
+            path = PurePosixPath(relative)
+            for key in {path.name.casefold(), path.stem.casefold()}:
+                self._positions.setdefault(key, []).append(position)
+
+    @classmethod
+    def build(cls, root: Path, *, recursive: bool = True) -> VaultIndex:
+        """Scan ``root`` once; recursive scans skip hidden dirs like ``.obsidian``."""
+        root = Path(root)
+        paths: list[str] = []
+        dir_mtimes: dict[str, int] = {}
+        pending = [""]
+        while pending:
+            relative_dir = pending.pop()
+            directory = root / relative_dir if relative_dir else root
+            try:
+                dir_mtimes[relative_dir] = directory.stat().st_mtime_ns
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                try:
+                    if entry.is_file():
+                        paths.append(relative)
+                    elif recursive and entry.is_dir(follow_symlinks=False) and not entry.name.startswith("."):
+                        pending.append(relative)
+                except OSError:
+                    continue
+        # Same order as ``sorted(root.rglob("*"))``: compare path components.
+        paths.sort(key=lambda relative: PurePosixPath(relative).parts)
+        return cls(root=root, recursive=recursive, paths=paths, dir_mtimes=dir_mtimes)
+
+    @classmethod
+    def load(cls, cache_path: Path, root: Path, *, recursive: bool = True) -> VaultIndex | None:
+        """Return the cached index for ``root`` or ``None`` if absent/mismatched."""
+        try:
+            data = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != INDEX_VERSION
+            or data.get("root") != str(root)
+            or data.get("recursive") != recursive
+        ):
+            return None
+        return cls(
+            root=Path(root),
+            recursive=recursive,
+            paths=list(data.get("paths", [])),
+            dir_mtimes={key: int(value) for key, value in data.get("dir_mtimes", {}).items()},
+        )
+
+    def save(self, cache_path: Path) -> None:
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": INDEX_VERSION,
+            "root": str(self.root),
+            "recursive": self.recursive,
+            "paths": self.paths,
+            "dir_mtimes": self.dir_mtimes,
+        }
+        temporary = cache_path.with_name(cache_path.name + ".tmp")
+        temporary.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(temporary, cache_path)
+
+    def is_fresh(self) -> bool:
+        """Return True while no indexed directory was added to or removed from."""
+        for relative_dir, mtime_ns in self.dir_mtimes.items():
+            directory = self.root / relative_dir if relative_dir else self.root
+            try:
+                if directory.stat().st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def lookup(self, *keys: str, prefer: Path | None = None) -> Path | None:
+        """Return the first file (in sorted path order) whose name or stem matches.
+
+        ``prefer`` is a directory inside the root whose matches win over the
+        rest of the index, e.g. the note's own folder before the whole vault.
+        """
+        positions = sorted(
+            {position for key in keys for position in self._positions.get(key.casefold(), ())}
+        )
+        if not positions:
+            return None
+        if prefer is not None:
+            try:
+                prefix = Path(prefer).relative_to(self.root).as_posix()
+            except ValueError:
+                prefix = None
+            if prefix is not None:
+                for position in positions:
+                    if prefix == "." or self.paths[position].startswith(prefix + "/"):
+                        return self.root / self.paths[position]
+        return self.root / self.paths[positions[0]]
+
+    def find_name(self, name: str) -> Path | None:
+        """Return the first file whose full name (not stem) matches ``name``."""
+        name = name.casefold()
+        for position in self._positions.get(name, ()):
+            if PurePosixPath(self.paths[position]).name.casefold() == name:
+                return self.root / self.paths[position]
+        return None
+
+    def contains(self, key: str) -> bool:
+        return key.casefold() in self._positions
+
+    def first_by_key(self) -> dict[str, Path]:
+        """Return ``{casefolded name or stem: first matching path}``."""
+        return {key: self.root / self.paths[positions[0]] for key, positions in self._positions.items()}
+
+
+def get_vault_index(
+    root: Path,
+    *,
+    recursive: bool = True,
+    cache_path: Path | None = None,
+) -> VaultIndex:
+    """Return the shared index for ``root``, loading/saving ``cache_path``.
+
+    Freshness is checked on every call, or only the first time ``root`` is
+    requested inside ``vault_index_run``.
+    """
+    root = Path(root).expanduser().resolve()
+    key = (str(root), recursive)
+    index = _INDEXES.get(key)
+    verified = _verified.get()
+    if index is not None and verified is not None and key in verified:
+        return index
+    if index is None and cache_path is not None:
+        index = VaultIndex.load(cache_path, root, recursive=recursive)
+    if index is None or not index.is_fresh():
+        index = VaultIndex.build(root, recursive=recursive)
+        if cache_path is not None:
+            index.save(cache_path)
+    _INDEXES[key] = index
+    if verified is not None:
+        verified.add(key)
+    return index
+
+
+@contextmanager
+def vault_index_run() -> Iterator[None]:
+    """Check each root's freshness once for the block; nested blocks join the outer run.
+
+    Also usable as a decorator: every call of the function is a new run.
+    """
+    if _verified.get() is not None:
+        yield
+        return
+    token = _verified.set(set())
+    try:
+        yield
+    finally:
+        _verified.reset(token)
@@ -1,42 +1,195 @@
-"""RSS 2.0 and Atom 1.0 syndication feeds for published blog posts."""
+"""RSS 2.0 and Atom 1.0 syndication feeds for published blog posts.
+
+Every feed exists for the whole blog and per category, tag and series, in a
+short (``description``) and a full-content (``?full=1``, ``content_html``)
+variant. Aggregators poll these URLs often, so a request costs one aggregate
+query over the feed's posts and is answered with a 304 or cached XML (see
+``blog.http_cache``); XML is rendered only when a post changed.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any
 
 from django.contrib.syndication.views import Feed
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils.feedgenerator import Atom1Feed
 
-from .models import Post
+from .http_cache import cached_conditional_response, posts_stamp
+from .models import Category, Post, Series, Tag
+
+FEED_ITEMS = 20
+# Bump when the feed markup changes so cached XML is not reused.
+FEED_RENDER_VERSION = 1
+_ROOT_RELATIVE_RE = re.compile(r'(\s(?:src|href|poster)=")/(?!/)')
+
+
+@dataclass(frozen=True)
+class FeedScope:
+    """Feed subject (``None`` for the whole blog) plus per-request options."""
+
+    object: Any
+    full: bool
+    origin: str
 
 
 class LatestPostsFeed(Feed):
     """RSS 2.0 feed of the 20 most recent published posts."""
 
     title = "Django 6 Blog"
-    link = "/"
     description = "Заметки, эксперименты и материалы разработки Владимира Монина."
+    # Post lookup for scoped feeds, e.g. ``category__slug``.
+    scope_lookup = ""
+
+    def __call__(self, request, *args, **kwargs):
+        stamp = posts_stamp(self.posts(**kwargs))
+        if not stamp["total"]:
+            # Empty feed or unknown slug: only now pay for the lookup (404).
+            self.get_scope_object(**kwargs)
+        full = request.GET.get("full") == "1"
+        return cached_conditional_response(
+            request,
+            namespace="feed",
+            key_parts=(FEED_RENDER_VERSION, type(self).__name__, kwargs.get("slug", ""), full),
+            stamp=stamp,
+            render=lambda: self.render(request, full=full, **kwargs),
+        )
+
+    def render(self, request, *, full: bool, **kwargs) -> tuple[str, bytes]:
+        """Render the feed XML; returns ``(content_type, body)`` for caching."""
+        try:
+            scope_object = self.get_scope_object(**kwargs)
+        except ObjectDoesNotExist as exc:
+            raise Http404("Feed object does not exist.") from exc
+        scope = FeedScope(object=scope_object, full=full, origin=f"{request.scheme}://{request.get_host()}")
+        feedgen = self.get_feed(scope, request)
+        response = HttpResponse(content_type=feedgen.content_type)
+        feedgen.write(response, "utf-8")
+        return feedgen.content_type, response.content
+
+    def posts(self, **kwargs):
+        posts = Post.objects.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)
+        if self.scope_lookup:
+            posts = posts.filter(**{self.scope_lookup: kwargs["slug"]})
+        return posts
+
+    def get_scope_object(self, **kwargs):
+        return None
+
+    def link(self, scope):
+        return "/"
 
-    def items(self):
-        return Post.objects.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)[:20]
+    def items(self, scope):
+        posts = list(self.posts(**self.scope_kwargs(scope)).select_related("category")[:FEED_ITEMS])
+        if scope.full:
+            # ``item_*`` hooks only receive the item, so full bodies ride on it.
+            for post in posts:
+                post.feed_content_html = _ROOT_RELATIVE_RE.sub(rf"\1{scope.origin}/", post.body_content_html)
+        return posts
+
+    def scope_kwargs(self, scope):
+        return {"slug": scope.object.slug} if scope.object is not None else {}
 
     def item_title(self, item):
         return item.title
 
     def item_description(self, item):
-        return item.description
+        full = getattr(item, "feed_content_html", "")
+        return full or item.description or item.plain_text_excerpt
 
     def item_link(self, item):
         return item.get_absolute_url()
 
     def item_pubdate(self, item):
-        return item.created_at
+        return item.published_at or item.created_at
 
-    def item_updatedate(self, item):
+    def item_updateddate(self, item):
         return item.updated_at
 
+    def item_categories(self, item):
+        return [item.category.name] if item.category else []
+
     def item_author_name(self):
         return "Владимир Монин"
 
 
+class CategoryPostsFeed(LatestPostsFeed):
+    """RSS 2.0 feed of one category."""
+
+    scope_lookup = "category__slug"
+
+    def get_scope_object(self, **kwargs):
+        return get_object_or_404(Category, slug=kwargs["slug"])
+
+    def title(self, scope):
+        return f"Django 6 Blog — {scope.object.name}"
+
+    def link(self, scope):
+        return f"{reverse('post_list')}?category={scope.object.slug}"
+
+    def description(self, scope):
+        return scope.object.description or LatestPostsFeed.description
+
+
+class TagPostsFeed(LatestPostsFeed):
+    """RSS 2.0 feed of one tag."""
+
+    scope_lookup = "tags__slug"
+
+    def get_scope_object(self, **kwargs):
+        return get_object_or_404(Tag, slug=kwargs["slug"])
+
+    def title(self, scope):
+        return f"Django 6 Blog — #{scope.object.name}"
+
+    def link(self, scope):
+        return f"{reverse('post_list')}?tag={scope.object.slug}"
+
+
+class SeriesPostsFeed(LatestPostsFeed):
+    """RSS 2.0 feed of one series."""
+
+    scope_lookup = "series__slug"
+
+    def get_scope_object(self, **kwargs):
+        return get_object_or_404(Series, slug=kwargs["slug"])
+
+    def title(self, scope):
+        return f"Django 6 Blog — {scope.object.name}"
+
+    def link(self, scope):
+        return reverse("series_detail", kwargs={"slug": scope.object.slug})
+
+    def description(self, scope):
+        return scope.object.description or LatestPostsFeed.description
+
+
 class AtomLatestPostsFeed(LatestPostsFeed):
     """Atom 1.0 feed — same content, different format."""
 
     feed_type = Atom1Feed
-    subtitle = LatestPostsFeed.description
\ No newline at end of file
+    subtitle = LatestPostsFeed.description
+
+
+class AtomCategoryPostsFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, scope):
+        return self.description(scope)
+
+
+class AtomTagPostsFeed(TagPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class AtomSeriesPostsFeed(SeriesPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, scope):
+        return self.description(scope)
@@ -0,0 +1,69 @@
+"""Stamp-keyed cache of rendered XML with conditional GET (feeds, sitemaps).
+
+Crawlers and aggregators poll feeds and sitemaps far more often than posts
+change. A response is identified by a *stamp* — ``Max(updated_at)`` and
+``Count`` over the posts it lists, one aggregate query — plus whatever else
+selects the document (section, page, options). The stamp yields the ETag and
+Last-Modified, so validators get a 304 without rendering, and keys the cached
+body, so a changed post simply produces a new key instead of needing
+invalidation. Keys live in the ``feed``/``sitemap`` namespaces
+(``blog.cache_keys``); bumping one retires every cached document of it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable, Iterable
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache_keys import versioned_key
+from .media_urls import embeddable_timeout
+
+CACHE_TIMEOUT = 24 * 3600
+CACHE_CONTROL = "public, max-age=300"
+
+
+def posts_stamp(posts) -> dict:
+    """Return ``{"latest": Max(updated_at), "total": Count(pk)}`` in one query."""
+    return posts.aggregate(latest=Max("updated_at"), total=Count("pk"))
+
+
+def cached_conditional_response(
+    request,
+    *,
+    namespace: str,
+    key_parts: Iterable,
+    stamp: dict,
+    render: Callable[[], tuple[str, bytes]],
+) -> HttpResponse:
+    """Answer from validators, then from the cache, rendering only on a miss.
+
+    ``render`` returns ``(content_type, body)``. The cache key includes the
+    host because rendered documents contain absolute URLs.
+    """
+    latest = stamp["latest"]
+    key = "|".join(str(part) for part in (*key_parts, latest and latest.isoformat(), stamp["total"]))
+    digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+    etag = f'"{digest}"'
+    last_modified = int(latest.timestamp()) if latest else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cache_key = versioned_key(namespace, digest, request.get_host())
+        cached = cache.get(cache_key)
+        if cached is None:
+            cached = render()
+            # Sitemaps embed media URLs; signed ones must not go stale in the cache.
+            cache.set(cache_key, cached, embeddable_timeout(CACHE_TIMEOUT))
+        content_type, content = cached
+        response = HttpResponse(content, content_type=content_type)
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
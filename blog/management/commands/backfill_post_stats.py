@@ -0,0 +1,59 @@
+"""Fill precomputed excerpt, word count, reading time and heading count.
+
+Usage:
+    uv run python manage.py backfill_post_stats --dry-run
+    uv run python manage.py backfill_post_stats --batch-size 500
+
+``Post.save`` keeps these columns current; the command covers rows written
+before the columns existed or through ``QuerySet.update``. Only changed rows
+are written, with one ``bulk_update`` per batch and no Markdown re-render.
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Post, compute_text_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute stored post excerpt, word count, reading time and heading count."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--dry-run", action="store_true", help="Count stale rows without writing.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+
+        fields = Post.TEXT_STATS_FIELDS
+        posts = Post.objects.only("pk", "title", "content", *fields).order_by("pk")
+        candidates = changed = 0
+        pending: list[Post] = []
+        for post in posts.iterator(chunk_size=batch_size):
+            candidates += 1
+            stats = compute_text_stats(post.title, post.content)
+            if all(getattr(post, name) == value for name, value in stats.items()):
+                continue
+            changed += 1
+            for name, value in stats.items():
+                setattr(post, name, value)
+            pending.append(post)
+            if len(pending) >= batch_size:
+                self._flush(pending, fields, options["dry_run"])
+        self._flush(pending, fields, options["dry_run"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"candidates={candidates} changed={changed} skipped={candidates - changed} "
+                f"dry_run={options['dry_run']}"
+            )
+        )
+
+    @staticmethod
+    def _flush(pending: list[Post], fields: list[str], dry_run: bool) -> None:
+        if pending and not dry_run:
+            Post.objects.bulk_update(pending, fields)
+        pending.clear()
@@ -0,0 +1,69 @@
+"""Show the configured cache backend and the versions of blog cache namespaces.
+
+Usage:
+    uv run python manage.py cache_stats
+    uv run python manage.py cache_stats --bump post_html --bump taxonomy
+    uv run python manage.py cache_stats --bump all
+
+The first line describes the backend: ``shared=False`` means every worker
+process keeps its own cache (``locmem``) and invalidations do not reach the
+others. ``roundtrip`` writes and reads back a probe key. ``--bump`` retires a
+namespace (``blog.cache_keys``) for every worker, e.g. after a Markdown
+renderer change that ``rebuild_content_html`` does not cover.
+"""
+
+from __future__ import annotations
+
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+
+from blog.cache_keys import NAMESPACES, bump_namespace, namespace_versions
+
+
+class Command(BaseCommand):
+    help = "Show cache backend, entry count and namespace versions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bump",
+            action="append",
+            default=[],
+            choices=[*NAMESPACES, "all"],
+            help="Retire every key of a namespace (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        bumped = NAMESPACES if "all" in options["bump"] else tuple(dict.fromkeys(options["bump"]))
+        bump_namespace(*bumped)
+
+        probe_key, probe = f"blog:cache_stats:{uuid.uuid4().hex}", uuid.uuid4().hex
+        cache.set(probe_key, probe, 30)
+        roundtrip = "ok" if cache.get(probe_key) == probe else "failed"
+        cache.delete(probe_key)
+
+        backend = settings.CACHE_BACKEND
+        self.stdout.write(
+            f"backend={backend} location={settings.CACHE_LOCATION or '-'} "
+            f"shared={backend != 'locmem'} entries={_entry_count()} roundtrip={roundtrip}"
+        )
+        for namespace, version in namespace_versions().items():
+            self.stdout.write(f"namespace={namespace} version={version} bumped={namespace in bumped}")
+
+
+def _entry_count() -> int | str:
+    """Stored entries where the backend can tell cheaply, else ``unknown``."""
+    if hasattr(cache, "_expire_info"):  # locmem
+        return len(cache._expire_info)
+    if hasattr(cache, "_dir"):  # file
+        return sum(1 for _ in Path(cache._dir).glob(f"*{cache.cache_suffix}"))
+    if hasattr(cache, "_table"):  # database
+        connection = connections[router.db_for_read(cache.cache_model_class)]
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(cache._table)}")
+            return cursor.fetchone()[0]
+    return "unknown"
@@ -6,6 +6,7 @@ from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
 
+from blog.content_import.file_transfer import LINK_MODES
 from blog.content_import.media_bundle import collect_note_media_bundle
 
 
@@ -24,6 +25,24 @@ class Command(BaseCommand):
             default=None,
             help="Obsidian vault root for resolving vault-relative wikilinks such as 999_files/img.webp.",
         )
+        parser.add_argument(
+            "--index-cache",
+            type=Path,
+            default=None,
+            help=(
+                "JSON file to persist the vault name index between runs; invalidated by "
+                "directory mtimes. Keep it outside indexed folders, e.g. <vault>/.cache/."
+            ),
+        )
+        parser.add_argument(
+            "--link-mode",
+            choices=LINK_MODES,
+            default="copy",
+            help=(
+                "How to place assets: 'link' hard-links (same inode as the vault file), "
+                "'reflink' clones copy-on-write; both fall back to a kernel copy."
+            ),
+        )
         parser.add_argument(
             "--no-copy-note",
             action="store_false",
@@ -56,12 +75,14 @@ class Command(BaseCommand):
                 clean=options["clean"],
                 title=options["title"],
                 description=options["description"],
+                index_cache=options["index_cache"],
+                link_mode=options["link_mode"],
             )
         except (FileNotFoundError, ValueError) as exc:
             raise CommandError(str(exc)) from exc
 
         for item in result.copied:
-            self.stdout.write(f"copied: {item.source_name} -> {item.copied_path.name}")
+            self.stdout.write(f"copied: {item.source_name} -> {item.copied_path.name} ({item.method})")
 
         if result.note_path is not None:
             self.stdout.write(f"note: {result.note_path}")
@@ -0,0 +1,218 @@
+"""Render deferred PostMedia thumbnails and responsive variants outside the request.
+
+Usage:
+    uv run python manage.py generate_thumbnails
+    uv run python manage.py generate_thumbnails --workers 4 --batch-size 32
+
+Jobs are recorded by ``PostMedia.save`` when ``MEDIA_THUMBNAILS_DEFERRED`` is
+enabled. Source bytes are read through the Django storage API in this process,
+decoded and resized in a process pool, and written back here, so pool workers
+never touch the database or storage credentials.
+
+``--enqueue-missing`` records jobs for existing images that lack thumbnails or
+configured ``MEDIA_RESPONSIVE_WIDTHS``/``MEDIA_RESPONSIVE_FORMATS`` variants.
+Posts whose images gained variants are re-saved so ``content_html`` picks up
+the new ``srcset``.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Post, PostMedia, ThumbnailJob
+from blog.thumbnails import render_derivatives
+
+
+class Command(BaseCommand):
+    help = "Render pending thumbnail jobs in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--batch-size", type=int, default=16)
+        parser.add_argument("--max-attempts", type=int, default=3)
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=30,
+            help="Requeue running jobs not updated for this long (crashed worker).",
+        )
+        parser.add_argument(
+            "--enqueue-missing",
+            action="store_true",
+            help="Record jobs for images missing thumbnails or responsive variants.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        batch_size = options["batch_size"]
+        max_attempts = options["max_attempts"]
+        if workers < 1 or batch_size < 1 or max_attempts < 1:
+            raise CommandError("--workers, --batch-size and --max-attempts must be positive")
+
+        enqueued = 0
+        if options["enqueue_missing"]:
+            enqueued = self._enqueue_missing(options["dry_run"])
+
+        stale_cutoff = timezone.now() - timedelta(minutes=options["stale_minutes"])
+        pending = ThumbnailJob.objects.filter(
+            state=ThumbnailJob.State.PENDING,
+            attempts__lt=max_attempts,
+        )
+        if options["dry_run"]:
+            stale = ThumbnailJob.objects.filter(
+                state=ThumbnailJob.State.RUNNING, updated_at__lt=stale_cutoff
+            ).count()
+            self.stdout.write(
+                f"pending={pending.count()} stale={stale} enqueued={enqueued} dry_run=True"
+            )
+            return
+
+        # A crashed worker already spent the attempt; jobs out of attempts
+        # would never be claimed again, so they fail instead of requeueing.
+        stale = ThumbnailJob.objects.filter(
+            state=ThumbnailJob.State.RUNNING, updated_at__lt=stale_cutoff
+        )
+        failed = stale.filter(attempts__gte=max_attempts).update(
+            state=ThumbnailJob.State.FAILED,
+            last_error="StaleRunningJob",
+            updated_at=timezone.now(),
+        )
+        stale.update(state=ThumbnailJob.State.PENDING, updated_at=timezone.now())
+
+        done = retried = 0
+        seen: set[int] = set()
+        rerender: set[int] = set()
+        # ``spawn`` keeps pool workers free of inherited DB sockets and threads.
+        executor = (
+            ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            if workers > 1
+            else None
+        )
+        try:
+            while True:
+                batch = self._claim_batch(pending.exclude(pk__in=seen), batch_size)
+                if not batch:
+                    break
+                seen.update(job.pk for job in batch)
+                for job, outcome in self._render_batch(executor, batch):
+                    state = self._finish(job, outcome, max_attempts)
+                    if state == ThumbnailJob.State.DONE:
+                        done += 1
+                        if outcome and outcome["variants"]:
+                            rerender.add(job.media.post_id)
+                    elif state == ThumbnailJob.State.FAILED:
+                        failed += 1
+                    else:
+                        retried += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # content_html is cached on the post; re-render it so bodies get srcset.
+        # Only the rendered fields are written: updated_at, related posts and
+        # series navigation do not change because a thumbnail got generated.
+        for post in Post.objects.filter(pk__in=rerender):
+            post.save(update_fields=["content_html"])
+
+        self.stdout.write(
+            f"jobs={done + failed + retried} done={done} failed={failed} "
+            f"retried={retried} rerendered={len(rerender)} enqueued={enqueued} dry_run=False"
+        )
+
+    @staticmethod
+    def _enqueue_missing(dry_run):
+        """Record jobs for raster images whose derivatives are incomplete."""
+        candidates = (
+            PostMedia.objects.filter(media_type="image")
+            .exclude(thumbnail_job__state__in=[ThumbnailJob.State.PENDING, ThumbnailJob.State.RUNNING])
+            .prefetch_related("derivatives")
+        )
+        enqueued = 0
+        for media in candidates.iterator(chunk_size=200):
+            if media.is_raster_image and media.needs_derivatives:
+                enqueued += 1
+                if not dry_run:
+                    ThumbnailJob.enqueue(media)
+        return enqueued
+
+    @staticmethod
+    def _claim_batch(queryset, batch_size):
+        """Atomically move up to ``batch_size`` pending jobs to running."""
+        claimed = []
+        for job in queryset.select_related("media__post").order_by("created_at")[:batch_size]:
+            updated = ThumbnailJob.objects.filter(
+                pk=job.pk, state=ThumbnailJob.State.PENDING
+            ).update(
+                state=ThumbnailJob.State.RUNNING,
+                attempts=F("attempts") + 1,
+                updated_at=timezone.now(),
+            )
+            if updated:
+                job.attempts += 1
+                claimed.append(job)
+        return claimed
+
+    @staticmethod
+    def _render_batch(executor, batch):
+        """Yield ``(job, rendered | exception | None)`` for every job.
+
+        ``None`` means the media no longer needs derivatives.
+        """
+        render = partial(
+            render_derivatives,
+            widths=tuple(settings.MEDIA_RESPONSIVE_WIDTHS),
+            formats=tuple(settings.MEDIA_RESPONSIVE_FORMATS),
+        )
+        submitted = []
+        for job in batch:
+            media = job.media
+            if not media.needs_derivatives:
+                submitted.append((job, None))
+                continue
+            try:
+                with media.file.open("rb") as source_file:
+                    source = source_file.read()
+            except Exception as exc:
+                submitted.append((job, exc))
+                continue
+            if executor is None:
+                try:
+                    submitted.append((job, render(source)))
+                except Exception as exc:
+                    submitted.append((job, exc))
+            else:
+                submitted.append((job, executor.submit(render, source)))
+
+        for job, outcome in submitted:
+            if hasattr(outcome, "result"):
+                try:
+                    outcome = outcome.result()
+                except Exception as exc:
+                    outcome = exc
+            yield job, outcome
+
+    @staticmethod
+    def _finish(job, outcome, max_attempts):
+        error = ""
+        if isinstance(outcome, Exception):
+            error = type(outcome).__name__
+        elif outcome is not None and not job.media.store_derivatives(outcome):
+            error = "StorageWriteFailed"
+
+        if not error:
+            job.state = ThumbnailJob.State.DONE
+        elif job.attempts >= max_attempts:
+            job.state = ThumbnailJob.State.FAILED
+        else:
+            job.state = ThumbnailJob.State.PENDING
+        job.last_error = error
+        job.save(update_fields=["state", "last_error", "updated_at"])
+        return job.state
@@ -7,9 +7,12 @@ from pathlib import Path
 from django.core.management.base import BaseCommand, CommandError
 
 from blog.content_import import collect_broken_local_links, collect_local_media_references
+from blog.content_import.file_transfer import LINK_MODES
+from blog.content_import.vault_index import vault_index_run
 from blog.models import Post
 from blog.content_import.obsidian import title_from_leading_h1
 from blog.services.obsidian_importer import import_obsidian_note_to_post, split_frontmatter
+from blog.similarity import find_near_duplicates
 from blog.slug_utils import build_slug
 
 
@@ -57,6 +60,15 @@ class Command(BaseCommand):
             action="store_true",
             help="Delete an existing post with the same slug before import.",
         )
+        parser.add_argument(
+            "--link-mode",
+            choices=LINK_MODES,
+            default="copy",
+            help=(
+                "Place assets in a filesystem MEDIA_ROOT by hard link ('link') or "
+                "copy-on-write clone ('reflink') instead of copying."
+            ),
+        )
         parser.add_argument(
             "--check-links",
             action="store_true",
@@ -64,6 +76,7 @@ class Command(BaseCommand):
             help="Validate local Markdown/Obsidian media links and exit without creating a post.",
         )
 
+    @vault_index_run()
     def handle(self, *args, **options):
         note_path: Path = options["note"].expanduser().resolve()
         assets_dir: Path = (options["assets_dir"] or note_path.parent).expanduser().resolve()
@@ -116,10 +129,14 @@ class Command(BaseCommand):
                 description=options["description"],
                 content_type=options["content_type"],
                 media_url=options["media_url"],
+                link_mode=options["link_mode"],
             )
         except ValueError as exc:
             raise CommandError(str(exc)) from exc
 
+        for filename, method in post.media_transfers:
+            self.stdout.write(f"media: {filename} ({method})")
+
         media_counts = {}
         for media in post.media_files.all():
             media_counts[media.media_type] = media_counts.get(media.media_type, 0) + 1
@@ -133,3 +150,5 @@ class Command(BaseCommand):
                 f"media={post.media_files.count()}, media_by_type={media_counts}"
             )
         )
+        for duplicate, score in find_near_duplicates(post.title, post.content, exclude=[post.pk]):
+            self.stdout.write(self.style.WARNING(f"near_duplicate: slug={duplicate.slug} score={score:.2f}"))
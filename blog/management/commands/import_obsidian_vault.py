@@ -0,0 +1,120 @@
+"""Import every publishable note of an Obsidian vault in one run.
+
+Usage:
+    uv run python manage.py import_obsidian_vault ~/Obsidian/Vault --dry-run
+    uv run python manage.py import_obsidian_vault ~/Obsidian/Vault --include "10_Lessons/*" --workers 4
+    uv run python manage.py import_obsidian_vault ~/Obsidian/Vault --sync
+
+A note is publishable when its frontmatter has ``description`` (the same
+requirement as ``import_obsidian_note``); other notes are reported as skipped.
+Assets resolve like ``collect_note_assets --vault-root``: note-relative,
+vault-relative, then by name through one shared vault index.
+
+``--sync`` updates existing posts in place when the note or its assets
+changed and skips unchanged notes, so nightly runs cost is proportional to
+the edits rather than the vault size.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.content_import.file_transfer import LINK_MODES
+from blog.content_import.vault_import import import_vault
+
+
+class Command(BaseCommand):
+    help = "Import all publishable notes of an Obsidian vault with parallel parsing and batched writes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("vault", type=Path, help="Obsidian vault root")
+        parser.add_argument(
+            "--include",
+            action="append",
+            default=None,
+            help="Vault-relative glob for notes to import, e.g. '10_Lessons/*'. Repeatable.",
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete and re-import posts whose slug already exists.",
+        )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Update existing posts whose note or assets changed; skip unchanged notes.",
+        )
+        parser.add_argument(
+            "--index-cache",
+            type=Path,
+            default=None,
+            help="JSON file to persist the vault name index between runs.",
+        )
+        parser.add_argument(
+            "--link-mode",
+            choices=LINK_MODES,
+            default="copy",
+            help=(
+                "Place assets in a filesystem MEDIA_ROOT by hard link ('link') or "
+                "copy-on-write clone ('reflink'), falling back to a kernel copy."
+            ),
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Print the import plan without writing.")
+
+    def handle(self, *args, **options):
+        vault_root: Path = options["vault"].expanduser().resolve()
+        if not vault_root.is_dir():
+            raise CommandError(f"Vault directory not found: {vault_root}")
+        if options["workers"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--workers and --batch-size must be positive")
+        if options["replace"] and options["sync"]:
+            raise CommandError("--replace and --sync are mutually exclusive")
+
+        report = import_vault(
+            vault_root,
+            include=options["include"],
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            replace=options["replace"],
+            sync=options["sync"],
+            dry_run=options["dry_run"],
+            index_cache=options["index_cache"],
+            link_mode=options["link_mode"],
+        )
+
+        if options["dry_run"]:
+            for plan in report.plans:
+                media = len(plan.references) + int(plan.cover_path is not None)
+                self.stdout.write(
+                    f"plan: {plan.action} slug={plan.note.slug} note={plan.note.relative_path} "
+                    f"media={media} tags={len(plan.note.tag_names)}"
+                )
+        for slug, filename, method in report.transfers:
+            self.stdout.write(f"media: {slug}: {filename} ({method})")
+        for relative_path, reason in report.skipped:
+            self.stdout.write(f"skipped: {relative_path}: {reason}")
+        for relative_path, message in report.errors:
+            self.stderr.write(f"error: {relative_path}: {message}")
+
+        if options["dry_run"]:
+            summary = (
+                f"notes={report.notes} create={sum(p.action == 'create' for p in report.plans)} "
+                f"replace={sum(p.action == 'replace' for p in report.plans)} "
+                f"skipped={len(report.skipped)} errors={len(report.errors)} "
+                f"update={sum(p.action == 'update' for p in report.plans)} "
+                f"unchanged={report.unchanged} dry_run=True"
+            )
+        else:
+            summary = (
+                f"notes={report.notes} created={report.created} replaced={report.replaced} "
+                f"skipped={len(report.skipped)} errors={len(report.errors)} media={report.media} "
+                f"updated={report.updated} unchanged={report.unchanged} dry_run=False"
+            )
+        if report.errors:
+            raise CommandError("Vault import finished with errors: " + summary)
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,77 @@
+"""Recompute text vectors and the precomputed related-posts table from scratch.
+
+Usage:
+    uv run python manage.py rebuild_related_posts
+    uv run python manage.py rebuild_related_posts --if-missing
+    uv run python manage.py rebuild_related_posts --pending
+
+Saves, deletes, tag changes and vault imports keep ``RelatedPost`` current
+incrementally; run the command after deploying the table, after bulk edits
+through ``QuerySet.update`` or when tuning the weights in ``blog/related.py``
+or the tokenizer in ``blog/similarity.py``.
+
+``--if-missing`` is the deploy-time backfill: it only vectorizes posts without
+a ``PostTextVector`` and rebuilds the table when something was missing, so it
+is a cheap no-op on every later release.
+
+``--pending`` is the worker for ``RELATED_POSTS_DEFERRED``: it refreshes only
+the posts queued in ``RelatedRefreshJob`` by saves, deletes and tag changes
+(run it from a timer, see ``deploy/systemd/django-6-blog-related-posts.timer``).
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, RelatedPost
+from blog.related import rebuild_related_posts, refresh_pending_related_posts
+from blog.similarity import store_text_vectors
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = "Recompute stored related posts for every published post."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-missing",
+            action="store_true",
+            help="Only backfill posts without text vectors and an empty related table.",
+        )
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="Only refresh posts queued while RELATED_POSTS_DEFERRED is on.",
+        )
+
+    def handle(self, *args, **options):
+        if options["pending"]:
+            pending, written = refresh_pending_related_posts()
+            self.stdout.write(f"pending={pending} links={written}")
+            return
+
+        candidates = Post.objects.only("pk", "title", "content").order_by("pk")
+        before = RelatedPost.objects.count()
+        if options["if_missing"]:
+            candidates = candidates.filter(text_vector__isnull=True)
+            public = Post.objects.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)
+            if not candidates.exists() and (before or not public.exists()):
+                posts = RelatedPost.objects.values("post_id").distinct().count()
+                self.stdout.write(f"posts={posts} links=0 previous_links={before} vectors=0 rebuilt=no")
+                return
+
+        vectors = 0
+        batch: list[Post] = []
+        for post in candidates.iterator(chunk_size=BATCH_SIZE):
+            batch.append(post)
+            if len(batch) == BATCH_SIZE:
+                vectors += store_text_vectors(batch)
+                batch.clear()
+        vectors += store_text_vectors(batch)
+
+        written = rebuild_related_posts()
+        posts = RelatedPost.objects.values("post_id").distinct().count()
+        self.stdout.write(
+            self.style.SUCCESS(f"posts={posts} links={written} previous_links={before} vectors={vectors} rebuilt=yes")
+        )
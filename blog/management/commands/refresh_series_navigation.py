@@ -0,0 +1,28 @@
+"""Recompute denormalized series positions, totals and prev/next links.
+
+Usage:
+    uv run python manage.py refresh_series_navigation
+
+Saves, deletes and admin status actions keep the navigation current; run the
+command after deploying the columns or after bulk edits through
+``QuerySet.update`` that move posts between series or change their status.
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, Series
+from blog.series import refresh_series_positions
+
+
+class Command(BaseCommand):
+    help = "Recompute series positions and prev/next links for every post."
+
+    def handle(self, *args, **options):
+        cleared = Post.objects.filter(series__isnull=True, series_position__gt=0).update(
+            series_position=0, series_total=0, series_prev=None, series_next=None
+        )
+        series_ids = list(Series.objects.values_list("pk", flat=True))
+        updated = refresh_series_positions(series_ids)
+        self.stdout.write(self.style.SUCCESS(f"series={len(series_ids)} updated={updated} cleared={cleared}"))
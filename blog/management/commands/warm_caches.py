@@ -0,0 +1,59 @@
+"""Render the post list, feeds, sitemaps and the most viewed posts after a deploy.
+
+Usage:
+    uv run python manage.py warm_caches
+    uv run python manage.py warm_caches --top 50 --threads 8
+    uv run python manage.py warm_caches --base-url http://127.0.0.1:8036 --host example.com
+
+Without ``--base-url`` pages are rendered in this process and fill the shared
+cache. With ``--base-url`` they are requested from the running site, which
+also warms each Gunicorn worker's templates and imports; ``--host`` must be
+the public host, since cached fragments are keyed by it. Prints one line per
+page and a summary; exits non-zero when any page failed.
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.warmup import http_fetcher, in_process_fetcher, warm, warmup_paths
+
+
+class Command(BaseCommand):
+    help = "Warm caches by rendering hot pages in parallel threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=20, help="Most viewed posts to render.")
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--base-url", default="", help="Request the running site instead.")
+        parser.add_argument("--host", default="", help="Host header (default: first ALLOWED_HOSTS entry).")
+
+    def handle(self, *args, **options):
+        if options["top"] < 0 or options["threads"] < 1:
+            raise CommandError("--top must not be negative and --threads must be positive")
+        host = options["host"] or next(
+            (host for host in settings.ALLOWED_HOSTS if not host.startswith((".", "*"))), "localhost"
+        )
+        if options["base_url"]:
+            fetch = http_fetcher(options["base_url"], host)
+        else:
+            fetch = in_process_fetcher(host, secure=settings.SECURE_SSL_REDIRECT)
+
+        started = time.perf_counter()
+        results = warm(warmup_paths(options["top"]), fetch, threads=options["threads"])
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        for result in results:
+            self.stdout.write(f"status={result.status} ms={result.ms:.1f} path={result.path}")
+        timings = sorted(result.ms for result in results)
+        failed = [result for result in results if not result.ok]
+        self.stdout.write(
+            f"urls={len(results)} failed={len(failed)} threads={options['threads']} "
+            f"wall_ms={wall_ms:.1f} p50_ms={statistics.median(timings):.1f} max_ms={timings[-1]:.1f}"
+        )
+        if failed:
+            raise CommandError(f"Warm-up failed for {len(failed)} page(s): {failed[0].path}")
@@ -0,0 +1,227 @@
+"""Local filesystem media delivery with byte ranges and conditional requests.
+
+``settings.MEDIA_SERVE_MODE`` selects who moves the bytes:
+
+- ``django`` (default under DEBUG): single ranges are served through
+  ``FileResponse`` so gunicorn's ``wsgi.file_wrapper`` hands the open file to
+  ``os.sendfile`` (zero-copy, no Python chunk loop); multiple ranges are
+  answered as ``multipart/byteranges`` with large read buffers.
+- ``x-accel-redirect``: Django only validates the path and returns an
+  ``X-Accel-Redirect`` header; nginx serves the file from an ``internal``
+  location (see ``deploy/nginx``) with native Range, If-Range and 304 support.
+- ``x-sendfile``: the same for Apache ``mod_xsendfile`` / lighttpd.
+
+The ETag uses nginx's ``"<mtime hex>-<size hex>"`` format, so validators stay
+stable when a deployment switches between modes.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+import stat
+import uuid
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils._os import safe_join
+
+BLOCK_SIZE = 512 * 1024
+MAX_RANGES = 16
+_RANGE_SPEC_RE = re.compile(r"\s*(\d*)\s*-\s*(\d*)\s*")
+
+
+class _FileRange:
+    """Read at most ``length`` bytes from ``start`` while exposing ``fileno``.
+
+    Gunicorn's sendfile path seeks nowhere: it sends ``Content-Length`` bytes
+    from the descriptor's current offset, so the offset is positioned here.
+    Without ``tell``/``seek``/``name`` Django leaves Content-Length to us.
+    """
+
+    def __init__(self, file_obj, start: int, length: int):
+        file_obj.seek(start)
+        self._file = file_obj
+        self._remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        chunk = self._file.read(size)
+        self._remaining -= len(chunk)
+        return chunk
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """Return an nginx-compatible strong ETag for a file."""
+    return f'"{int(stat_result.st_mtime):x}-{stat_result.st_size:x}"'
+
+
+def parse_ranges(header: str, size: int) -> list[tuple[int, int]] | None:
+    """Parse a ``Range`` header into sorted, coalesced inclusive byte ranges.
+
+    Returns:
+        ``None`` when the header is malformed or abusive and must be ignored
+        (full 200 response), ``[]`` when nothing is satisfiable (416).
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+    ranges = []
+    for spec in specs.split(","):
+        match = _RANGE_SPEC_RE.fullmatch(spec)
+        if not match or not any(match.groups()):
+            return None
+        start_text, end_text = match.groups()
+        if not start_text:
+            suffix_length = int(end_text)
+            if suffix_length:
+                ranges.append((max(size - suffix_length, 0), size - 1))
+            continue
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+        if end < start:
+            return None
+        if start < size:
+            ranges.append((start, min(end, size - 1)))
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _if_range_matches(request, etag: str, last_modified: int) -> bool:
+    """Apply ``If-Range``: a stale validator turns a range request into 200."""
+    validator = request.headers.get("If-Range", "").strip()
+    if not validator:
+        return True
+    if validator.startswith(('"', "W/")):
+        return validator == etag
+    return parse_http_date_safe(validator) == last_modified
+
+
+def _iter_multipart(path: Path, ranges, boundary: str, parts):
+    with path.open("rb") as file_obj:
+        for (start, end), part_header in zip(ranges, parts, strict=True):
+            yield part_header
+            file_obj.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = file_obj.read(min(BLOCK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+            yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode("ascii")
+
+
+def _range_response(full_path: Path, ranges, file_size: int, content_type: str):
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        response = FileResponse(
+            _FileRange(full_path.open("rb"), start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response.block_size = BLOCK_SIZE
+        response.headers["Content-Length"] = str(end - start + 1)
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+        return response
+
+    boundary = uuid.uuid4().hex
+    parts = [
+        (
+            f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n"
+        ).encode("ascii")
+        for start, end in ranges
+    ]
+    content_length = (
+        sum(len(part) + end - start + 1 + 2 for part, (start, end) in zip(parts, ranges, strict=True))
+        + len(boundary)
+        + 6
+    )
+    response = StreamingHttpResponse(
+        _iter_multipart(full_path, ranges, boundary, parts),
+        status=206,
+        content_type=f"multipart/byteranges; boundary={boundary}",
+    )
+    response.headers["Content-Length"] = str(content_length)
+    return response
+
+
+def serve_media(request, path: str, document_root: str | Path):
+    """Serve a file under ``document_root`` honoring Range and conditionals."""
+    try:
+        full_path = Path(safe_join(document_root, path))
+    except ValueError as exc:
+        raise Http404("Media path is outside MEDIA_ROOT") from exc
+    try:
+        stat_result = full_path.stat()
+    except OSError as exc:
+        raise Http404("Media file not found") from exc
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404("Media file not found")
+
+    mode = getattr(settings, "MEDIA_SERVE_MODE", "") or "django"
+    content_type = mimetypes.guess_type(full_path.name)[0] or "application/octet-stream"
+    if mode == "x-accel-redirect":
+        relative = Path(os.path.relpath(full_path, os.path.abspath(document_root))).as_posix()
+        response = HttpResponse(content_type=content_type)
+        response.headers["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(relative)
+        return response
+    if mode == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response.headers["X-Sendfile"] = str(full_path)
+        return response
+
+    etag = file_etag(stat_result)
+    last_modified = int(stat_result.st_mtime)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="{full_path.name}"',
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+    }
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        for header_name, header_value in headers.items():
+            conditional.headers[header_name] = header_value
+        return conditional
+
+    file_size = stat_result.st_size
+    range_header = request.headers.get("Range", "")
+    ranges = None
+    if range_header and _if_range_matches(request, etag, last_modified):
+        ranges = parse_ranges(range_header, file_size)
+    if ranges == []:
+        response = HttpResponse(status=416, headers={"Content-Range": f"bytes */{file_size}"})
+    elif ranges:
+        response = _range_response(full_path, ranges, file_size, content_type)
+    else:
+        response = FileResponse(full_path.open("rb"), content_type=content_type)
+        response.block_size = BLOCK_SIZE
+        response.headers["Content-Length"] = str(file_size)
+    for header_name, header_value in headers.items():
+        response.headers[header_name] = header_value
+    return response
@@ -0,0 +1,141 @@
+"""Storage URL resolution for media files: batched, templated and cached.
+
+``FieldFile.url`` asks the storage backend for every URL. On S3 that is a
+boto ``generate_presigned_url`` call — a few milliseconds each, signed or
+not — so a page with dozens of images spent most of its render time there.
+
+``media_url`` resolves one file, ``prime_media_urls`` a whole page at once:
+
+* public S3 buckets (``querystring_auth`` off) build URLs from a per-storage
+  string template derived once from a sentinel key; the storage client is
+  not touched again;
+* signed URLs (``MEDIA_S3_SIGNED_URLS``) are cached in the Django cache for
+  ``SIGNED_URL_CACHE_FRACTION`` of ``querystring_expire``, so a cached URL is
+  always served with the rest of its lifetime left; a page reads them with
+  one ``get_many`` and signs only the misses;
+* other backends (filesystem, test storages) keep calling ``storage.url``.
+
+Results are memoized on the ``FieldFile`` itself, so a URL used twice in one
+render (card and JSON-LD, srcset and fallback) is resolved once.
+Fragments that embed URLs must not outlive them: cap their timeouts with
+``embeddable_timeout``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from urllib.parse import quote
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils.encoding import filepath_to_uri
+
+from .cache_keys import namespace_version, versioned_key
+
+SIGNED_URL_CACHE_FRACTION = 0.5
+_SENTINEL = "__media_url_template__"
+_MEMO_ATTR = "_resolved_media_url"
+_templates: dict[int, tuple[object, str, str, bool]] = {}
+
+
+def _is_signed(storage) -> bool:
+    return bool(getattr(storage, "querystring_auth", False))
+
+
+def _is_s3(storage) -> bool:
+    return hasattr(storage, "querystring_auth") and hasattr(storage, "bucket_name")
+
+
+def _template(storage) -> tuple[str, str, bool]:
+    """Return ``(prefix, suffix, custom_domain)`` for an unsigned S3 storage."""
+    entry = _templates.get(id(storage))
+    if entry is None or entry[0] is not storage:
+        prefix, _, suffix = storage.url(_SENTINEL).partition(_SENTINEL)
+        entry = _templates[id(storage)] = (storage, prefix, suffix, bool(getattr(storage, "custom_domain", None)))
+    return entry[1:]
+
+
+def _templated_url(storage, name: str) -> str:
+    prefix, suffix, custom_domain = _template(storage)
+    # The same quoting django-storages (custom domain) and botocore apply.
+    quoted = filepath_to_uri(name) if custom_domain else quote(name, safe="/~")
+    return f"{prefix}{quoted}{suffix}"
+
+
+def _signed_key(storage, name: str, version: int) -> str:
+    digest = hashlib.sha256(f"{storage.bucket_name}:{getattr(storage, 'location', '')}:{name}".encode())
+    return versioned_key("media_url", "signed", digest.hexdigest()[:32], version=version)
+
+
+def signed_url_cache_timeout(storage=None) -> int | None:
+    """Seconds a signed URL stays in the cache; ``None`` when URLs are not signed."""
+    storage = storage or default_storage
+    if not _is_signed(storage):
+        return None
+    return max(1, int(storage.querystring_expire * SIGNED_URL_CACHE_FRACTION))
+
+
+def embeddable_timeout(timeout: int, storage=None) -> int:
+    """Cap the timeout of cached HTML/XML that embeds media URLs.
+
+    A URL taken from the cache has at least ``querystring_expire -
+    signed_url_cache_timeout`` seconds to live; a fragment holding it must
+    expire before that.
+    """
+    storage = storage or default_storage
+    cached = signed_url_cache_timeout(storage)
+    if cached is None:
+        return timeout
+    return max(1, min(timeout, storage.querystring_expire - cached))
+
+
+def _memo(file) -> str | None:
+    # Keyed by name: saving a new file into the same FieldFile changes it.
+    name, url = getattr(file, _MEMO_ATTR, (None, None))
+    return url if name == file.name else None
+
+
+def _remember(file, url: str) -> str:
+    setattr(file, _MEMO_ATTR, (file.name, url))
+    return url
+
+
+def prime_media_urls(files: Iterable) -> None:
+    """Resolve URLs of many ``FieldFile`` objects with one cache round trip."""
+    pending = []
+    for file in files:
+        if not file or _memo(file) is not None:
+            continue
+        if _is_signed(file.storage):
+            pending.append(file)
+        else:
+            media_url(file)
+    if not pending:
+        return
+    version = namespace_version("media_url")
+    keys = [_signed_key(file.storage, file.name, version) for file in pending]
+    cached = cache.get_many(list(set(keys)))
+    signed: dict[int, dict[str, str]] = {}
+    for file, key in zip(pending, keys, strict=True):
+        url = cached.get(key)
+        if url is None:
+            url = cached[key] = file.storage.url(file.name)
+            signed.setdefault(signed_url_cache_timeout(file.storage), {})[key] = url
+        _remember(file, url)
+    for timeout, urls in signed.items():
+        cache.set_many(urls, timeout)
+
+
+def media_url(file) -> str:
+    """Return the public URL of a ``FieldFile`` (``""`` when empty)."""
+    if not file:
+        return ""
+    url = _memo(file)
+    if url is not None:
+        return url
+    storage = file.storage
+    if _is_signed(storage):
+        prime_media_urls([file])
+        return _memo(file)
+    return _remember(file, _templated_url(storage, file.name) if _is_s3(storage) else storage.url(file.name))
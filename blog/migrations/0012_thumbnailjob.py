@@ -0,0 +1,31 @@
+# Generated by Django 6.0.9 on 2026-10-19 07:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_platform_hardening'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThumbnailJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('pending', 'Ожидает'), ('running', 'В работе'), ('done', 'Готово'), ('failed', 'Ошибка')], db_index=True, default='pending', max_length=16, verbose_name='Состояние')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('last_error', models.CharField(blank=True, max_length=255, verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('media', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='thumbnail_job', to='blog.postmedia', verbose_name='Медиафайл')),
+            ],
+            options={
+                'verbose_name': 'Задача превью',
+                'verbose_name_plural': 'Задачи превью',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.9 on 2026-10-19 07:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_thumbnailjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postmedia',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота'),
+        ),
+        migrations.AddField(
+            model_name='postmedia',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина'),
+        ),
+        migrations.CreateModel(
+            name='PostMediaDerivative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('avif', 'AVIF'), ('webp', 'WebP')], max_length=8, verbose_name='Формат')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('file', models.FileField(upload_to='posts/derivatives/', verbose_name='Файл')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('media', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='derivatives', to='blog.postmedia', verbose_name='Медиафайл')),
+            ],
+            options={
+                'verbose_name': 'Адаптивная версия изображения',
+                'verbose_name_plural': 'Адаптивные версии изображений',
+                'ordering': ['format', 'width'],
+                'constraints': [models.UniqueConstraint(fields=('media', 'format', 'width'), name='unique_media_derivative_per_width')],
+            },
+        ),
+    ]
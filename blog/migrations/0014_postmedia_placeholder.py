@@ -0,0 +1,23 @@
+# Generated by Django 6.0.9 on 2026-10-19 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_postmedia_responsive_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postmedia',
+            name='dominant_color',
+            field=models.CharField(blank=True, default='', editable=False, max_length=7, verbose_name='Основной цвет'),
+        ),
+        migrations.AddField(
+            model_name='postmedia',
+            name='lqip',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='LQIP-заглушка (data URI)'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.9 on 2026-10-19 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_postmedia_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='source_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='sha256 заметки и её вложений на момент последней синхронизации.', max_length=64, verbose_name='Хэш исходника'),
+        ),
+        migrations.AddField(
+            model_name='postmedia',
+            name='sha256',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='sha256 исходного файла'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.9 on 2026-10-19 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_sync_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Превью'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='heading_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Заголовков'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Время чтения, мин'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Слов'),
+        ),
+    ]
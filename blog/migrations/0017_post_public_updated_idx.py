@@ -0,0 +1,17 @@
+# Generated by Django 6.0.9 on 2026-10-19 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_text_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'deleted_at', 'updated_at'], name='post_public_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.9 on 2026-10-19 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_public_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'deleted_at', 'created_at', 'id'], name='post_public_created_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.9 on 2026-10-19 08:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_related_post'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTextVector',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='text_vector', serialize=False, to='blog.post', verbose_name='Пост')),
+                ('terms', models.JSONField(default=dict, verbose_name='Термы')),
+            ],
+            options={
+                'verbose_name': 'Текстовый вектор поста',
+                'verbose_name_plural': 'Текстовые векторы постов',
+            },
+        ),
+    ]
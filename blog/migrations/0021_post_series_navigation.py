@@ -0,0 +1,34 @@
+# Generated by Django 6.0.9 on 2026-10-19 08:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_post_text_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='series_next',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.post', verbose_name='Следующий в серии'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='series_position',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Позиция в серии'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='series_prev',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.post', verbose_name='Предыдущий в серии'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='series_total',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Постов в серии'),
+        ),
+    ]
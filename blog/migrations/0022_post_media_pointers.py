@@ -0,0 +1,42 @@
+# Generated by Django 6.0.9 on 2026-10-19 08:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+PRIMARY_MEDIA_TYPES = {"video": "video", "audio": "audio", "podcast": "audio"}
+
+
+def fill_media_pointers(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    PostMedia = apps.get_model("blog", "PostMedia")
+    first = {}
+    for post_id, media_id, media_type in PostMedia.objects.order_by("created_at", "pk").values_list(
+        "post_id", "pk", "media_type"
+    ):
+        first.setdefault((post_id, media_type), media_id)
+    posts = list(Post.objects.filter(media_files__isnull=False).distinct().only("pk", "content_type"))
+    for post in posts:
+        post.cover_media_id = first.get((post.pk, "image"))
+        post.primary_media_id = first.get((post.pk, PRIMARY_MEDIA_TYPES.get(post.content_type)))
+    Post.objects.bulk_update(posts, ["cover_media", "primary_media"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_post_series_navigation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='cover_media',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.postmedia', verbose_name='Обложка'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='primary_media',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.postmedia', verbose_name='Основное медиа'),
+        ),
+        migrations.RunPython(fill_media_pointers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from itertools import groupby
+
+from django.db import migrations
+
+SERIES_ORDERING = ("series_order", "created_at", "pk")
+NAVIGATION_FIELDS = ["series_position", "series_total", "series_prev", "series_next"]
+
+
+def fill_series_navigation(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    members = (
+        Post.objects.filter(series__isnull=False)
+        .order_by("series_id", *SERIES_ORDERING)
+        .only("pk", "series_id", "status", "deleted_at", *NAVIGATION_FIELDS)
+    )
+    changed = []
+    for _series_id, posts in groupby(members, key=lambda post: post.series_id):
+        posts = list(posts)
+        public = [post for post in posts if post.status == "published" and post.deleted_at is None]
+        navigation = {
+            post.pk: (
+                index + 1,
+                len(public),
+                public[index - 1].pk if index else None,
+                public[index + 1].pk if index + 1 < len(public) else None,
+            )
+            for index, post in enumerate(public)
+        }
+        for post in posts:
+            values = navigation.get(post.pk, (0, 0, None, None))
+            if (post.series_position, post.series_total, post.series_prev_id, post.series_next_id) != values:
+                post.series_position, post.series_total, post.series_prev_id, post.series_next_id = values
+                changed.append(post)
+    Post.objects.bulk_update(changed, NAVIGATION_FIELDS, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_post_media_pointers'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_series_navigation, migrations.RunPython.noop),
+    ]
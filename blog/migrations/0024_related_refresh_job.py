@@ -0,0 +1,25 @@
+# Generated by Django 6.0.9 on 2026-10-19 09:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0023_backfill_series_navigation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedRefreshJob',
+            fields=[
+                ('post_id', models.PositiveIntegerField(primary_key=True, serialize=False, verbose_name='ID поста')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Задача пересчёта похожих постов',
+                'verbose_name_plural': 'Задачи пересчёта похожих постов',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -1,8 +1,10 @@
 import logging
+import math
 import re
-from io import BytesIO
+from datetime import timedelta
 from pathlib import PurePath
 
+from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
@@ -12,14 +14,69 @@ from django.urls import reverse
 from django.utils.html import strip_tags
 from django.utils.text import Truncator
 
-from PIL import Image, ImageOps
-
+from blog.cache_keys import versioned_key
+from blog.content_import.markdown_tokens import (
+    EMBED,
+    FENCE,
+    FRONTMATTER,
+    IMAGE,
+    LINK,
+    WIKILINK,
+    tokenize,
+)
 from blog.content_import.timecodes import time_to_seconds
+from blog.media_urls import media_url, prime_media_urls
 from blog.services import convert_markdown_to_html
 from blog.slug_utils import build_slug, build_unique_slug
+from blog.thumbnails import (
+    RESPONSIVE_MIME_TYPES,
+    THUMBNAIL_SUFFIXES,
+    render_derivatives,
+    render_thumbnails,
+    responsive_widths,
+    supported_formats,
+    thumbnail_bytes,
+)
 
 logger = logging.getLogger("blog.models")
 
+# Preview cleanup: frontmatter, code and media become a gap, links keep their text.
+EXCERPT_TOKEN_KINDS = (FRONTMATTER, FENCE, EMBED, WIKILINK, IMAGE, LINK)
+EXCERPT_TABLE_ROW_RE = re.compile(r"(?m)^\s*\|.*\|\s*$")
+EXCERPT_LINE_PREFIX_RE = re.compile(r"(?m)^(?:\s{0,3}(?:#{1,6}\s*|>\s?)|\s*[-*+]\s+)+")
+HEADING_RE = re.compile(r"(?m)^\s{0,3}#{1,6}\s+\S")
+EXCERPT_WORDS = 42
+READING_WORDS_PER_MINUTE = 180
+
+
+def _excerpt_token_text(token):
+    return token.label if token.kind == LINK else " "
+
+
+def compute_text_stats(title, content):
+    """Return ``excerpt``, ``word_count``, ``reading_time`` and ``heading_count`` for a body.
+
+    The excerpt is a clean preview without raw Markdown, Obsidian embeds, or
+    HTML tags; counts ignore code blocks, media and frontmatter. Reading time
+    is whole minutes (at least 1 for a non-empty body).
+    """
+    text = tokenize(content or "").rewrite(_excerpt_token_text, EXCERPT_TOKEN_KINDS)
+    heading_count = len(HEADING_RE.findall(text))
+    text = EXCERPT_TABLE_ROW_RE.sub(" ", text)
+    text = EXCERPT_LINE_PREFIX_RE.sub("", text)
+    text = strip_tags(text)
+    text = re.sub(r"[#*_>`~\-]{2,}", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    word_count = len(text.split())
+    if title and text.lower().startswith(title.lower()):
+        text = text[len(title) :].strip(" —-:·")
+    return {
+        "excerpt": Truncator(text).words(EXCERPT_WORDS),
+        "word_count": word_count,
+        "reading_time": math.ceil(word_count / READING_WORDS_PER_MINUTE),
+        "heading_count": heading_count,
+    }
+
 
 def format_ru_count(value, forms):
     """Return a Russian pluralized counter label, e.g. '21 просмотр'."""
@@ -182,6 +239,31 @@ class Post(models.Model):
         verbose_name="Порядок в серии",
         help_text="Порядковый номер поста в серии (0, 1, 2, ...).",
     )
+    # Denormalized by ``blog.series.refresh_series_positions``.
+    series_position = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Позиция в серии"
+    )
+    series_total = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Постов в серии"
+    )
+    series_prev = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+        verbose_name="Предыдущий в серии",
+    )
+    series_next = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+        verbose_name="Следующий в серии",
+    )
     tags = models.ManyToManyField(
         Tag,
         blank=True,
@@ -212,6 +294,14 @@ class Post(models.Model):
         verbose_name="Внешний ID",
         help_text="Идемпотентный ключ для агентских публикаций.",
     )
+    source_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name="Хэш исходника",
+        help_text="sha256 заметки и её вложений на момент последней синхронизации.",
+    )
     published_at = models.DateTimeField(
         null=True,
         blank=True,
@@ -231,11 +321,49 @@ class Post(models.Model):
         verbose_name="Удалён",
         help_text="Soft delete timestamp. Null = active.",
     )
+    excerpt = models.TextField(blank=True, default="", editable=False, verbose_name="Превью")
+    word_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Слов")
+    reading_time = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name="Время чтения, мин",
+    )
+    heading_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Заголовков")
+    # Maintained by ``refresh_media_pointers`` so cards and JSON-LD can
+    # ``select_related`` the one media row they show.
+    cover_media = models.ForeignKey(
+        "PostMedia",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+        verbose_name="Обложка",
+    )
+    primary_media = models.ForeignKey(
+        "PostMedia",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+        verbose_name="Основное медиа",
+    )
+
+    # Filled by ``refresh_text_stats`` on save; ``backfill_post_stats`` for old rows.
+    TEXT_STATS_FIELDS = ["excerpt", "word_count", "reading_time", "heading_count"]
 
     class Meta:
         ordering = ["-created_at"]
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
+        indexes = [
+            # Feed/sitemap freshness stamp: Max(updated_at) over published posts.
+            models.Index(fields=["status", "deleted_at", "updated_at"], name="post_public_updated_idx"),
+            # Public list order and load-more keyset: (created_at, pk) descending.
+            models.Index(fields=["status", "deleted_at", "created_at", "id"], name="post_public_created_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -290,34 +418,45 @@ class Post(models.Model):
                 )
 
     @property
-    def cover_media(self):
-        """Return the first attached image as the public cover for list/detail UI."""
-        prefetched_media = getattr(self, "_prefetched_objects_cache", {}).get("media_files")
-        if prefetched_media is not None:
-            return next(
-                (media for media in prefetched_media if media.media_type == PostMedia.MediaType.IMAGE),
-                None,
-            )
-        return self.media_files.filter(media_type=PostMedia.MediaType.IMAGE).first()
-
-    @property
-    def primary_media(self):
-        """Return the first attached media file matching the post content type."""
-        media_type_map = {
+    def primary_media_type(self):
+        """Media type of the player file for this content type (``None`` for articles)."""
+        return {
             self.ContentType.VIDEO: PostMedia.MediaType.VIDEO,
             self.ContentType.AUDIO: PostMedia.MediaType.AUDIO,
             self.ContentType.PODCAST: PostMedia.MediaType.AUDIO,
-        }
-        expected_type = media_type_map.get(self.content_type)
-        if not expected_type:
-            return None
-        prefetched_media = getattr(self, "_prefetched_objects_cache", {}).get("media_files")
-        if prefetched_media is not None:
-            return next(
-                (media for media in prefetched_media if media.media_type == expected_type),
-                None,
-            )
-        return self.media_files.filter(media_type=expected_type).first()
+        }.get(self.content_type)
+
+    @classmethod
+    def refresh_media_pointers(cls, post_ids, *, instances=()):
+        """Point ``cover_media``/``primary_media`` at the first matching media rows.
+
+        The cover is the first image by ``created_at``, the primary media the
+        first file of ``primary_media_type``. Costs two queries plus one
+        ``bulk_update`` of the rows that changed. ``instances`` are in-memory
+        posts to keep in sync, so a later full ``save()`` does not write stale
+        pointers back.
+        """
+        posts = list(
+            cls.objects.filter(pk__in=set(post_ids)).only("pk", "content_type", "cover_media", "primary_media")
+        )
+        first = {}
+        media = PostMedia.objects.filter(post__in=posts).order_by("created_at", "pk")
+        for post_id, media_id, media_type in media.values_list("post_id", "pk", "media_type"):
+            first.setdefault((post_id, media_type), media_id)
+        changed = []
+        pointers = {}
+        for post in posts:
+            cover_id = first.get((post.pk, PostMedia.MediaType.IMAGE))
+            primary_id = first.get((post.pk, post.primary_media_type))
+            pointers[post.pk] = (cover_id, primary_id)
+            if (post.cover_media_id, post.primary_media_id) != (cover_id, primary_id):
+                post.cover_media_id, post.primary_media_id = cover_id, primary_id
+                changed.append(post)
+        cls.objects.bulk_update(changed, ["cover_media", "primary_media"])
+        for post in instances:
+            if post.pk in pointers:
+                post.cover_media_id, post.primary_media_id = pointers[post.pk]
+        return len(changed)
 
     @property
     def player_media_url(self):
@@ -325,7 +464,7 @@ class Post(models.Model):
         if self.media_url:
             return self.media_url
         media = self.primary_media
-        return media.file.url if media else ""
+        return media_url(media.file) if media else ""
 
     @property
     def has_media_player(self):
@@ -347,14 +486,14 @@ class Post(models.Model):
     def body_content_html(self):
         """Return rendered HTML without duplicate title or raw service media embeds.
 
-        The result is cached per-post for 1 hour. The cache is invalidated
-        in ``save()`` so stale HTML is never served after content changes.
+        The result is cached per-post for 1 hour in the ``post_html``
+        namespace (``blog.cache_keys``). The cache is invalidated in
+        ``save()`` so stale HTML is never served after content changes.
         """
         if not self.pk:
             return ""
-        cache_key = f"post:{self.pk}:body_html"
         return cache.get_or_set(
-            cache_key,
+            versioned_key("post_html", self.pk),
             lambda: self._compute_body_content_html(),
             timeout=3600,
         )
@@ -375,24 +514,19 @@ class Post(models.Model):
 
     @property
     def plain_text_excerpt(self):
-        """Return a clean preview without raw Markdown, Obsidian embeds, or HTML tags."""
-        text = self.content or ""
-        text = re.sub(r"(?s)^---.*?---", " ", text)
-        text = re.sub(r"(?s)```.*?```", " ", text)
-        text = re.sub(r"(?m)^\s*\|.*\|\s*$", " ", text)
-        text = re.sub(r"!\[\[[^\]]+\]\]", " ", text)
-        text = re.sub(r"\[\[[^\]]+\]\]", " ", text)
-        text = re.sub(r"!\[[^\]]*\]\([^)]*\)", " ", text)
-        text = re.sub(r"\[([^\]]+)\]\([^)]*\)", r"\1", text)
-        text = re.sub(r"(?m)^\s{0,3}#{1,6}\s*", "", text)
-        text = re.sub(r"(?m)^\s{0,3}>\s?", "", text)
-        text = re.sub(r"(?m)^\s*[-*+]\s+", "", text)
-        text = strip_tags(text)
-        text = re.sub(r"[#*_>`~\-]{2,}", " ", text)
-        text = re.sub(r"\s+", " ", text).strip()
-        if self.title and text.lower().startswith(self.title.lower()):
-            text = text[len(self.title) :].strip(" —-:·")
-        return Truncator(text).words(42)
+        """Return the stored preview; unsaved or not yet backfilled posts compute it."""
+        if self.excerpt or not self.content:
+            return self.excerpt
+        return compute_text_stats(self.title, self.content)["excerpt"]
+
+    def refresh_text_stats(self):
+        """Recompute ``TEXT_STATS_FIELDS`` from ``title`` and ``content``."""
+        for name, value in compute_text_stats(self.title, self.content).items():
+            setattr(self, name, value)
+
+    @property
+    def reading_time_label(self):
+        return f"{self.reading_time} мин чтения"
 
     @property
     def view_count_label(self):
@@ -407,13 +541,22 @@ class Post(models.Model):
         Автоматическая генерация slug и HTML контента при сохранении.
 
         1. Генерирует slug из заголовка (если не указан)
-        2. Конвертирует Markdown → HTML (всегда, при create и update)
+        2. Конвертирует Markdown → HTML (при create и update; при
+           ``update_fields`` без ``content``/``content_html`` — пропускается)
+        3. Пересчитывает превью, число слов, время чтения и заголовки
+           (``TEXT_STATS_FIELDS``) вместе с рендером или сменой ``title``
         """
         if not self.slug:
             self.slug = build_unique_slug(self, self.title, fallback="post")
 
-        if self.content:
+        update_fields = kwargs.get("update_fields")
+        renders = update_fields is None or bool({"content", "content_html"} & set(update_fields))
+        if self.content and renders:
             self.content_html = convert_markdown_to_html(self.content, post=self)
+        if update_fields is None or renders or "title" in update_fields:
+            self.refresh_text_stats()
+            if update_fields is not None:
+                kwargs["update_fields"] = [*update_fields, *self.TEXT_STATS_FIELDS]
 
         # Auto-fill published_at when transitioning to published
         if self.status == self.Status.PUBLISHED and not self.published_at:
@@ -425,7 +568,7 @@ class Post(models.Model):
         # Invalidate cached body_content_html so stale HTML is never served
         # after content changes.
         if self.pk:
-            cache.delete(f"post:{self.pk}:body_html")
+            cache.delete(versioned_key("post_html", self.pk))
 
 
 class PostMedia(models.Model):
@@ -478,6 +621,17 @@ class PostMedia(models.Model):
         null=True,
         verbose_name="Карточное превью (400×300)",
     )
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Ширина")
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Высота")
+    dominant_color = models.CharField(
+        max_length=7, blank=True, default="", editable=False, verbose_name="Основной цвет"
+    )
+    lqip = models.TextField(
+        blank=True, default="", editable=False, verbose_name="LQIP-заглушка (data URI)"
+    )
+    sha256 = models.CharField(
+        max_length=64, blank=True, default="", editable=False, verbose_name="sha256 исходного файла"
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата загрузки")
 
     class Meta:
@@ -500,7 +654,7 @@ class PostMedia(models.Model):
 
     @property
     def markdown_link(self):
-        return f"![{self.original_filename}]({self.file.url})"
+        return f"![{self.original_filename}]({media_url(self.file)})"
 
     def detect_media_type(self):
         extension = PurePath(self.file_slug or self.file.name).suffix.lower()
@@ -517,44 +671,103 @@ class PostMedia(models.Model):
     @property
     def thumbnail_og_url(self):
         """Return OG thumbnail URL if available, falling back to original file."""
-        if self.thumbnail_og:
-            return self.thumbnail_og.url
-        return self.file.url
+        return media_url(self.thumbnail_og or self.file)
 
     @property
     def thumbnail_card_url(self):
         """Return card thumbnail URL if available, falling back to original file."""
-        if self.thumbnail_card:
-            return self.thumbnail_card.url
-        return self.file.url
+        return media_url(self.thumbnail_card or self.file)
 
     @staticmethod
     def _thumbnail_bytes(image, size, quality=85):
         """Render one derivative from an already decoded image."""
-        derivative = ImageOps.fit(
-            image, size, method=Image.LANCZOS, centering=(0.5, 0.4)
-        )
-        buffer = BytesIO()
-        derivative.save(buffer, format="JPEG", quality=quality, optimize=True)
-        return buffer.getvalue()
+        return thumbnail_bytes(image, size, quality)
 
     def _generate_thumbnails(self):
         """Open and decode the source exactly once for both derivatives."""
         with self.file.open("rb") as source_file:
-            with Image.open(source_file) as image:
-                image = image.convert("RGB")
-                return {
-                    "thumbnail_og": self._thumbnail_bytes(image, (1200, 630)),
-                    "thumbnail_card": self._thumbnail_bytes(image, (400, 300)),
-                }
+            return render_thumbnails(source_file)
 
     def _generate_thumbnail(self, size, quality=85):
         """Compatibility helper that remains path-free for one derivative."""
+        from PIL import Image
+
         with self.file.open("rb") as source_file:
             with Image.open(source_file) as image:
                 image = image.convert("RGB")
                 return ContentFile(self._thumbnail_bytes(image, size, quality))
 
+    @property
+    def is_raster_image(self):
+        """Return True for images Pillow can decode (SVG is served as is)."""
+        if self.media_type != self.MediaType.IMAGE or not self.file:
+            return False
+        extension = PurePath(self.file_slug or self.file.name).suffix.lower()
+        return extension != ".svg"
+
+    @property
+    def needs_derivatives(self):
+        """Return True while a thumbnail or a configured variant is missing."""
+        if not self.is_raster_image:
+            return False
+        if not (self.thumbnail_og and self.thumbnail_card) or not self.width:
+            return True
+        expected = {
+            (image_format, width)
+            for image_format in supported_formats(settings.MEDIA_RESPONSIVE_FORMATS)
+            for width in responsive_widths(self.width, settings.MEDIA_RESPONSIVE_WIDTHS)
+        }
+        if not expected:
+            return False
+        existing = {(item.format, item.width) for item in self.derivatives.all()}
+        return not expected <= existing
+
+    @property
+    def responsive_sources(self):
+        """Return ``[(mime_type, srcset), ...]`` for stored variants, AVIF first."""
+        by_format = {}
+        derivatives = sorted(self.derivatives.all(), key=lambda item: item.width)
+        prime_media_urls(item.file for item in derivatives)
+        for item in derivatives:
+            by_format.setdefault(item.format, []).append(f"{media_url(item.file)} {item.width}w")
+        return [
+            (mime_type, ", ".join(by_format[image_format]))
+            for image_format, mime_type in RESPONSIVE_MIME_TYPES.items()
+            if image_format in by_format
+        ]
+
+    @property
+    def placeholder_style(self):
+        """Inline CSS painting the dominant colour and blurred LQIP until load."""
+        if not self.dominant_color:
+            return ""
+        style = f"background-color:{self.dominant_color}"
+        if self.lqip:
+            style += f";background-image:url({self.lqip});background-size:cover"
+        return style
+
+    @property
+    def stored_names(self):
+        """Return storage names of the original and every generated derivative."""
+        names = [self.file.name, self.thumbnail_og.name, self.thumbnail_card.name]
+        names.extend(item.file.name for item in self.derivatives.all())
+        return [name for name in names if name]
+
+    def order_first(self):
+        """Sort this row before the post's other media.
+
+        ``Post.cover_media`` is the first image by ``created_at``; a cover
+        re-uploaded during sync must not fall behind the media rows it kept.
+        """
+        earliest = (
+            PostMedia.objects.filter(post_id=self.post_id)
+            .exclude(pk=self.pk)
+            .aggregate(earliest=models.Min("created_at"))["earliest"]
+        )
+        if earliest is not None and earliest <= self.created_at:
+            self.created_at = earliest - timedelta(microseconds=1)
+            PostMedia.objects.filter(pk=self.pk).update(created_at=self.created_at)
+
     def save(self, *args, **kwargs):
         if self.file and not self.original_filename:
             self.original_filename = PurePath(self.file.name).name
@@ -563,29 +776,115 @@ class PostMedia(models.Model):
         self.media_type = self.detect_media_type()
         super().save(*args, **kwargs)
 
-        # Generate thumbnails for images after the initial save, but avoid
-        # recursion and skip SVG (Pillow cannot open SVG) and any file that
-        # Pillow cannot read (e.g. test stubs with fake bytes).
+        # Generate thumbnails and responsive variants for images after the
+        # initial save, but avoid recursion and skip SVG (Pillow cannot open
+        # SVG) and any file that Pillow cannot read (e.g. test stubs with fake
+        # bytes). With MEDIA_THUMBNAILS_DEFERRED the CPU work moves to the
+        # ``generate_thumbnails`` worker and templates use the original file
+        # through ``thumbnail_*_url`` until the job is done.
         if getattr(self, "_generating_thumbnails", False):
             return
-        if self.media_type != self.MediaType.IMAGE:
-            return
-        if not self.file:
+        if not self.needs_derivatives:
             return
-        if self.thumbnail_og and self.thumbnail_card:
-            return
-        extension = PurePath(self.file_slug or self.file.name).suffix.lower()
-        if extension == ".svg":
+        if getattr(settings, "MEDIA_THUMBNAILS_DEFERRED", False):
+            ThumbnailJob.enqueue(self)
             return
+        self.store_derivatives()
+
+    def store_derivatives(self, rendered=None):
+        """Store thumbnails, responsive variants, dimensions and placeholder.
+
+        ``rendered`` is the result of ``blog.thumbnails.render_derivatives``,
+        possibly produced by a worker process; otherwise the source is opened
+        and decoded here exactly once.
+
+        Returns:
+            True when every missing derivative was stored.
+        """
+        if rendered is None:
+            try:
+                with self.file.open("rb") as source_file:
+                    rendered = render_derivatives(
+                        source_file,
+                        widths=settings.MEDIA_RESPONSIVE_WIDTHS,
+                        formats=settings.MEDIA_RESPONSIVE_FORMATS,
+                    )
+            except Exception:
+                logger.warning(
+                    "thumbnail.generation_failed",
+                    extra={"media_id": self.pk, "created_count": 0},
+                )
+                return False
+        stored = self.store_thumbnails(rendered["thumbnails"])
+        stored = self._store_variants(rendered["variants"]) and stored
+        if stored:
+            self.width, self.height = rendered["size"]
+            self.dominant_color = rendered["color"]
+            self.lqip = rendered["lqip"]
+            PostMedia.objects.filter(pk=self.pk).update(
+                width=self.width,
+                height=self.height,
+                dominant_color=self.dominant_color,
+                lqip=self.lqip,
+            )
+        return stored
+
+    def _store_variants(self, variants):
+        """Write missing variants and their rows; compensate on failure."""
+        storage = PostMediaDerivative._meta.get_field("file").storage
+        existing = {(item.format, item.width) for item in self.derivatives.all()}
+        created = []
+        try:
+            rows = []
+            for variant in variants:
+                if (variant.format, variant.width) in existing:
+                    continue
+                name = (
+                    f"posts/{self.post.slug}/derivatives/"
+                    f"{self.file_slug}_{variant.width}w.{variant.format}"
+                )
+                saved_name = storage.save(name, ContentFile(variant.data))
+                created.append(saved_name)
+                rows.append(
+                    PostMediaDerivative(
+                        media=self,
+                        format=variant.format,
+                        width=variant.width,
+                        height=variant.height,
+                        file=saved_name,
+                    )
+                )
+            PostMediaDerivative.objects.bulk_create(rows)
+            return True
+        except Exception:
+            for name in reversed(created):
+                try:
+                    storage.delete(name)
+                except Exception:
+                    logger.error("derivative.cleanup_failed", extra={"media_id": self.pk})
+            logger.warning(
+                "derivative.generation_failed",
+                extra={"media_id": self.pk, "created_count": len(created)},
+            )
+            return False
+
+    def store_thumbnails(self, thumbnails=None):
+        """Write missing derivatives and persist their names on this row.
+
+        ``thumbnails`` may be pre-rendered by a worker process; otherwise the
+        source is decoded here. On failure only objects created by this attempt
+        are deleted, so a later retry stays idempotent.
+
+        Returns:
+            True when every missing derivative was stored.
+        """
         created = []
         try:
             self._generating_thumbnails = True
-            thumbnails = self._generate_thumbnails()
+            if thumbnails is None:
+                thumbnails = self._generate_thumbnails()
             update_fields = []
-            for field_name, suffix in (
-                ("thumbnail_og", "og"),
-                ("thumbnail_card", "card"),
-            ):
+            for field_name, suffix in THUMBNAIL_SUFFIXES.items():
                 field = getattr(self, field_name)
                 if field:
                     continue
@@ -598,6 +897,7 @@ class PostMedia(models.Model):
                 update_fields.append(field_name)
             if update_fields:
                 super().save(update_fields=update_fields)
+            return True
         except Exception:
             for storage, name, field_name in reversed(created):
                 try:
@@ -612,10 +912,170 @@ class PostMedia(models.Model):
                 "thumbnail.generation_failed",
                 extra={"media_id": self.pk, "created_count": len(created)},
             )
+            return False
         finally:
             self._generating_thumbnails = False
 
 
+class PostMediaDerivative(models.Model):
+    """Width-bucketed modern-format rendition of an image PostMedia for srcset."""
+
+    class Format(models.TextChoices):
+        AVIF = "avif", "AVIF"
+        WEBP = "webp", "WebP"
+
+    media = models.ForeignKey(
+        PostMedia,
+        on_delete=models.CASCADE,
+        related_name="derivatives",
+        verbose_name="Медиафайл",
+    )
+    format = models.CharField(max_length=8, choices=Format.choices, verbose_name="Формат")
+    width = models.PositiveIntegerField(verbose_name="Ширина")
+    height = models.PositiveIntegerField(verbose_name="Высота")
+    file = models.FileField(upload_to="posts/derivatives/", verbose_name="Файл")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    class Meta:
+        ordering = ["format", "width"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["media", "format", "width"],
+                name="unique_media_derivative_per_width",
+            )
+        ]
+        verbose_name = "Адаптивная версия изображения"
+        verbose_name_plural = "Адаптивные версии изображений"
+
+    def __str__(self):
+        return f"{self.media_id}: {self.width}w {self.format}"
+
+
+class ThumbnailJob(models.Model):
+    """Deferred thumbnail rendering request for one image PostMedia."""
+
+    class State(models.TextChoices):
+        PENDING = "pending", "Ожидает"
+        RUNNING = "running", "В работе"
+        DONE = "done", "Готово"
+        FAILED = "failed", "Ошибка"
+
+    media = models.OneToOneField(
+        PostMedia,
+        on_delete=models.CASCADE,
+        related_name="thumbnail_job",
+        verbose_name="Медиафайл",
+    )
+    state = models.CharField(
+        max_length=16,
+        choices=State.choices,
+        default=State.PENDING,
+        db_index=True,
+        verbose_name="Состояние",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попытки")
+    last_error = models.CharField(max_length=255, blank=True, verbose_name="Последняя ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
+
+    class Meta:
+        ordering = ["created_at"]
+        verbose_name = "Задача превью"
+        verbose_name_plural = "Задачи превью"
+
+    def __str__(self):
+        return f"{self.media_id}: {self.state}"
+
+    @classmethod
+    def enqueue(cls, media):
+        """Create or reset the pending job for ``media``.
+
+        A job a worker has already claimed stays ``running``: resetting it
+        would let a second worker render the same image concurrently.
+        """
+        cls.objects.filter(media=media).exclude(state=cls.State.RUNNING).update(
+            state=cls.State.PENDING, attempts=0, last_error="", updated_at=timezone.now()
+        )
+        job, _ = cls.objects.get_or_create(media=media)
+        return job
+
+
+class RelatedPost(models.Model):
+    """Precomputed ``post`` → ``related`` edge, ranked by similarity (see ``blog.related``)."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="related_links",
+        verbose_name="Пост",
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="related_backlinks",
+        verbose_name="Похожий пост",
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name="Позиция")
+    score = models.FloatField(verbose_name="Вес")
+
+    class Meta:
+        ordering = ["post", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["post", "rank"], name="unique_related_rank_per_post"),
+            models.UniqueConstraint(fields=["post", "related"], name="unique_related_pair"),
+        ]
+        verbose_name = "Похожий пост"
+        verbose_name_plural = "Похожие посты"
+
+    def __str__(self):
+        return f"{self.post_id} → {self.related_id} ({self.score:.2f})"
+
+
+class PostTextVector(models.Model):
+    """Term counts of a post's title and body for text similarity (see ``blog.similarity``)."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="text_vector",
+        verbose_name="Пост",
+    )
+    terms = models.JSONField(default=dict, verbose_name="Термы")
+
+    class Meta:
+        verbose_name = "Текстовый вектор поста"
+        verbose_name_plural = "Текстовые векторы постов"
+
+    def __str__(self):
+        return f"{self.post_id}: {len(self.terms)} terms"
+
+
+class RelatedRefreshJob(models.Model):
+    """Post whose related list waits for the ``rebuild_related_posts --pending`` worker.
+
+    Written instead of an inline refresh with ``RELATED_POSTS_DEFERRED`` (see
+    ``blog.related``). ``post_id`` is a plain integer: the queue may name posts
+    deleted in the same transaction, which the worker simply skips.
+    """
+
+    post_id = models.PositiveIntegerField(primary_key=True, verbose_name="ID поста")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    class Meta:
+        ordering = ["created_at"]
+        verbose_name = "Задача пересчёта похожих постов"
+        verbose_name_plural = "Задачи пересчёта похожих постов"
+
+    def __str__(self):
+        return str(self.post_id)
+
+    @classmethod
+    def enqueue(cls, pks):
+        """Queue ``pks``; posts already waiting keep their row."""
+        cls.objects.bulk_create([cls(post_id=pk) for pk in set(pks)], ignore_conflicts=True)
+
+
 class SessionPostInteraction(models.Model):
     """Central history of anonymous session interactions with public posts."""
 
@@ -0,0 +1,99 @@
+"""Pagination for the public post list: keyset load-more and cached counts.
+
+Numbered SSR pages keep Django's ``Paginator`` semantics, but the total used
+for the page range comes from the cache (``CachedCountPaginator``), so
+rendering a page costs only the page query. The count is approximate by
+design: it lives until a post write bumps the ``post_count`` namespace or the
+timeout expires.
+
+HTMX "load more" follows an opaque cursor on ``(created_at, pk)`` instead of
+``OFFSET``: each click seeks past the last rendered card through the index,
+so the hundredth click costs the same as the first.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .cache_keys import bump_namespace, versioned_key
+
+# Listing order shared by numbered pages and the cursor.
+POST_LIST_ORDERING = ("-created_at", "-pk")
+COUNT_CACHE_TIMEOUT = 300
+
+
+def encode_cursor(post) -> str:
+    raw = f"{post.created_at.isoformat()}|{post.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, int] | None:
+    """Return ``(created_at, pk)``; ``None`` for a missing or malformed cursor."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_slice(queryset, cursor: tuple[datetime, int], size: int) -> tuple[list, bool]:
+    """Return up to ``size`` rows after ``cursor`` and whether more follow."""
+    created_at, pk = cursor
+    rows = list(
+        queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)).order_by(
+            *POST_LIST_ORDERING
+        )[: size + 1]
+    )
+    return rows[:size], len(rows) > size
+
+
+class KeysetPage(Page):
+    """Load-more page: ``has_next`` comes from the ``size + 1`` probe, not a count."""
+
+    def __init__(self, object_list, number, paginator, *, more: bool):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+    def has_previous(self):
+        return self.number > 1
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class CachedCountPaginator(Paginator):
+    """``Paginator`` whose total is cached per filter set (``count_key``)."""
+
+    def __init__(self, object_list, per_page, *, count_key: str, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        digest = hashlib.sha256(self.count_key.encode()).hexdigest()[:24]
+        return cache.get_or_set(versioned_key("post_count", digest), self.object_list.count, COUNT_CACHE_TIMEOUT)
+
+    def keyset_page(self, cursor: tuple[datetime, int], number: int) -> KeysetPage:
+        rows, more = keyset_slice(self.object_list, cursor, self.per_page)
+        return KeysetPage(rows, number, self, more=more)
+
+
+def invalidate_post_counts() -> None:
+    """Retire every cached list count at once by bumping the key version."""
+    bump_namespace("post_count")
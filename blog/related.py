@@ -0,0 +1,207 @@
+"""Precomputed related-posts graph.
+
+The detail page used to find related posts with ``category OR tags__in`` and
+``DISTINCT`` over the tag join on every render, ranking by date only. Now each
+published post stores its top ``RELATED_POSTS_STORED`` neighbours in
+``RelatedPost`` and the page reads them with one indexed query.
+
+Similarity is a weighted overlap:
+
+* every shared tag adds ``TAG_WEIGHT * idf`` — rare tags say more than a tag
+  carried by half the blog (``idf = log(1 + N / df)``);
+* the same category adds ``CATEGORY_WEIGHT``;
+* the same series adds ``SERIES_WEIGHT``;
+* TF-IDF cosine of title and body (``blog.similarity``) adds
+  ``TEXT_WEIGHT * cosine`` once it reaches ``MIN_TEXT_SIMILARITY``, so posts
+  about the same thing relate even without shared taxonomy.
+
+Ties go to the newer post. Posts with zero overlap are never related.
+
+``refresh_related_posts`` recomputes the changed posts, everything sharing a
+tag, category or series with them, and everything that listed them before.
+Model signals schedule it on delete, tag changes and saves that may touch
+``RELATED_TRIGGER_FIELDS`` (``update_fields`` saves of counters or slugs skip
+it); bulk writers wrap their work in ``defer_related_refresh()`` so a whole
+batch costs one refresh.
+Features of all public posts are loaded with three queries, which is fine at
+blog scale; ``manage.py rebuild_related_posts`` recomputes everything.
+
+A refresh still loads the whole graph, which grows with the blog. With
+``RELATED_POSTS_DEFERRED`` the signals only write the post ids to
+``RelatedRefreshJob`` inside the saving transaction, and the
+``rebuild_related_posts --pending`` worker refreshes them off the request path.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Post, RelatedPost, RelatedRefreshJob
+from .similarity import TfidfIndex, public_text_index
+
+RELATED_POSTS_STORED = 6
+# Post fields that change the graph; m2m tag changes refresh via their own signal.
+RELATED_TRIGGER_FIELDS = frozenset({"status", "deleted_at", "category", "series", "title", "content", "created_at"})
+TAG_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.75
+SERIES_WEIGHT = 1.5
+TEXT_WEIGHT = 2.0
+MIN_TEXT_SIMILARITY = 0.15
+
+_deferred: ContextVar[set[int] | None] = ContextVar("related_refresh_deferred", default=None)
+
+
+@dataclass
+class _Graph:
+    """Features of public posts plus inverted indexes over them."""
+
+    order: dict[int, tuple] = field(default_factory=dict)
+    tags: dict[int, set[int]] = field(default_factory=lambda: defaultdict(set))
+    category: dict[int, int] = field(default_factory=dict)
+    series: dict[int, int] = field(default_factory=dict)
+    by_tag: dict[int, set[int]] = field(default_factory=lambda: defaultdict(set))
+    by_category: dict[int, set[int]] = field(default_factory=lambda: defaultdict(set))
+    by_series: dict[int, set[int]] = field(default_factory=lambda: defaultdict(set))
+    text: TfidfIndex = field(default_factory=lambda: TfidfIndex({}))
+
+    def neighbours(self, pk: int) -> set[int]:
+        found = set()
+        for tag_id in self.tags.get(pk, ()):
+            found |= self.by_tag[tag_id]
+        if pk in self.category:
+            found |= self.by_category[self.category[pk]]
+        if pk in self.series:
+            found |= self.by_series[self.series[pk]]
+        found.update(other for other, _score in self.text.neighbours(pk, RELATED_POSTS_STORED, MIN_TEXT_SIMILARITY))
+        found.discard(pk)
+        return found
+
+    def ranked(self, pk: int, limit: int) -> list[tuple[int, float]]:
+        total = len(self.order)
+        scores: dict[int, float] = defaultdict(float)
+        for tag_id in self.tags.get(pk, ()):
+            weight = TAG_WEIGHT * math.log(1 + total / len(self.by_tag[tag_id]))
+            for other in self.by_tag[tag_id]:
+                scores[other] += weight
+        if pk in self.category:
+            for other in self.by_category[self.category[pk]]:
+                scores[other] += CATEGORY_WEIGHT
+        if pk in self.series:
+            for other in self.by_series[self.series[pk]]:
+                scores[other] += SERIES_WEIGHT
+        for other, similarity in self.text.similarities(self.text.vectors.get(pk, {})).items():
+            if similarity >= MIN_TEXT_SIMILARITY and other in self.order:
+                scores[other] += TEXT_WEIGHT * similarity
+        scores.pop(pk, None)
+        best = sorted(scores.items(), key=lambda item: (item[1], self.order[item[0]]), reverse=True)
+        return best[:limit]
+
+
+def _load_graph() -> _Graph:
+    graph = _Graph()
+    public = Post.objects.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)
+    for pk, created_at, category_id, series_id in public.values_list("pk", "created_at", "category_id", "series_id"):
+        graph.order[pk] = (created_at, pk)
+        if category_id:
+            graph.category[pk] = category_id
+            graph.by_category[category_id].add(pk)
+        if series_id:
+            graph.series[pk] = series_id
+            graph.by_series[series_id].add(pk)
+    links = Post.tags.through.objects.filter(post__in=public).values_list("post_id", "tag_id")
+    for post_id, tag_id in links:
+        graph.tags[post_id].add(tag_id)
+        graph.by_tag[tag_id].add(post_id)
+    graph.text = public_text_index()
+    return graph
+
+
+def _write(graph: _Graph, pks: Iterable[int], *, replace_all: bool = False) -> int:
+    pks = list(pks)
+    rows = [
+        RelatedPost(post_id=pk, related_id=other, rank=rank, score=round(score, 4))
+        for pk in pks
+        if pk in graph.order
+        for rank, (other, score) in enumerate(graph.ranked(pk, RELATED_POSTS_STORED))
+    ]
+    stale = RelatedPost.objects.all() if replace_all else RelatedPost.objects.filter(post_id__in=pks)
+    with transaction.atomic():
+        stale.delete()
+        RelatedPost.objects.bulk_create(rows)
+    return len(rows)
+
+
+def refresh_related_posts(pks: Iterable[int]) -> int:
+    """Recompute lists touched by changes to ``pks``; return rows written."""
+    pks = set(pks)
+    if not pks:
+        return 0
+    graph = _load_graph()
+    affected = set(pks)
+    for pk in pks:
+        affected |= graph.neighbours(pk)
+    affected |= set(RelatedPost.objects.filter(related_id__in=pks).values_list("post_id", flat=True))
+    return _write(graph, affected)
+
+
+def rebuild_related_posts() -> int:
+    """Recompute every list from scratch; return rows written."""
+    graph = _load_graph()
+    return _write(graph, graph.order, replace_all=True)
+
+
+def schedule_related_refresh(pks: Iterable[int]) -> None:
+    """Refresh now, or once at the end of the enclosing ``defer_related_refresh``."""
+    pending = _deferred.get()
+    if pending is None:
+        _refresh_or_enqueue(pks)
+    else:
+        pending.update(pks)
+
+
+def _refresh_or_enqueue(pks: Iterable[int]) -> None:
+    pks = set(pks)
+    if not pks:
+        return
+    if getattr(settings, "RELATED_POSTS_DEFERRED", False):
+        RelatedRefreshJob.enqueue(pks)
+    else:
+        refresh_related_posts(pks)
+
+
+def refresh_pending_related_posts() -> tuple[int, int]:
+    """Drain ``RelatedRefreshJob``; return queued posts and rows written.
+
+    The queue is emptied in a short transaction before the graph is loaded,
+    so requests queueing the same posts never wait for the worker; a change
+    committed after that point is queued again for the next run.
+    """
+    with transaction.atomic():
+        pks = list(RelatedRefreshJob.objects.values_list("post_id", flat=True))
+        RelatedRefreshJob.objects.filter(post_id__in=pks).delete()
+    try:
+        written = refresh_related_posts(pks)
+    except Exception:
+        RelatedRefreshJob.enqueue(pks)
+        raise
+    return len(pks), written
+
+
+@contextmanager
+def defer_related_refresh() -> Iterator[set[int]]:
+    """Collect scheduled refreshes and run them once when the block succeeds."""
+    pending: set[int] = set()
+    token = _deferred.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred.reset(token)
+    _refresh_or_enqueue(pending)
@@ -0,0 +1,112 @@
+"""Denormalized series navigation and the cached series table of contents.
+
+Every post in a series stores its place among the public posts of that
+series: ``series_position`` (1-based, ``0`` when the post is not public),
+``series_total`` and the ``series_prev``/``series_next`` neighbours. The
+detail page reads them from its own row instead of loading and scanning the
+whole series on every view, so a hundred-lesson course costs the same as a
+two-part article.
+
+``refresh_series_positions`` recomputes whole series with one query and a
+``bulk_update`` of the rows that actually moved. ``blog.signals`` calls it
+when a post joins or leaves a series, is reordered, published, unpublished or
+soft-deleted; bulk writers that use ``QuerySet.update`` call it themselves.
+Migration ``0023`` backfills existing rows; ``manage.py refresh_series_navigation``
+recomputes every series after bulk writes that bypass the signals.
+
+The series landing page reads its ordered post list from the cache
+(``get_series_toc``). A refresh drops the TOC of that series; category and
+tag writes retire all TOCs at once by bumping the ``series_toc`` namespace.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .cache_keys import bump_namespace, namespace_version, versioned_key
+from .models import Post, Series, Tag
+
+SERIES_ORDERING = ("series_order", "created_at", "pk")
+NAVIGATION_FIELDS = ["series_position", "series_total", "series_prev", "series_next"]
+# Post fields that move a post inside its series or change what the TOC shows.
+SERIES_TRIGGER_FIELDS = frozenset(
+    {"series", "series_order", "status", "deleted_at", "created_at", "title", "slug", "description", "category"}
+)
+TOC_CACHE_TIMEOUT = 3600
+
+
+def _is_public(post: Post) -> bool:
+    return post.status == Post.Status.PUBLISHED and post.deleted_at is None
+
+
+def _assign(post: Post, position: int, total: int, prev_id: int | None, next_id: int | None) -> bool:
+    values = (position, total, prev_id, next_id)
+    if (post.series_position, post.series_total, post.series_prev_id, post.series_next_id) == values:
+        return False
+    post.series_position, post.series_total, post.series_prev_id, post.series_next_id = values
+    return True
+
+
+def refresh_series_positions(series_ids: Iterable[int | None]) -> int:
+    """Recompute navigation of every post in ``series_ids``; return rows updated."""
+    series_ids = {pk for pk in series_ids if pk}
+    if not series_ids:
+        return 0
+    by_series: dict[int, list[Post]] = {pk: [] for pk in series_ids}
+    members = (
+        Post.objects.filter(series_id__in=series_ids)
+        .order_by("series_id", *SERIES_ORDERING)
+        .only("pk", "series_id", "status", "deleted_at", *NAVIGATION_FIELDS)
+    )
+    for post in members:
+        by_series[post.series_id].append(post)
+
+    changed = []
+    for posts in by_series.values():
+        public = [post for post in posts if _is_public(post)]
+        for index, post in enumerate(public):
+            prev_id = public[index - 1].pk if index else None
+            next_id = public[index + 1].pk if index + 1 < len(public) else None
+            if _assign(post, index + 1, len(public), prev_id, next_id):
+                changed.append(post)
+        changed.extend(post for post in posts if not _is_public(post) and _assign(post, 0, 0, None, None))
+    Post.objects.bulk_update(changed, NAVIGATION_FIELDS)
+    invalidate_series_toc(*series_ids)
+    return len(changed)
+
+
+def clear_series_navigation(post: Post) -> None:
+    """Reset navigation of a post that left its series (no-op when already clear)."""
+    if post.series_id is None and _assign(post, 0, 0, None, None):
+        Post.objects.filter(pk=post.pk).update(series_position=0, series_total=0, series_prev=None, series_next=None)
+
+
+def build_series_toc(series: Series) -> list[Post]:
+    """Public posts of ``series`` in reading order with category and tags loaded."""
+    return list(
+        series.posts.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)
+        .select_related("category")
+        .prefetch_related(Prefetch("tags", queryset=Tag.objects.only("pk", "name", "slug")))
+        .only(
+            "pk", "slug", "title", "description", "status", "deleted_at",
+            "series_id", "series_order", "series_position", "created_at", "category",
+        )
+        .order_by(*SERIES_ORDERING)
+    )
+
+
+def get_series_toc(series: Series) -> list[Post]:
+    return cache.get_or_set(versioned_key("series_toc", series.pk), lambda: build_series_toc(series), TOC_CACHE_TIMEOUT)
+
+
+def invalidate_series_toc(*series_ids: int) -> None:
+    version = namespace_version("series_toc")
+    cache.delete_many([versioned_key("series_toc", pk, version=version) for pk in series_ids])
+
+
+def invalidate_series_tocs() -> None:
+    """Retire every cached TOC at once (category or tag renames)."""
+    bump_namespace("series_toc")
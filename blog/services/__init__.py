@@ -15,8 +15,22 @@
     >>> html = convert_markdown_to_html("# Hello World")
     >>> '<h1>Hello World</h1>' in html
     True
+
+Рендер-стек (markdown, pymdownx, Beautiful Soup, процессоры) загружается при
+первой конвертации, а не при импорте: ``blog.models`` импортирует этот пакет,
+и без ленивой границы его платила бы каждая команда ``manage.py`` и каждый
+cron-запуск.
+
+Реализацию выбирает ``settings.MARKDOWN_RENDERER`` (см.
+``blog.services.renderers``); в production это ``fast``.
 """
 
-from blog.services.markdown_converter import convert_markdown_to_html
+
+def convert_markdown_to_html(markdown_text: str, post=None, *, renderer: str | None = None) -> str:
+    """Ленивая точка входа: см. ``blog.services.renderers``."""
+    from blog.services.renderers import get_renderer
+
+    return get_renderer(renderer).render(markdown_text, post=post)
+
 
 __all__ = ["convert_markdown_to_html"]
@@ -2,10 +2,13 @@
 """Конвертер Markdown → HTML с поддержкой HTML-процессоров.
 
 Основная функция для конвертации Markdown в HTML с последующей обработкой
-через систему процессоров (Beautiful Soup).
+через систему процессоров (Beautiful Soup). Этапы (``build_markdown``,
+``process_html``) вынесены отдельно, чтобы рендереры из
+``blog.services.renderers`` собирали из них свои варианты конвейера.
 """
 
 import html as html_module
+import logging
 
 import markdown
 
@@ -18,8 +21,85 @@ from blog.services.processors import (
     TableProcessor,
 )
 
+logger = logging.getLogger(__name__)
+
+# Настройка расширений Markdown.
+# Состав "extra" перечислен явно, но без fenced_code: блоки ``` обрабатывает
+# superfences, а fenced_code лишь тянет markdown.extensions.codehilite.
+EXTENSIONS = [
+    "abbr",  # Аббревиатуры *[HTML]: ...
+    "attr_list",  # Атрибуты {: .class #id }
+    "def_list",  # Списки определений
+    "footnotes",  # Сноски [^1]
+    "md_in_html",  # Markdown внутри <div markdown="1">
+    "tables",  # Таблицы
+    "nl2br",  # Переносы строк → <br>
+    "pymdownx.highlight",  # Code blocks with language-* classes for Highlight.js
+    "pymdownx.superfences",  # Улучшенные code blocks (поддержка Mermaid)
+    "pymdownx.emoji",  # Эмодзи :smile:
+    "pymdownx.tasklist",  # Чекбоксы - [ ] и - [x]
+]
+
+
+def _mermaid_fence(source, language, css_class, options, md, **kwargs):
+    return (
+        '<figure class="mermaid-panzoom-shell">'
+        '<div class="mermaid-toolbar" aria-label="Управление диаграммой">'
+        '<button type="button" class="btn btn-sm btn-light mermaid-zoom-in">+</button>'
+        '<button type="button" class="btn btn-sm btn-light mermaid-zoom-out">−</button>'
+        '<button type="button" class="btn btn-sm btn-light mermaid-reset">Сброс</button>'
+        '<button type="button" class="btn btn-sm btn-dark mermaid-panzoom-fullscreen">На весь экран</button>'
+        '</div>'
+        f'<div class="mermaid">{html_module.escape(source)}</div>'
+        '</figure>'
+    )
+
+
+# Конфигурация расширений
+EXTENSION_CONFIGS = {
+    "pymdownx.highlight": {
+        "use_pygments": False,  # НЕ генерировать Pygments spans/styles
+        "guess_lang": True,  # Автоопределение языка
+        "language_prefix": "language-",  # Префикс для классов Highlight.js
+        "css_class": "highlight",  # CSS класс для обертки
+    },
+    "pymdownx.superfences": {
+        "custom_fences": [{"name": "mermaid", "class": "mermaid", "format": _mermaid_fence}]
+    },
+    "pymdownx.emoji": {
+        "emoji_index": lambda: None,  # Отключаем индекс (используем простые эмодзи)
+        "emoji_generator": lambda *args: args[0],  # Возвращаем текст как есть
+    },
+}
+
+
+def build_markdown() -> markdown.Markdown:
+    """Собирает экземпляр ``markdown.Markdown`` со всеми расширениями.
+
+    Сборка стоит дороже конвертации короткой заметки. Экземпляр можно
+    переиспользовать в одном потоке, вызывая ``reset()`` перед каждым
+    документом.
+    """
+    return markdown.Markdown(
+        extensions=EXTENSIONS,
+        extension_configs=EXTENSION_CONFIGS,
+        output_format="html",
+    )
+
+
+def process_html(html: str, responsive_images=None) -> str:
+    """Этап 2: HTML процессоры (Beautiful Soup) добавляют Bootstrap классы."""
+    processors = [
+        TableProcessor(),  # Таблицы → Bootstrap классы
+        # Изображения → .img-fluid, lazy loading, width/height и srcset
+        ImageProcessor(responsive_images=responsive_images),
+        BlockquoteProcessor(),  # Цитаты + Obsidian Callouts
+        CodeProcessor(),  # Inline-код → .text-danger, .bg-light
+    ]
+    return MarkdownProcessor(processors).process_html(html)
+
 
-def convert_markdown_to_html(markdown_text: str, post=None) -> str:
+def convert_markdown_to_html(markdown_text: str, post=None, *, md: markdown.Markdown | None = None) -> str:
     """Конвертирует Markdown текст в HTML с обработкой процессорами.
 
     Двухэтапный процесс:
@@ -32,6 +112,9 @@ def convert_markdown_to_html(markdown_text: str, post=None) -> str:
 
     Args:
         markdown_text: Текст в формате Markdown.
+        post: Пост, чьи медиа подставляются в ``![[...]]``.
+        md: Переиспользуемый экземпляр из ``build_markdown()``; без него
+            собирается новый (эталонный вариант, ``renderers.FullRenderer``).
 
     Returns:
         HTML строка с Bootstrap классами и обработанной структурой.
@@ -47,80 +130,17 @@ def convert_markdown_to_html(markdown_text: str, post=None) -> str:
     if not markdown_text:
         return ""
 
-    # Настройка расширений Markdown
-    extensions = [
-        "extra",  # Таблицы, footnotes, abbr, attr_list
-        "fenced_code",  # Блоки кода с тройными backticks ```
-        "tables",  # Таблицы (входит в extra, но явно указываем)
-        "nl2br",  # Переносы строк → <br>
-        "pymdownx.highlight",  # Code blocks with language-* classes for Highlight.js
-        "pymdownx.superfences",  # Улучшенные code blocks (поддержка Mermaid)
-        "pymdownx.emoji",  # Эмодзи :smile:
-        "pymdownx.tasklist",  # Чекбоксы - [ ] и - [x]
-    ]
-
-    # Конфигурация расширений
-    extension_configs = {
-        "pymdownx.highlight": {
-            "use_pygments": False,  # НЕ генерировать Pygments spans/styles
-            "guess_lang": True,  # Автоопределение языка
-            "language_prefix": "language-",  # Префикс для классов Highlight.js
-            "css_class": "highlight",  # CSS класс для обертки
-        },
-        "pymdownx.superfences": {
-            "custom_fences": [
-                {
-                    "name": "mermaid",
-                    "class": "mermaid",
-                    "format": lambda source,
-                    language,
-                    css_class,
-                    options,
-                    md,
-                    **kwargs: (
-                        '<figure class="mermaid-panzoom-shell">'
-                        '<div class="mermaid-toolbar" aria-label="Управление диаграммой">'
-                        '<button type="button" class="btn btn-sm btn-light mermaid-zoom-in">+</button>'
-                        '<button type="button" class="btn btn-sm btn-light mermaid-zoom-out">−</button>'
-                        '<button type="button" class="btn btn-sm btn-light mermaid-reset">Сброс</button>'
-                        '<button type="button" class="btn btn-sm btn-dark mermaid-panzoom-fullscreen">На весь экран</button>'
-                        '</div>'
-                        f'<div class="mermaid">{html_module.escape(source)}</div>'
-                        '</figure>'
-                    ),
-                }
-            ]
-        },
-        "pymdownx.emoji": {
-            "emoji_index": lambda: None,  # Отключаем индекс (используем простые эмодзи)
-            "emoji_generator": lambda *args: args[0],  # Возвращаем текст как есть
-        },
-    }
-
     try:
         # Этап 1: Конвертация Markdown → HTML
-        markdown_text = MarkdownMediaPreprocessor(post).process(markdown_text)
-        html = markdown.markdown(
-            markdown_text,
-            extensions=extensions,
-            extension_configs=extension_configs,
-            output_format="html",
-        )
+        media_preprocessor = MarkdownMediaPreprocessor(post)
+        markdown_text = media_preprocessor.process(markdown_text)
+        md = md or build_markdown()
+        md.reset()
+        html = md.convert(markdown_text)
 
         # Этап 2: Обработка HTML процессорами (Beautiful Soup)
-        processors = [
-            TableProcessor(),  # Таблицы → Bootstrap классы
-            ImageProcessor(),  # Изображения → .img-fluid, lazy loading
-            BlockquoteProcessor(),  # Цитаты + Obsidian Callouts
-            CodeProcessor(),  # Inline-код → .text-danger, .bg-light
-        ]
-
-        processor = MarkdownProcessor(processors)
-        html = processor.process_html(html)
-
-        return html
-    except Exception as e:
-        # В случае ошибки логируем и возвращаем пустую строку
-        # В production лучше использовать logging
-        print(f"Ошибка конвертации Markdown: {e}")
+        return process_html(html, media_preprocessor.responsive_images)
+    except Exception:
+        # Битая заметка не роняет страницу: логируем и возвращаем пустую строку
+        logger.exception("Markdown conversion failed")
         return ""
@@ -1,58 +1,79 @@
 """Resolve post media references in Markdown before HTML conversion."""
 
-import re
 from html import escape
 from pathlib import PurePosixPath
 from urllib.parse import urlparse
 
+from blog.content_import.markdown_tokens import EMBED, IMAGE, MEDIA_KINDS, tokenize
+from blog.media_urls import media_url, prime_media_urls
+
 
 class MarkdownMediaPreprocessor:
-    """Convert Obsidian and local Markdown media links into Django media URLs."""
+    """Convert Obsidian and local Markdown media links into Django media URLs.
 
-    OBSIDIAN_IMAGE_RE = re.compile(r"!\[\[([^\]|]+)(?:\|([^\]]+))?\]\]")
-    MARKDOWN_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
+    Embeds and images are rewritten in one pass over the shared token scan
+    (``blog.content_import.markdown_tokens``); code samples stay untouched.
+    """
 
     def __init__(self, post):
         self.post = post
         self._media_by_name = self._build_media_map()
 
+    @property
+    def responsive_images(self):
+        """Return ``{url: {"width", "height", "sources", "placeholder"}}``.
+
+        Consumed by ``ImageProcessor`` to emit ``width``/``height``, the
+        dominant colour/LQIP background and ``<picture>`` sources with
+        ``srcset`` from stored derivatives.
+        """
+        images = {}
+        for media in self._media_by_name.values():
+            if media.media_type != "image" or not media.width:
+                continue
+            images[media_url(media.file)] = {
+                "width": media.width,
+                "height": media.height,
+                "sources": media.responsive_sources,
+                "placeholder": media.placeholder_style,
+            }
+        return images
+
     def process(self, markdown_text: str) -> str:
         if not markdown_text or not self.post or not getattr(self.post, "pk", None):
             return markdown_text
 
-        markdown_text = self.convert_wikilinks(markdown_text)
-        return self.resolve_local_links(markdown_text)
+        return tokenize(markdown_text).rewrite(self._replace_token, MEDIA_KINDS)
 
     def convert_wikilinks(self, markdown_text: str) -> str:
-        def replace(match):
-            target = match.group(1).strip()
-            alt_text = (match.group(2) or self._display_name(target)).strip()
+        return tokenize(markdown_text).rewrite(self._replace_token, (EMBED,))
+
+    def resolve_local_links(self, markdown_text: str) -> str:
+        return tokenize(markdown_text).rewrite(self._replace_token, (IMAGE,))
+
+    def _replace_token(self, token):
+        target = token.target
+        if token.kind == EMBED:
+            alt_text = (token.label or self._display_name(target)).strip()
             media = self._resolve_media(target)
             if not media:
                 return f"![{alt_text}]({target})"
             return self._render_media_embed(media, alt_text)
-
-        return self.OBSIDIAN_IMAGE_RE.sub(replace, markdown_text)
-
-    def resolve_local_links(self, markdown_text: str) -> str:
-        def replace(match):
-            alt_text = match.group(1)
-            target = match.group(2).strip()
-            if self._is_external_or_absolute(target):
-                return match.group(0)
-            url = self._resolve_media_url(target)
-            if not url:
-                return match.group(0)
-            return f"![{alt_text}]({url})"
-
-        return self.MARKDOWN_IMAGE_RE.sub(replace, markdown_text)
+        if self._is_external_or_absolute(target):
+            return None
+        url = self._resolve_media_url(target)
+        if not url:
+            return None
+        return f"![{token.label}]({url})"
 
     def _build_media_map(self):
         media_map = {}
         if not self.post or not getattr(self.post, "pk", None):
             return media_map
 
-        for media in self.post.media_files.all():
+        media_rows = list(self.post.media_files.prefetch_related("derivatives"))
+        prime_media_urls(media.file for media in media_rows)
+        for media in media_rows:
             names = {media.original_filename, media.file_slug, PurePosixPath(media.file.name).name}
             for key in names:
                 if not key:
@@ -66,7 +87,7 @@ class MarkdownMediaPreprocessor:
     def _resolve_media_url(self, target):
         media = self._resolve_media(target)
         if media:
-            return media.file.url
+            return media_url(media.file)
         return None
 
     def _resolve_media(self, target):
@@ -75,7 +96,7 @@ class MarkdownMediaPreprocessor:
 
     @staticmethod
     def _render_media_embed(media, alt_text):
-        url = media.file.url
+        url = media_url(media.file)
         escaped_alt = escape(alt_text, quote=True)
         escaped_url = escape(url, quote=True)
         if media.media_type == "image":
@@ -2,7 +2,9 @@
 """Процессор для добавления Bootstrap классов к изображениям.
 
 Обрабатывает все <img> элементы в HTML и добавляет Bootstrap 5 классы
-для адаптивности и центровки, а также lazy loading.
+для адаптивности и центровки, а также lazy loading. Для медиафайлов поста
+с известными размерами проставляет width/height и оборачивает картинку в
+<picture> с AVIF/WebP <source srcset> из PostMediaDerivative.
 """
 
 from bs4 import BeautifulSoup
@@ -21,6 +23,13 @@ class ImageProcessor(HTMLProcessor):
     Также добавляет атрибуты loading="lazy" и decoding="async" для оптимизации
     загрузки и декодирования изображений.
 
+    Если передан ``responsive_images`` (``{src: {"width", "height",
+    "sources", "placeholder"}}`` из MarkdownMediaPreprocessor), для
+    совпавших по src изображений добавляются width/height (без сдвига
+    вёрстки), inline-фон с основным цветом и LQIP (класс ``has-placeholder``)
+    и ``<picture>`` с ``<source type srcset sizes>`` для каждого формата.
+    Исходный <img> остаётся fallback-ом для браузеров без AVIF/WebP.
+
     Референс из doc/samples/assets/js/main.js:14:
         img: ["img-fluid", "d-block", "mx-auto"]
 
@@ -43,6 +52,13 @@ class ImageProcessor(HTMLProcessor):
         True
     """
 
+    # Колонка статьи ограничена 860px на десктопе, на мобильных — ширина экрана.
+    DEFAULT_SIZES = "(min-width: 992px) 860px, 100vw"
+
+    def __init__(self, responsive_images=None, sizes=DEFAULT_SIZES):
+        self.responsive_images = responsive_images or {}
+        self.sizes = sizes
+
     def process(self, soup: BeautifulSoup) -> None:
         """Добавляет Bootstrap классы ко всем изображениям.
 
@@ -85,6 +101,26 @@ class ImageProcessor(HTMLProcessor):
             if "decoding" not in img.attrs:
                 img["decoding"] = "async"
 
+            responsive = self.responsive_images.get(img.get("src"))
+            if responsive:
+                self._apply_responsive(soup, img, responsive)
+
+    def _apply_responsive(self, soup: BeautifulSoup, img, responsive) -> None:
+        """Проставляет размеры и оборачивает <img> в <picture> с srcset."""
+        if "width" not in img.attrs and "height" not in img.attrs:
+            img["width"] = str(responsive["width"])
+            img["height"] = str(responsive["height"])
+        if responsive.get("placeholder") and "style" not in img.attrs:
+            img["style"] = responsive["placeholder"]
+            img["class"] = img["class"] + ["has-placeholder"]
+        if not responsive["sources"] or img.parent.name == "picture":
+            return
+        picture = soup.new_tag("picture")
+        img.wrap(picture)
+        for mime_type, srcset in responsive["sources"]:
+            source = soup.new_tag("source", attrs={"type": mime_type, "srcset": srcset, "sizes": self.sizes})
+            img.insert_before(source)
+
     def get_name(self) -> str:
         """Возвращает имя процессора для логирования.
 
@@ -0,0 +1,109 @@
+# blog/services/renderers.py
+"""Реестр рендереров Markdown → HTML.
+
+Единственная точка входа — ``blog.services.convert_markdown_to_html``; она
+берёт рендерер из ``settings.MARKDOWN_RENDERER`` (по умолчанию ``fast``).
+
+Рендереры:
+    - full: эталонный конвейер, новый ``markdown.Markdown`` на каждый вызов.
+    - fast: тот же конвейер и тот же HTML, но экземпляр ``Markdown`` собирается
+      один раз на поток и сбрасывается ``reset()`` между документами.
+    - basic: только markdown без медиа-вставок и HTML-процессоров; для
+      превью и сравнения в бенчмарке, вывод отличается намеренно.
+
+``scripts/bench/markdown_renderers.py`` сравнивает их скорость и совпадение
+вывода с ``full``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from blog.services.markdown_converter import build_markdown, convert_markdown_to_html
+
+logger = logging.getLogger(__name__)
+
+_REGISTRY: dict[str, type[MarkdownRenderer]] = {}
+_INSTANCES: dict[str, MarkdownRenderer] = {}
+
+
+def register_renderer(cls: type[MarkdownRenderer]) -> type[MarkdownRenderer]:
+    """Декоратор: регистрирует рендерер под ``cls.name``."""
+    _REGISTRY[cls.name] = cls
+    _INSTANCES.pop(cls.name, None)
+    return cls
+
+
+def available_renderers() -> list[str]:
+    return sorted(_REGISTRY)
+
+
+def get_renderer(name: str | None = None) -> MarkdownRenderer:
+    """Рендерер по имени; без имени — из ``settings.MARKDOWN_RENDERER``."""
+    name = name or getattr(settings, "MARKDOWN_RENDERER", "fast")
+    if name not in _REGISTRY:
+        raise ImproperlyConfigured(
+            f"Unknown MARKDOWN_RENDERER {name!r}; available: {', '.join(available_renderers())}"
+        )
+    if name not in _INSTANCES:
+        _INSTANCES[name] = _REGISTRY[name]()
+    return _INSTANCES[name]
+
+
+class MarkdownRenderer:
+    """Базовый класс: ``render`` принимает Markdown и пост (для медиа)."""
+
+    name = ""
+
+    def render(self, markdown_text: str, post=None) -> str:
+        raise NotImplementedError
+
+
+@register_renderer
+class FullRenderer(MarkdownRenderer):
+    name = "full"
+
+    def render(self, markdown_text: str, post=None) -> str:
+        return convert_markdown_to_html(markdown_text, post=post)
+
+
+@register_renderer
+class FastRenderer(MarkdownRenderer):
+    name = "fast"
+
+    def __init__(self):
+        # ``Markdown`` хранит состояние документа (footnotes, abbr, stash),
+        # поэтому экземпляр свой у каждого потока Gunicorn/warm_caches.
+        self._local = threading.local()
+
+    def render(self, markdown_text: str, post=None) -> str:
+        md = getattr(self._local, "md", None)
+        if md is None:
+            md = self._local.md = build_markdown()
+        return convert_markdown_to_html(markdown_text, post=post, md=md)
+
+
+@register_renderer
+class BasicRenderer(MarkdownRenderer):
+    name = "basic"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def render(self, markdown_text: str, post=None) -> str:
+        if not markdown_text:
+            return ""
+        md = getattr(self._local, "md", None)
+        if md is None:
+            md = self._local.md = build_markdown()
+        try:
+            md.reset()
+            return md.convert(markdown_text)
+        except Exception:
+            # Как и convert_markdown_to_html: битая заметка не роняет страницу
+            logger.exception("Markdown conversion failed (renderer=%s)", self.name)
+            return ""
@@ -1,8 +1,23 @@
 from django.db import transaction
 from django.db.models import F
+from django.utils.crypto import constant_time_compare, salted_hmac
 
 from .models import Post, SessionPostInteraction
 
+# Sent by ``manage.py warm_caches``: render the page, but count no view and
+# create no session. The value is an HMAC of SECRET_KEY, so visitors cannot
+# send the header to hide their views.
+WARMUP_HEADER = "X-Cache-Warmup"
+
+
+def warmup_token() -> str:
+    return salted_hmac("blog.warmup", "warm_caches").hexdigest()
+
+
+def is_warmup_request(request) -> bool:
+    value = request.headers.get(WARMUP_HEADER, "")
+    return bool(value) and constant_time_compare(value, warmup_token())
+
 
 class SessionInteractionMixin:
     """Centralized helpers for anonymous session-based post interactions."""
@@ -24,6 +39,8 @@ class SessionInteractionMixin:
 
     def register_post_view(self, post):
         """Count only the first detail-page view of a post per session."""
+        if is_warmup_request(self.request):
+            return post
         with transaction.atomic():
             interaction = self.get_interaction(post)
             if interaction.mark_viewed():
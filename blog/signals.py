@@ -0,0 +1,161 @@
+"""Cache invalidation hooks for blog models."""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache_keys import bump_namespace
+from .card_cache import invalidate_post_cards
+from .models import Category, Post, PostMedia, RelatedPost, Series, Tag
+from .pagination import invalidate_post_counts
+from .related import RELATED_TRIGGER_FIELDS, schedule_related_refresh
+from .series import (
+    SERIES_TRIGGER_FIELDS,
+    clear_series_navigation,
+    invalidate_series_toc,
+    invalidate_series_tocs,
+    refresh_series_positions,
+)
+from .similarity import store_text_vectors
+from .taxonomy import invalidate_taxonomy
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_listing(sender, **kwargs):
+    if kwargs.get("action", "post_").startswith("post_"):
+        invalidate_taxonomy()
+        invalidate_post_counts()
+
+
+@receiver(post_save, sender=Post)
+def refresh_text_vector(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Runs before the related refresh below, which reads the stored vector.
+    if not raw and (update_fields is None or {"title", "content"} & set(update_fields)):
+        store_text_vectors([instance])
+
+
+@receiver(post_save, sender=Post)
+def refresh_related_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Saves of counters or slugs (update_fields) do not move any ranking input.
+    if raw or (update_fields is not None and not RELATED_TRIGGER_FIELDS & set(update_fields)):
+        return
+    schedule_related_refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def refresh_related_on_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"}:
+        schedule_related_refresh((pk_set or ()) if reverse else [instance.pk])
+
+
+@receiver(pre_delete, sender=Post)
+def remember_related_backlinks(sender, instance, **kwargs):
+    # The cascade removes the edges; keep their owners to refill their lists.
+    instance._related_backlinks = list(
+        RelatedPost.objects.filter(related=instance).values_list("post_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Post)
+def refresh_related_on_delete(sender, instance, **kwargs):
+    schedule_related_refresh(getattr(instance, "_related_backlinks", ()))
+
+
+def _touches_series(update_fields) -> bool:
+    return update_fields is None or bool(SERIES_TRIGGER_FIELDS & set(update_fields))
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_series(sender, instance, raw=False, update_fields=None, **kwargs):
+    # A post moved to another series leaves a gap in the old one.
+    if not raw and instance.pk and (update_fields is None or "series" in update_fields):
+        instance._previous_series_id = (
+            Post.objects.filter(pk=instance.pk).values_list("series_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Post)
+def refresh_series_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not _touches_series(update_fields):
+        return
+    clear_series_navigation(instance)
+    refresh_series_positions({instance.series_id, getattr(instance, "_previous_series_id", None)})
+
+
+@receiver(post_delete, sender=Post)
+def refresh_series_on_delete(sender, instance, **kwargs):
+    refresh_series_positions([instance.series_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_series_toc_labels(sender, **kwargs):
+    if kwargs.get("action", "post_").startswith("post_"):
+        invalidate_series_tocs()
+
+
+@receiver(post_save, sender=Series)
+def invalidate_series_toc_on_save(sender, instance, **kwargs):
+    invalidate_series_toc(instance.pk)
+
+
+@receiver(post_delete, sender=Series)
+def clear_orphaned_series_navigation(sender, instance, **kwargs):
+    invalidate_series_toc(instance.pk)
+    # ``SET_NULL`` detached the posts with a plain UPDATE, bypassing their signals.
+    Post.objects.filter(series__isnull=True, series_position__gt=0).update(
+        series_position=0, series_total=0, series_prev=None, series_next=None
+    )
+
+
+@receiver(post_save, sender=PostMedia)
+@receiver(post_delete, sender=PostMedia)
+def refresh_media_pointers_on_media_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Derivative writes (``update_fields`` with thumbnails) cannot move the cover.
+    if raw or (update_fields is not None and not {"post", "media_type", "created_at"} & set(update_fields)):
+        return
+    cached_post = [instance.post] if PostMedia.post.is_cached(instance) else []
+    Post.refresh_media_pointers([instance.post_id], instances=cached_post)
+
+
+@receiver(post_save, sender=Post)
+def refresh_media_pointers_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # A new content type picks another primary media; a full save of a stale
+    # instance may also have written old pointers back.
+    if raw or created or (update_fields is not None and "content_type" not in update_fields):
+        return
+    Post.refresh_media_pointers([instance.pk], instances=[instance])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Post.tags.through)
+@receiver(post_save, sender=PostMedia)
+@receiver(post_delete, sender=PostMedia)
+def invalidate_cached_cards(sender, **kwargs):
+    # Card inputs that do not bump ``Post.updated_at``: labels, tags, thumbnails.
+    if kwargs.get("action", "post_").startswith("post_"):
+        invalidate_post_cards()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Series)
+@receiver(post_delete, sender=Series)
+@receiver(post_save, sender=PostMedia)
+@receiver(post_delete, sender=PostMedia)
+def invalidate_cached_documents(sender, **kwargs):
+    # Feed categories, series slugs/names and sitemap images are outside the posts stamp.
+    bump_namespace("feed", "sitemap")
@@ -1,23 +1,110 @@
-"""Sitemap classes for published blog posts and static pages."""
+"""Sitemap index and sections for published posts, series and static pages.
+
+``/sitemap.xml`` is an index of per-section sitemaps (``sitemap-<section>.xml``):
+one section per post content type, one for series and one for static pages.
+Every section is paginated (``?p=N``) well below the 50 000 URL limit, and
+post URLs carry image and video extensions built from ``PostMedia``.
+
+Both views answer through ``blog.http_cache``: one aggregate over public posts
+yields ETag/Last-Modified for 304s and keys the cached XML, so a crawler
+re-reading an unchanged sitemap costs a single query.
+"""
+
+from __future__ import annotations
 
 from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps import views as sitemap_views
+from django.db.models import Max, Q
+from django.http import Http404
 from django.urls import reverse
 
-from .models import Post
+from .http_cache import cached_conditional_response, posts_stamp
+from .media_urls import media_url, prime_media_urls
+from .models import Post, PostMedia, Series
+
+# Google accepts 50 000 URLs per file; smaller pages keep rendering cheap.
+SITEMAP_PAGE_SIZE = 5000
+# Bump when the sitemap markup changes so cached XML is not reused.
+SITEMAP_RENDER_VERSION = 1
+SITEMAP_TEMPLATE = "blog/sitemap.xml"
+
+
+def public_posts():
+    return Post.objects.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)
 
 
 class PostSitemap(Sitemap):
-    """Published blog posts — changefreq weekly, priority 0.8."""
+    """Published posts of one content type — changefreq weekly, priority 0.8."""
 
     changefreq = "weekly"
     priority = 0.8
+    limit = SITEMAP_PAGE_SIZE
+
+    def __init__(self, content_type: str):
+        self.content_type = content_type
 
     def items(self):
-        return Post.objects.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)
+        return (
+            public_posts()
+            .filter(content_type=self.content_type)
+            .select_related("cover_media", "primary_media")
+            .prefetch_related("media_files")
+            .order_by("pk")
+        )
 
     def lastmod(self, obj):
         return obj.updated_at
 
+    def get_latest_lastmod(self):
+        # Default implementation walks every item; the index needs only the max.
+        return public_posts().filter(content_type=self.content_type).aggregate(latest=Max("updated_at"))["latest"]
+
+    def get_urls(self, page=1, site=None, protocol=None):
+        urls = super().get_urls(page=page, site=site, protocol=protocol)
+        origin = f"{self.get_protocol(protocol)}://{self.get_domain(site)}"
+        prime_media_urls(
+            file
+            for url in urls
+            for media in (*url["item"].media_files.all(), url["item"].cover_media, url["item"].primary_media)
+            if media is not None
+            for file in (media.file, media.thumbnail_og)
+        )
+        for url in urls:
+            post = url["item"]
+            images = [
+                _absolute(origin, media_url(media.file))
+                for media in post.media_files.all()
+                if media.media_type == PostMedia.MediaType.IMAGE
+            ]
+            url["images"] = images
+            url["video"] = _video_entry(origin, post) if post.uses_video_player and images else None
+        return urls
+
+
+class SeriesSitemap(Sitemap):
+    """Series pages with at least one published post — lastmod of the newest post."""
+
+    changefreq = "weekly"
+    priority = 0.6
+    limit = SITEMAP_PAGE_SIZE
+    _public = Q(posts__status=Post.Status.PUBLISHED, posts__deleted_at__isnull=True)
+
+    def items(self):
+        return (
+            Series.objects.annotate(latest=Max("posts__updated_at", filter=self._public))
+            .filter(latest__isnull=False)
+            .order_by("pk")
+        )
+
+    def location(self, obj):
+        return reverse("series_detail", kwargs={"slug": obj.slug})
+
+    def lastmod(self, obj):
+        return obj.latest
+
+    def get_latest_lastmod(self):
+        return Series.objects.aggregate(latest=Max("posts__updated_at", filter=self._public))["latest"]
+
 
 class StaticViewSitemap(Sitemap):
     """Static pages (home, about) — changefreq daily, priority 0.5."""
@@ -29,4 +116,73 @@ class StaticViewSitemap(Sitemap):
         return ["post_list", "about"]
 
     def location(self, item):
-        return reverse(item)
\ No newline at end of file
+        return reverse(item)
+
+
+sitemaps = {
+    **{f"posts-{value}": PostSitemap(value) for value in Post.ContentType.values},
+    "series": SeriesSitemap,
+    "static": StaticViewSitemap,
+}
+
+
+def sitemap_index(request):
+    return _cached(
+        request,
+        ("index",),
+        lambda: sitemap_views.index(request, sitemaps, sitemap_url_name="sitemap_section"),
+    )
+
+
+def sitemap_section(request, section: str):
+    if section not in sitemaps:
+        raise Http404(f"No sitemap available for section: {section!r}")
+    # Only a valid page number reaches the cache key; junk ``?p=`` would
+    # otherwise mint one cached 404 per distinct string.
+    try:
+        page = int(request.GET.get("p", "1"))
+    except ValueError:
+        raise Http404("Invalid sitemap page") from None
+    if page < 1:
+        raise Http404("Invalid sitemap page")
+    return _cached(
+        request,
+        (section, page),
+        lambda: sitemap_views.sitemap(request, sitemaps, section=section, template_name=SITEMAP_TEMPLATE),
+    )
+
+
+def _cached(request, key_parts, view):
+    def render():
+        response = view()
+        response.render()
+        return response["Content-Type"], response.content
+
+    return cached_conditional_response(
+        request,
+        namespace="sitemap",
+        key_parts=(SITEMAP_RENDER_VERSION, *key_parts),
+        stamp=posts_stamp(public_posts()),
+        render=render,
+    )
+
+
+def _absolute(origin: str, url: str) -> str:
+    return url if url.startswith(("http://", "https://")) else f"{origin}{url}"
+
+
+def _video_entry(origin: str, post: Post) -> dict | None:
+    """Google video extension needs thumbnail, title, description and a media URL."""
+    content_url = post.player_media_url
+    # The cover pointer may be stale (None) even when the post has images.
+    cover = post.cover_media or next(
+        (media for media in post.media_files.all() if media.media_type == PostMedia.MediaType.IMAGE), None
+    )
+    if not content_url or cover is None:
+        return None
+    return {
+        "thumbnail": _absolute(origin, cover.thumbnail_og_url),
+        "title": post.title,
+        "description": post.description or post.plain_text_excerpt,
+        "content": _absolute(origin, content_url),
+    }
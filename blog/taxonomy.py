@@ -0,0 +1,80 @@
+"""Cached snapshot of categories and tags for the post list sidebar.
+
+The sidebar (category buttons and the tag map with public post counts) is the
+same for every visitor, yet used to cost three queries per page view. The
+snapshot is built with one ``UNION`` query, kept in the cache until a
+``Post``, ``Tag`` or ``Category`` write bumps the ``taxonomy`` namespace (see
+``blog.signals``),
+and also resolves ``?category=``/``?tag=`` slugs without extra lookups.
+
+Bulk writes that bypass model signals (``QuerySet.update``, ``bulk_create``,
+``bulk_update``) must call ``invalidate_taxonomy()`` themselves.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.db.models import CharField, Count, Q, Value
+
+from .cache_keys import bump_namespace, versioned_key
+from .models import Category, Post, Tag
+
+# Bump when the snapshot shape changes so pickled snapshots are not reused.
+TAXONOMY_SNAPSHOT_VERSION = 1
+# Safety net for writes that slip past invalidation.
+TAXONOMY_CACHE_TIMEOUT = 3600
+
+
+@dataclass(frozen=True)
+class TaxonomySnapshot:
+    """Categories, all tags, and tags with public posts (``tag_map``)."""
+
+    categories: tuple[Category, ...]
+    tags: tuple[Tag, ...]
+    categories_by_slug: dict[str, Category] = field(repr=False)
+    tags_by_slug: dict[str, Tag] = field(repr=False)
+
+    @property
+    def tag_map(self) -> list[Tag]:
+        return [tag for tag in self.tags if tag.public_post_count]
+
+
+def build_taxonomy_snapshot() -> TaxonomySnapshot:
+    """Read categories and tags with public post counts in a single query."""
+    public = Q(posts__status=Post.Status.PUBLISHED, posts__deleted_at__isnull=True)
+    columns = ("kind", "pk", "name", "slug", "public_post_count")
+    categories = Category.objects.annotate(
+        kind=Value("category", output_field=CharField()),
+        public_post_count=Count("posts", filter=public, distinct=True),
+    ).order_by().values_list(*columns)
+    tags = Tag.objects.annotate(
+        kind=Value("tag", output_field=CharField()),
+        public_post_count=Count("posts", filter=public, distinct=True),
+    ).order_by().values_list(*columns)
+
+    by_kind: dict[str, list] = {"category": [], "tag": []}
+    for kind, pk, name, slug, count in categories.union(tags, all=True).order_by("kind", "name"):
+        model = Category if kind == "category" else Tag
+        item = model(pk=pk, name=name, slug=slug)
+        item.public_post_count = count
+        by_kind[kind].append(item)
+    return TaxonomySnapshot(
+        categories=tuple(by_kind["category"]),
+        tags=tuple(by_kind["tag"]),
+        categories_by_slug={item.slug: item for item in by_kind["category"]},
+        tags_by_slug={item.slug: item for item in by_kind["tag"]},
+    )
+
+
+def get_taxonomy_snapshot() -> TaxonomySnapshot:
+    return cache.get_or_set(taxonomy_cache_key(), build_taxonomy_snapshot, TAXONOMY_CACHE_TIMEOUT)
+
+
+def taxonomy_cache_key() -> str:
+    return versioned_key("taxonomy", "snapshot", TAXONOMY_SNAPSHOT_VERSION)
+
+
+def invalidate_taxonomy() -> None:
+    bump_namespace("taxonomy")
@@ -0,0 +1,87 @@
+"""Namespaced cache versions shared between worker processes."""
+
+from io import StringIO
+
+import pytest
+from django.core.cache import cache, caches
+from django.core.management import call_command
+
+from blog.cache_keys import bump_namespace, namespace_version, namespace_versions, versioned_key
+from blog.models import Post
+from blog.taxonomy import get_taxonomy_snapshot, taxonomy_cache_key
+
+
+@pytest.fixture
+def file_cache(settings, tmp_path):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "cache"),
+        }
+    }
+    # A second connection to the same location stands in for another worker.
+    return caches.create_connection("default")
+
+
+def test_bump_retires_only_its_namespace():
+    html_key, taxonomy_key = versioned_key("post_html", 1), versioned_key("taxonomy", "snapshot")
+    cache.set_many({html_key: "<p>old</p>", taxonomy_key: "snapshot"})
+
+    bump_namespace("post_html")
+
+    assert versioned_key("post_html", 1) != html_key
+    assert versioned_key("taxonomy", "snapshot") == taxonomy_key
+
+
+def test_lost_version_counter_never_resurrects_old_keys():
+    before = namespace_version("feed")
+    cache.delete("blog:feed:version")
+
+    assert namespace_version("feed") != before
+    assert set(namespace_versions()) >= {"post_html", "taxonomy", "feed", "sitemap"}
+
+
+def test_unknown_namespace_is_rejected():
+    with pytest.raises(ValueError):
+        versioned_key("posts", 1)
+
+
+@pytest.mark.django_db
+def test_post_html_invalidation_reaches_other_workers(file_cache):
+    post = Post.objects.create(title="Shared", content="Первый текст", status=Post.Status.PUBLISHED)
+    html = post.body_content_html
+    key = versioned_key("post_html", post.pk)
+    assert file_cache.get(key) == html
+
+    post.content = "Второй текст"
+    post.save()
+
+    assert file_cache.get(key) is None
+    assert "Второй" in Post.objects.get(pk=post.pk).body_content_html
+
+
+@pytest.mark.django_db
+def test_taxonomy_bump_is_seen_by_other_workers(file_cache):
+    Post.objects.create(title="Tagged", content="Текст", status=Post.Status.PUBLISHED)
+    get_taxonomy_snapshot()
+    stale_key = taxonomy_cache_key()
+    assert file_cache.get(stale_key) is not None
+
+    Post.objects.create(title="Another", content="Текст", status=Post.Status.PUBLISHED)
+
+    # The other worker reads the bumped counter, so it never reaches the stale snapshot.
+    version = file_cache.get("blog:taxonomy:version")
+    assert stale_key != versioned_key("taxonomy", "snapshot", 1, version=version)
+
+
+def test_cache_stats_reports_backend_and_bumps_namespaces():
+    before = namespace_versions()
+    output = StringIO()
+
+    call_command("cache_stats", "--bump", "sitemap", stdout=output)
+
+    lines = output.getvalue().splitlines()
+    assert lines[0].startswith("backend=locmem ")
+    assert "shared=False" in lines[0] and "roundtrip=ok" in lines[0]
+    assert f"namespace=sitemap version={before['sitemap'] + 1} bumped=True" in lines
+    assert f"namespace=feed version={before['feed']} bumped=False" in lines
@@ -1,9 +1,12 @@
+import errno
+import os
 from pathlib import Path
 
 import pytest
 from django.core.management import call_command
 from django.core.management.base import CommandError
 
+from blog.content_import.file_transfer import transfer_file
 from blog.content_import.media_bundle import collect_note_media_bundle, iter_media_targets_for_bundle
 from blog.models import Post
 from blog.services.obsidian_importer import import_obsidian_note_to_post
@@ -148,3 +151,164 @@ def test_collect_command_raises_when_missing_media(tmp_path):
 
     with pytest.raises(CommandError, match="Some local media references"):
         call_command("collect_note_assets", note, tmp_path / "bundle")
+
+
+def test_collect_note_assets_scans_vault_once_for_many_embeds(tmp_path, monkeypatch):
+    from blog.content_import import vault_index
+
+    vault = tmp_path / "vault"
+    files_dir = vault / "999_files"
+    lesson_dir = vault / "10_Lessons"
+    files_dir.mkdir(parents=True)
+    lesson_dir.mkdir()
+    (vault / ".obsidian").mkdir()
+    (vault / ".obsidian" / "img-0.png").write_bytes(b"config copy")
+    for number in range(20):
+        (files_dir / f"img-{number}.png").write_bytes(b"image")
+    (lesson_dir / "img-0.png").write_bytes(b"note-local wins")
+    note = lesson_dir / "lesson.md"
+    note.write_text("\n".join(f"![[img-{number}.png]]" for number in range(20)), encoding="utf-8")
+
+    scandir_calls = []
+    real_scandir = vault_index.os.scandir
+    monkeypatch.setattr(vault_index, "_INDEXES", {})
+    monkeypatch.setattr(
+        vault_index.os, "scandir", lambda path: scandir_calls.append(path) or real_scandir(path)
+    )
+
+    result = collect_note_media_bundle(note, tmp_path / "bundle", vault_root=vault)
+
+    assert result.missing == []
+    assert len(result.copied) == 20
+    assert result.copied[0].source_path == (lesson_dir / "img-0.png").resolve()
+    assert len(scandir_calls) == 3  # vault, 10_Lessons, 999_files; .obsidian skipped
+
+
+def test_vault_index_checks_freshness_once_per_run(tmp_path, monkeypatch):
+    from blog.content_import import vault_index
+
+    vault = tmp_path / "vault"
+    (vault / "notes").mkdir(parents=True)
+    (vault / "files").mkdir()
+    for number in range(10):
+        (vault / "files" / f"img-{number}.png").write_bytes(b"image")
+    note = vault / "notes" / "lesson.md"
+    note.write_text("\n".join(f"![[img-{number}.png]]" for number in range(10)), encoding="utf-8")
+    monkeypatch.setattr(vault_index, "_INDEXES", {})
+    collect_note_media_bundle(note, tmp_path / "first", vault_root=vault)
+
+    checks = []
+    real_is_fresh = vault_index.VaultIndex.is_fresh
+    monkeypatch.setattr(vault_index.VaultIndex, "is_fresh", lambda self: checks.append(self.root) or real_is_fresh(self))
+    result = collect_note_media_bundle(note, tmp_path / "second", vault_root=vault)
+
+    assert len(result.copied) == 10
+    assert checks == [vault.resolve()]  # once for the run, not once per embed
+
+
+def test_media_link_lookups_outside_a_run_see_added_and_deleted_files(tmp_path, monkeypatch):
+    from blog.content_import import collect_broken_local_links, collect_local_media_references, vault_index
+
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    (assets / "cover.png").write_bytes(b"cover")
+    markdown = "![[cover.png]]\n\n![[diagram.png]]\n"
+    monkeypatch.setattr(vault_index, "_INDEXES", {})
+    assert collect_broken_local_links(markdown, assets) == ["diagram.png"]
+
+    (assets / "diagram.png").write_bytes(b"diagram")
+    os.utime(assets, ns=(1, 1))
+    found = collect_local_media_references(markdown, assets).found
+    assert [reference.path.name for reference in found] == ["cover.png", "diagram.png"]
+
+    (assets / "cover.png").unlink()
+    os.utime(assets, ns=(2, 2))
+    assert collect_broken_local_links(markdown, assets) == ["cover.png"]
+
+    checks = []
+    real_is_fresh = vault_index.VaultIndex.is_fresh
+    monkeypatch.setattr(vault_index.VaultIndex, "is_fresh", lambda self: checks.append(self.root) or real_is_fresh(self))
+    with vault_index.vault_index_run():
+        collect_local_media_references(markdown, assets)
+        collect_broken_local_links(markdown, assets)
+    assert checks == [assets.resolve()]
+
+
+def test_vault_index_cache_file_is_reused_until_directory_mtime_changes(tmp_path, monkeypatch):
+    from blog.content_import import vault_index
+
+    vault = tmp_path / "vault"
+    (vault / "media").mkdir(parents=True)
+    (vault / "media" / "cover.webp").write_bytes(b"cover")
+    cache_path = tmp_path / "index.json"
+    monkeypatch.setattr(vault_index, "_INDEXES", {})
+    vault_index.get_vault_index(vault, cache_path=cache_path)
+
+    monkeypatch.setattr(vault_index, "_INDEXES", {})
+    monkeypatch.setattr(vault_index.VaultIndex, "build", None)
+    cached = vault_index.get_vault_index(vault, cache_path=cache_path)
+    assert cached.lookup("cover") == vault.resolve() / "media" / "cover.webp"
+
+    monkeypatch.undo()
+    monkeypatch.setattr(vault_index, "_INDEXES", {})
+    (vault / "media" / "diagram.png").write_bytes(b"diagram")
+    os.utime(vault / "media", ns=(1, 1))
+    rebuilt = vault_index.get_vault_index(vault, cache_path=cache_path)
+    assert rebuilt.lookup("diagram.png") == vault.resolve() / "media" / "diagram.png"
+
+
+def test_transfer_file_hard_links_then_falls_back_to_kernel_copy(tmp_path, monkeypatch):
+    source = tmp_path / "episode.mp3"
+    source.write_bytes(b"ID3" + b"\x00" * 4096)
+
+    assert transfer_file(source, tmp_path / "linked.mp3", mode="link") == "hardlink"
+    assert (tmp_path / "linked.mp3").stat().st_ino == source.stat().st_ino
+    with pytest.raises(FileExistsError):
+        transfer_file(source, tmp_path / "linked.mp3", mode="link")
+
+    def cross_device(*_args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", cross_device)
+    method = transfer_file(source, tmp_path / "cloned.mp3", mode="link")
+    assert method in {"reflink", "copy_file_range", "sendfile", "copy"}
+    assert (tmp_path / "cloned.mp3").read_bytes() == source.read_bytes()
+    assert (tmp_path / "cloned.mp3").stat().st_ino != source.stat().st_ino
+
+    monkeypatch.setattr(os, "copy_file_range", cross_device, raising=False)
+    assert transfer_file(source, tmp_path / "sent.mp3", mode="copy") in {"sendfile", "copy"}
+    assert (tmp_path / "sent.mp3").read_bytes() == source.read_bytes()
+
+
+def test_collect_note_assets_link_mode_reports_method_per_asset(tmp_path):
+    (tmp_path / "cover.png").write_bytes(b"cover")
+    note = tmp_path / "lesson.md"
+    note.write_text("![[cover.png]]\n", encoding="utf-8")
+    (tmp_path / "bundle").mkdir()
+    (tmp_path / "bundle" / "cover.png").write_bytes(b"stale")
+
+    result = collect_note_media_bundle(note, tmp_path / "bundle", link_mode="link")
+
+    assert [item.method for item in result.copied] == ["hardlink"]
+    assert (tmp_path / "bundle" / "cover.png").read_bytes() == b"cover"
+
+
+@pytest.mark.django_db
+def test_import_obsidian_note_links_assets_into_media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path / "media-root"
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    (assets / "episode.mp3").write_bytes(b"ID3" + b"\x00" * 1024)
+    note = assets / "episode.md"
+    note.write_text(
+        "---\ntitle: Выпуск\ndescription: Подкаст\ntype: podcast\n---\n![[episode.mp3]]\n", encoding="utf-8"
+    )
+
+    post = import_obsidian_note_to_post(note, assets_dir=assets, link_mode="link")
+
+    media = post.media_files.get()
+    assert post.media_transfers == [("episode.mp3", "hardlink")]
+    assert Path(media.file.path).stat().st_ino == (assets / "episode.mp3").stat().st_ino
+    assert post.player_media_url == media.file.url
+    media.file.storage.delete(media.file.name)
+    assert (assets / "episode.mp3").exists()
@@ -32,3 +32,66 @@ def test_dev_media_view_advertises_range_support_for_full_response(tmp_path, rf)
     assert response.status_code == 200
     assert response.headers["Accept-Ranges"] == "bytes"
     assert response.headers["Content-Length"] == "6"
+
+
+def test_media_view_answers_conditional_requests_with_304(tmp_path, rf):
+    (tmp_path / "demo.mp3").write_bytes(b"abcdef")
+    etag = serve_media_with_range(rf.get("/media/demo.mp3"), "demo.mp3", tmp_path).headers["ETag"]
+
+    response = serve_media_with_range(
+        rf.get("/media/demo.mp3", HTTP_IF_NONE_MATCH=etag), "demo.mp3", tmp_path
+    )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_media_view_ignores_range_when_if_range_is_stale(tmp_path, rf):
+    (tmp_path / "demo.mp4").write_bytes(b"0123456789")
+    request = rf.get("/media/demo.mp4", HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE='"stale"')
+
+    response = serve_media_with_range(request, "demo.mp4", tmp_path)
+
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == b"0123456789"
+
+
+def test_media_view_serves_suffix_and_multiple_ranges(tmp_path, rf):
+    (tmp_path / "demo.mp4").write_bytes(b"0123456789")
+
+    suffix = serve_media_with_range(
+        rf.get("/media/demo.mp4", HTTP_RANGE="bytes=-3"), "demo.mp4", tmp_path
+    )
+    assert suffix.headers["Content-Range"] == "bytes 7-9/10"
+    assert b"".join(suffix.streaming_content) == b"789"
+
+    multi = serve_media_with_range(
+        rf.get("/media/demo.mp4", HTTP_RANGE="bytes=0-1, 6-7"), "demo.mp4", tmp_path
+    )
+    body = b"".join(multi.streaming_content)
+    assert multi.status_code == 206
+    assert multi.headers["Content-Type"].startswith("multipart/byteranges; boundary=")
+    assert int(multi.headers["Content-Length"]) == len(body)
+    assert b"Content-Range: bytes 0-1/10\r\n\r\n01\r\n" in body
+    assert b"Content-Range: bytes 6-7/10\r\n\r\n67\r\n" in body
+
+    unsatisfiable = serve_media_with_range(
+        rf.get("/media/demo.mp4", HTTP_RANGE="bytes=20-30"), "demo.mp4", tmp_path
+    )
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["Content-Range"] == "bytes */10"
+
+
+def test_media_view_delegates_to_nginx_in_accel_redirect_mode(tmp_path, rf, settings):
+    settings.MEDIA_SERVE_MODE = "x-accel-redirect"
+    (tmp_path / "posts").mkdir()
+    (tmp_path / "posts" / "эпизод 1.mp3").write_bytes(b"abc")
+
+    response = serve_media_with_range(rf.get("/media/x"), "posts/эпизод 1.mp3", tmp_path)
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["X-Accel-Redirect"] == (
+        "/_protected_media/posts/%D1%8D%D0%BF%D0%B8%D0%B7%D0%BE%D0%B4%201.mp3"
+    )
+    assert response.headers["Content-Type"] == "audio/mpeg"
@@ -0,0 +1,186 @@
+"""Tests for the batch Obsidian vault importer."""
+
+import os
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from PIL import Image
+
+from blog.content_import.vault_import import parse_notes
+from blog.models import Category, Post, PostMedia, Tag
+
+
+def png_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (8, 6), "navy").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def vault(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path / "media-root"
+    root = tmp_path / "vault"
+    (root / "10_Lessons").mkdir(parents=True)
+    (root / "999_files" / "lessons").mkdir(parents=True)
+    (root / "999_files" / "lessons" / "cover.png").write_bytes(png_bytes())
+    (root / "999_files" / "lessons" / "diagram.png").write_bytes(png_bytes())
+    (root / "10_Lessons" / "first.md").write_text(
+        "---\ntitle: Первый урок\ndescription: Первое описание\nseries: lm-studio-course\n"
+        "tags: [llm, local-models]\ncover: \"[[cover.png]]\"\n---\n\n"
+        "Текст со [[Вторым уроком|ссылкой]].\n\n![[diagram.png]]\n",
+        encoding="utf-8",
+    )
+    (root / "10_Lessons" / "second.md").write_text(
+        "---\ntitle: Второй урок\ndescription: Второе описание\nseries: lm-studio-course\ntags: [llm]\n---\n\nТекст.\n",
+        encoding="utf-8",
+    )
+    (root / "10_Lessons" / "scratch.md").write_text("Черновик без frontmatter.\n", encoding="utf-8")
+    return root
+
+
+@pytest.mark.django_db
+def test_vault_dry_run_prints_plan_without_writing(vault):
+    output = StringIO()
+
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--dry-run", stdout=output)
+
+    text = output.getvalue()
+    assert "plan: create slug=pervyy-urok note=10_Lessons/first.md media=2 tags=2" in text
+    assert "skipped: 10_Lessons/scratch.md: no frontmatter description" in text
+    assert "notes=3 create=2 replace=0 skipped=1 errors=0 update=0 unchanged=0 dry_run=True" in text
+    assert not Post.objects.exists() and not Tag.objects.exists()
+
+
+@pytest.mark.django_db
+def test_vault_import_creates_posts_taxonomy_and_media_in_batches(vault):
+    output = StringIO()
+
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--batch-size", "1", stdout=output)
+
+    assert "created=2 replaced=0 skipped=1 errors=0 media=2" in output.getvalue()
+    first = Post.objects.get(slug="pervyy-urok")
+    assert first.category == Category.objects.get(name="LM Studio")
+    assert sorted(first.tags.values_list("name", flat=True)) == ["LLM", "Local Models"]
+    assert Tag.objects.filter(name="LLM").count() == 1
+    assert list(first.media_files.values_list("original_filename", flat=True)) == ["cover.png", "diagram.png"]
+    assert first.cover_media.original_filename == "cover.png"
+    assert first.media_files.get(original_filename="diagram.png").file.url in first.content_html
+    assert "Текст со ссылкой." in first.content
+    assert first.published_at is not None
+
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", stdout=(second_run := StringIO()))
+    assert "created=0 replaced=0 skipped=3" in second_run.getvalue()
+
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--replace", stdout=(replace_run := StringIO()))
+    assert "created=0 replaced=2" in replace_run.getvalue()
+    assert Post.objects.filter(slug="pervyy-urok").count() == 1
+
+
+@pytest.mark.django_db
+def test_vault_import_reports_broken_links_and_imports_the_rest(vault):
+    (vault / "10_Lessons" / "broken.md").write_text(
+        "---\ntitle: Сломанный\ndescription: Нет файла\n---\n![[missing.png]]\n", encoding="utf-8"
+    )
+
+    with pytest.raises(CommandError, match="errors=1"):
+        call_command("import_obsidian_vault", str(vault), "--workers", "1", stdout=StringIO(), stderr=StringIO())
+
+    assert set(Post.objects.values_list("slug", flat=True)) == {"pervyy-urok", "vtoroy-urok"}
+
+
+@pytest.mark.django_db
+def test_vault_sync_skips_unchanged_and_copies_only_changed_assets(
+    vault, monkeypatch, django_capture_on_commit_callbacks
+):
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--sync", stdout=StringIO())
+    first = Post.objects.get(slug="pervyy-urok")
+    cover = first.media_files.get(original_filename="cover.png")
+    diagram = first.media_files.get(original_filename="diagram.png")
+    assert len(first.source_hash) == 64 and len(diagram.sha256) == 64
+
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--sync", stdout=(rerun := StringIO()))
+    assert "created=0 replaced=0 skipped=1 errors=0 media=0 updated=0 unchanged=2" in rerun.getvalue()
+
+    # Same bytes, new mtime: the note is re-checked but nothing is copied or rendered.
+    diagram_path = vault / "999_files" / "lessons" / "diagram.png"
+    os.utime(diagram_path, ns=(1, 1))
+    rendered = []
+    monkeypatch.setattr(
+        "blog.content_import.vault_import.convert_markdown_to_html",
+        lambda content, post=None: rendered.append(post.slug) or "<p>x</p>",
+    )
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--sync", stdout=(touched := StringIO()))
+    assert "media=0 updated=1 unchanged=1" in touched.getvalue()
+    assert rendered == []
+    assert set(PostMedia.objects.values_list("pk", flat=True)) == {cover.pk, diagram.pk}
+
+    # Changed asset bytes: only that asset is replaced and the body re-rendered.
+    Image.new("RGB", (8, 6), "red").save(diagram_path, format="PNG")
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("import_obsidian_vault", str(vault), "--workers", "1", "--sync", stdout=(changed := StringIO()))
+    assert "media=1 updated=1 unchanged=1" in changed.getvalue()
+    assert rendered == ["pervyy-urok"]
+    first.refresh_from_db()
+    assert first.media_files.get(original_filename="cover.png").pk == cover.pk
+    new_diagram = first.media_files.get(original_filename="diagram.png")
+    assert new_diagram.pk != diagram.pk and new_diagram.sha256 != diagram.sha256
+    assert not diagram.file.storage.exists(diagram.file.name)
+
+    # A re-copied cover still sorts before the kept body image.
+    Image.new("RGB", (8, 6), "green").save(vault / "999_files" / "lessons" / "cover.png", format="PNG")
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--sync", stdout=StringIO())
+    assert Post.objects.get(slug="pervyy-urok").cover_media.original_filename == "cover.png"
+
+    # Frontmatter-only edit: fields update without copying or re-rendering.
+    note = vault / "10_Lessons" / "second.md"
+    note.write_text(note.read_text(encoding="utf-8").replace("Второе описание", "Новое описание"), encoding="utf-8")
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--sync", stdout=StringIO())
+    second = Post.objects.get(slug="vtoroy-urok")
+    assert second.description == "Новое описание"
+    assert rendered == ["pervyy-urok", "pervyy-urok"]
+
+
+@pytest.mark.django_db
+def test_vault_sync_replaces_tags_in_bulk_and_retires_cards_once(
+    vault, monkeypatch, django_capture_on_commit_callbacks
+):
+    from blog.cache_keys import namespace_version
+
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--sync", stdout=StringIO())
+    edits = [("first.md", "tags: [llm, local-models]", "tags: [llm]"), ("second.md", "tags: [llm]", "tags: [llm, rag]")]
+    for name, old, new in edits:
+        note = vault / "10_Lessons" / name
+        note.write_text(note.read_text(encoding="utf-8").replace(old, new), encoding="utf-8")
+    m2m_calls = []
+    monkeypatch.setattr(Post.tags.related_manager_cls, "set", lambda *args, **kwargs: m2m_calls.append(args))
+    card_version = namespace_version("post_card")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("import_obsidian_vault", str(vault), "--workers", "1", "--sync", stdout=StringIO())
+
+    assert m2m_calls == []
+    assert list(Post.objects.get(slug="pervyy-urok").tags.values_list("name", flat=True)) == ["LLM"]
+    assert sorted(Post.objects.get(slug="vtoroy-urok").tags.values_list("name", flat=True)) == ["LLM", "Rag"]
+    assert namespace_version("post_card") == card_version + 1
+
+
+@pytest.mark.django_db
+def test_vault_import_link_mode_reports_transfer_per_asset(vault):
+    output = StringIO()
+
+    call_command("import_obsidian_vault", str(vault), "--workers", "1", "--link-mode", "link", stdout=output)
+
+    assert "media: pervyy-urok: cover.png (hardlink)" in output.getvalue()
+    assert "media: pervyy-urok: diagram.png (hardlink)" in output.getvalue()
+    cover = Post.objects.get(slug="pervyy-urok").cover_media
+    assert os.stat(cover.file.path).st_ino == os.stat(vault / "999_files" / "lessons" / "cover.png").st_ino
+
+
+def test_vault_notes_parse_in_spawned_worker_pool(vault):
+    notes = parse_notes(vault, ["10_Lessons/first.md", "10_Lessons/second.md"], workers=2)
+
+    assert [note.title for note in notes] == ["Первый урок", "Второй урок"]
+    assert notes[0].media_targets == ("diagram.png",)
+    assert notes[0].cover == "cover.png"
@@ -0,0 +1,86 @@
+from blog.content_import.markdown_tokens import EMBED, FENCE, IMAGE, LINK, WIKILINK, tokenize
+from blog.content_import.media_links import iter_local_document_targets, iter_local_media_targets
+from blog.content_import.obsidian import normalize_obsidian_note_links
+from blog.content_import.timecodes import extract_timecode_blocks
+from blog.models import Post
+
+
+NOTE = """---
+title: Урок
+cover: "[[cover.webp]]"
+---
+# Урок
+
+![[cover.webp|500]] и [[Другая заметка|ссылка]].
+![Схема](<media/схема один.png>) и [статья](notes/article.md).
+[![badge](badge.svg)](https://example.com)
+
+```python
+print("![[not-an-asset.png]] [[not-a-link]]")
+```
+
+`![[inline.png]]`
+
+```timecodes
+00:00 Intro
+01:30 Main
+```
+"""
+
+
+def test_tokenize_finds_every_span_in_source_order_once():
+    tokens = tokenize(NOTE)
+
+    assert tokens is tokenize(NOTE)
+    assert tokens.frontmatter.body == 'title: Урок\ncover: "[[cover.webp]]"'
+    media = [(token.kind, token.target, token.label) for token in tokens.of(EMBED, IMAGE, WIKILINK, LINK)]
+    assert media == [
+        (EMBED, "cover.webp", "500"),
+        (WIKILINK, "Другая заметка", "ссылка"),
+        (IMAGE, "<media/схема один.png>", "Схема"),
+        (LINK, "notes/article.md", "статья"),
+        (IMAGE, "badge.svg", "badge"),
+    ]
+    fences = [(token.label, token.body) for token in tokens.of(FENCE)]
+    assert fences[0][0] == "python"
+    assert [token.body for token in tokens.timecode_fences()] == ["00:00 Intro\n01:30 Main"]
+    for token in tokens.tokens:
+        assert NOTE[token.start : token.end].strip()
+
+
+def test_consumers_skip_code_and_frontmatter():
+    assert list(iter_local_media_targets(NOTE)) == ["cover.webp", "схема один.png", "badge.svg"]
+    assert list(iter_local_document_targets(NOTE)) == ["Другая заметка", "article.md"]
+
+    normalized = normalize_obsidian_note_links(NOTE)
+    assert "и ссылка." in normalized
+    assert "[[not-a-link]]" in normalized
+
+    cleaned, entries = extract_timecode_blocks(normalized)
+    assert [entry["seconds"] for entry in entries] == [0, 90]
+    assert "```timecodes" not in cleaned
+    assert "```python" in cleaned
+
+
+def test_unclosed_fence_does_not_hide_the_rest_of_the_note():
+    tokens = tokenize("```\n![[a.png]]\n\n[[b]]")
+
+    assert [(token.kind, token.target) for token in tokens.tokens] == [(EMBED, "a.png"), (WIKILINK, "b")]
+
+
+def test_rewrite_keeps_spans_when_replacement_is_none():
+    tokens = tokenize("a ![[x.png]] b [[y]] c")
+
+    assert tokens.rewrite(lambda token: None, (EMBED, WIKILINK)) == "a ![[x.png]] b [[y]] c"
+    assert tokens.rewrite(lambda token: token.target.upper(), (WIKILINK,)) == "a ![[x.png]] b Y c"
+
+
+def test_plain_text_excerpt_uses_token_spans():
+    post = Post(title="Урок", content=NOTE.split("---\n", 2)[2])
+
+    excerpt = post.plain_text_excerpt
+
+    assert excerpt.startswith("и . и статья.")
+    assert "print" not in excerpt
+    assert "cover.webp" not in excerpt
+    assert "badge" not in excerpt
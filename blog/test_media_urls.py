@@ -0,0 +1,92 @@
+"""Batched, templated and cached media URL resolution (``blog.media_urls``)."""
+
+import pytest
+from django.core.cache import cache
+from storages.backends.s3 import S3Storage
+
+from blog.media_urls import embeddable_timeout, media_url, prime_media_urls, signed_url_cache_timeout
+
+NAMES = ["posts/intro/cover.webp", "posts/intro/thumb card.png", "posts/урок/кадр.jpg"]
+
+
+class StoredFile:
+    """Minimal ``FieldFile`` stand-in: a name on a storage."""
+
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+
+    def __bool__(self):
+        return bool(self.name)
+
+
+class CountingS3Storage(S3Storage):
+    def __init__(self, **options):
+        super().__init__(
+            endpoint_url="https://s3.example.test",
+            bucket_name="blog",
+            region_name="ru-1",
+            access_key="key",
+            secret_key="secret",
+            **options,
+        )
+        self.url_calls = 0
+
+    def url(self, name, *args, **kwargs):
+        self.url_calls += 1
+        return super().url(name, *args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"addressing_style": "path", "location": "media"},
+        {"addressing_style": "virtual"},
+        {"custom_domain": "cdn.example.test"},
+    ],
+)
+def test_public_bucket_urls_are_built_from_a_template(options):
+    reference = CountingS3Storage(querystring_auth=False, **options)
+    storage = CountingS3Storage(querystring_auth=False, **options)
+
+    urls = [media_url(StoredFile(storage, name)) for name in NAMES]
+
+    assert urls == [reference.url(name) for name in NAMES]
+    assert storage.url_calls == 1  # the sentinel only
+
+
+def test_signed_urls_are_cached_for_a_fraction_of_their_lifetime():
+    storage = CountingS3Storage(querystring_auth=True, querystring_expire=3600)
+    files = [StoredFile(storage, name) for name in NAMES]
+
+    prime_media_urls(files)
+    assert storage.url_calls == len(NAMES)
+    assert all("X-Amz-Signature=" in media_url(file) for file in files)
+    assert storage.url_calls == len(NAMES)  # memoized on the file
+
+    again = [StoredFile(storage, name) for name in NAMES]
+    prime_media_urls(again)
+    assert storage.url_calls == len(NAMES)  # served by one get_many
+    assert [media_url(file) for file in again] == [media_url(file) for file in files]
+
+    assert signed_url_cache_timeout(storage) == 1800
+    assert embeddable_timeout(24 * 3600, storage) == 1800
+
+
+def test_memo_follows_the_file_name():
+    storage = CountingS3Storage(querystring_auth=False)
+    file = StoredFile(storage, "posts/a/old.webp")
+    assert media_url(file).endswith("/old.webp")
+
+    file.name = "posts/a/new.webp"
+    assert media_url(file).endswith("/new.webp")
+    assert media_url(StoredFile(storage, "")) == ""
+
+
+def test_unsigned_storages_keep_full_fragment_timeouts():
+    assert embeddable_timeout(600, CountingS3Storage(querystring_auth=False)) == 600
@@ -62,3 +62,37 @@ def test_like_count_label_uses_russian_plural_forms(count, expected):
     post = Post(title="Counters", content="Body", like_count=count)
 
     assert post.like_count_label == expected
+
+
+@pytest.mark.django_db
+def test_post_save_stores_excerpt_word_count_reading_time_and_headings():
+    body = "# Заголовок\n\n" + "слово " * 400 + "\n\n## Раздел\n\n```python\n# not a heading\n```\n"
+    post = Post.objects.create(title="Статистика", description="d", content=body)
+
+    post.refresh_from_db()
+    assert post.word_count == 402
+    assert post.reading_time == 3
+    assert post.heading_count == 2
+    assert post.excerpt.startswith("Заголовок слово слово")
+    assert post.plain_text_excerpt == post.excerpt
+
+    post.title = "Заголовок"
+    post.save(update_fields=["title"])
+    post.refresh_from_db()
+    assert post.excerpt.startswith("слово")
+
+
+@pytest.mark.django_db
+def test_backfill_post_stats_fills_rows_written_without_save():
+    from django.core.management import call_command
+
+    post = Post.objects.create(title="Старый", description="d", content="Раз два три")
+    Post.objects.filter(pk=post.pk).update(excerpt="", word_count=0, reading_time=0)
+
+    call_command("backfill_post_stats", "--dry-run")
+    post.refresh_from_db()
+    assert post.word_count == 0
+
+    call_command("backfill_post_stats")
+    post.refresh_from_db()
+    assert (post.excerpt, post.word_count, post.reading_time) == ("Раз два три", 3, 1)
@@ -1,10 +1,9 @@
 """Tests for navigation features: related posts, breadcrumbs, TOC, series landing."""
 
 import pytest
-from django.test import Client
 from django.urls import reverse
 
-from blog.models import Category, Post, Series, Tag
+from blog.models import Category, Post, PostTextVector, RelatedPost, RelatedRefreshJob, Series, Tag
 
 
 def create_post(
@@ -113,6 +112,166 @@ def test_related_posts_excludes_drafts_and_deleted(client):
     assert "Deleted Related" not in related_titles
 
 
+@pytest.mark.django_db
+def test_related_posts_rank_by_overlap_strength(client):
+    """Two shared tags outrank one shared tag even when the weaker match is newer."""
+    django = Tag.objects.create(name="Django", slug="django")
+    htmx = Tag.objects.create(name="HTMX", slug="htmx")
+    current = create_post("Strength Current", tags=[django, htmx])
+    strong = create_post("Strength Strong", tags=[django, htmx])
+    create_post("Strength Weak", tags=[django])
+
+    related = [p.title for p in client.get(current.get_absolute_url()).context["related_posts"]]
+    assert related == ["Strength Strong", "Strength Weak"]
+    assert RelatedPost.objects.get(post=current, rank=0).related == strong
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("action", ["unpublish_posts", "archive_posts"])
+def test_related_posts_refresh_from_status_filtered_changelist(admin_client, action):
+    django = Tag.objects.create(name="Django", slug="django")
+    current = create_post("Filtered Current", tags=[django])
+    hidden = create_post("Filtered Hidden", tags=[django])
+    assert RelatedPost.objects.filter(post=current, related=hidden).exists()
+
+    admin_client.post(
+        reverse("admin:blog_post_changelist") + "?status__exact=published",
+        {"action": action, "_selected_action": [hidden.pk]},
+    )
+
+    assert not RelatedPost.objects.filter(post=current, related=hidden).exists()
+
+
+@pytest.mark.django_db
+def test_related_refresh_skips_saves_that_do_not_touch_ranking(monkeypatch):
+    post = create_post("Counter Post")
+    calls = []
+    monkeypatch.setattr("blog.signals.schedule_related_refresh", calls.append)
+
+    post.save(update_fields=["slug"])
+    post.save(update_fields=["updated_at"])
+    assert calls == []
+
+    post.status = Post.Status.DRAFT
+    post.save(update_fields=["status", "updated_at"])
+    post.save()
+    assert calls == [[post.pk], [post.pk]]
+
+
+@pytest.mark.django_db
+def test_related_posts_table_follows_unpublish_and_delete():
+    cat = Category.objects.create(name="Graph", slug="graph")
+    current = create_post("Graph Current", category=cat)
+    hidden = create_post("Graph Hidden", category=cat)
+    removed = create_post("Graph Removed", category=cat)
+    assert set(current.related_links.values_list("related__title", flat=True)) == {"Graph Hidden", "Graph Removed"}
+
+    hidden.status = Post.Status.DRAFT
+    hidden.save()
+    removed.delete()
+
+    assert not current.related_links.exists()
+    assert not RelatedPost.objects.filter(post=hidden).exists()
+
+
+@pytest.mark.django_db
+def test_related_posts_detail_reads_stored_ranking_in_one_query(django_assert_num_queries):
+    from blog.views import _get_related_posts
+
+    tag = Tag.objects.create(name="Query", slug="query")
+    current = create_post("Query Current", tags=[tag])
+    create_post("Query Other", tags=[tag])
+    current = Post.objects.prefetch_related("tags").get(pk=current.pk)
+
+    with django_assert_num_queries(2) as ctx:  # ranking + tags prefetch for cards
+        related = _get_related_posts(current)
+    assert [post.title for post in related] == ["Query Other"]
+    assert "DISTINCT" not in ctx.captured_queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_rebuild_related_posts_command_recomputes_table():
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    cat = Category.objects.create(name="Rebuild", slug="rebuild")
+    first = create_post("Rebuild A", category=cat)
+    create_post("Rebuild B", category=cat)
+    RelatedPost.objects.all().delete()
+
+    out = StringIO()
+    call_command("rebuild_related_posts", stdout=out)
+    assert "posts=2 links=2" in out.getvalue()
+    assert first.related_links.get().related.title == "Rebuild B"
+
+
+@pytest.mark.django_db
+def test_deferred_related_refresh_queues_saves_for_the_worker(settings):
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    settings.RELATED_POSTS_DEFERRED = True
+    cat = Category.objects.create(name="Deferred", slug="deferred")
+    tag = Tag.objects.create(name="Queue", slug="queue")
+    first = create_post("Deferred A", category=cat)
+    second = create_post("Deferred B", category=cat)
+    second.tags.add(tag)
+
+    assert not RelatedPost.objects.exists()
+    assert set(RelatedRefreshJob.objects.values_list("post_id", flat=True)) == {first.pk, second.pk}
+
+    out = StringIO()
+    call_command("rebuild_related_posts", "--pending", stdout=out)
+    assert "pending=2 links=2" in out.getvalue()
+    assert first.related_links.get().related == second
+    assert not RelatedRefreshJob.objects.exists()
+
+    second.delete()  # soft delete: the post itself is queued, its backlinks follow
+    assert first.related_links.exists()
+    assert list(RelatedRefreshJob.objects.values_list("post_id", flat=True)) == [second.pk]
+    call_command("rebuild_related_posts", "--pending", stdout=StringIO())
+    assert not first.related_links.exists()
+
+
+@pytest.mark.django_db
+def test_pending_related_refresh_requeues_on_failure(settings, monkeypatch):
+    from blog import related
+
+    RelatedRefreshJob.enqueue([1, 2])
+
+    def broken(pks):
+        raise RuntimeError("graph failed")
+
+    monkeypatch.setattr(related, "refresh_related_posts", broken)
+    with pytest.raises(RuntimeError):
+        related.refresh_pending_related_posts()
+    assert set(RelatedRefreshJob.objects.values_list("post_id", flat=True)) == {1, 2}
+
+
+@pytest.mark.django_db
+def test_rebuild_related_posts_if_missing_backfills_once():
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    cat = Category.objects.create(name="Backfill", slug="backfill-related")
+    first = create_post("Backfill A", category=cat)
+    create_post("Backfill B", category=cat)
+    RelatedPost.objects.all().delete()
+    PostTextVector.objects.filter(post=first).delete()
+
+    out = StringIO()
+    call_command("rebuild_related_posts", "--if-missing", stdout=out)
+    assert "posts=2 links=2 previous_links=0 vectors=1 rebuilt=yes" in out.getvalue()
+    assert PostTextVector.objects.filter(post=first).exists()
+
+    out = StringIO()
+    call_command("rebuild_related_posts", "--if-missing", stdout=out)
+    assert "vectors=0 rebuilt=no" in out.getvalue()
+
+
 # --- Breadcrumbs -----------------------------------------------------------
 
 
@@ -364,4 +523,158 @@ def test_series_landing_filter_deleted_at_isnull(client):
     response = client.get(url)
     assert response.status_code == 200
     for post in response.context["series_posts"]:
-        assert post.deleted_at is None
\ No newline at end of file
+        assert post.deleted_at is None
+
+# --- Denormalized series navigation ----------------------------------------
+
+
+def _navigation(post):
+    post.refresh_from_db()
+    return post.series_position, post.series_total, post.series_prev_id, post.series_next_id
+
+
+@pytest.mark.django_db
+def test_series_navigation_follows_reorder_unpublish_and_move():
+    series = Series.objects.create(name="Course", slug="course")
+    other = Series.objects.create(name="Other", slug="other")
+    first = create_post("First", series=series, series_order=1)
+    second = create_post("Second", series=series, series_order=2)
+    third = create_post("Third", series=series, series_order=3)
+
+    assert _navigation(second) == (2, 3, first.pk, third.pk)
+
+    third.series_order = 0
+    third.save(update_fields=["series_order"])
+    assert _navigation(third) == (1, 3, None, first.pk)
+    assert _navigation(second) == (3, 3, first.pk, None)
+
+    first.status = Post.Status.DRAFT
+    first.save()
+    assert _navigation(first) == (0, 0, None, None)
+    assert _navigation(third) == (1, 2, None, second.pk)
+
+    second.series = other
+    second.save()
+    assert _navigation(second) == (1, 1, None, None)
+    assert _navigation(third) == (1, 1, None, None)
+
+    third.series = None
+    third.save()
+    assert _navigation(third) == (0, 0, None, None)
+
+
+@pytest.mark.django_db
+def test_series_navigation_refreshes_on_delete_and_admin_actions(admin_client):
+    series = Series.objects.create(name="Admin Course", slug="admin-course")
+    first = create_post("Lesson A", series=series, series_order=1)
+    second = create_post("Lesson B", series=series, series_order=2)
+    third = create_post("Lesson C", series=series, series_order=3)
+
+    second.delete()
+    assert _navigation(first) == (1, 2, None, third.pk)
+
+    admin_client.post(
+        reverse("admin:blog_post_changelist"),
+        {"action": "unpublish_posts", "_selected_action": [first.pk]},
+    )
+    assert _navigation(first) == (0, 0, None, None)
+    assert _navigation(third) == (1, 1, None, None)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("action", ["unpublish_posts", "archive_posts"])
+def test_series_navigation_refreshes_from_status_filtered_changelist(admin_client, action):
+    series = Series.objects.create(name="Filtered Course", slug="filtered-course")
+    first = create_post("Part 1", series=series, series_order=1)
+    second = create_post("Part 2", series=series, series_order=2)
+
+    admin_client.post(
+        reverse("admin:blog_post_changelist") + "?status__exact=published",
+        {"action": action, "_selected_action": [second.pk]},
+    )
+
+    second.refresh_from_db()
+    assert second.status != Post.Status.PUBLISHED
+    assert _navigation(first) == (1, 1, None, None)
+
+
+@pytest.mark.django_db
+def test_detail_series_navigation_cost_does_not_grow_with_series(client):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client.get(create_post("Warm-up").get_absolute_url())  # session and caches
+    short = Series.objects.create(name="Short", slug="short")
+    long = Series.objects.create(name="Long", slug="long")
+    create_post("Short 1", series=short, series_order=1)
+    short_current = create_post("Short 2", series=short, series_order=2)
+    for order in range(1, 30):
+        create_post(f"Long {order}", series=long, series_order=order)
+    long_current = create_post("Long 30", series=long, series_order=30)
+
+    counts = []
+    for post in (short_current, long_current):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(post.get_absolute_url())
+        assert response.status_code == 200
+        counts.append(len(queries))
+    assert counts[0] == counts[1]
+    assert response.context["series_position"] == 30
+    assert response.context["series_total"] == 30
+    assert response.context["series_prev"]["title"] == "Long 29"
+
+
+@pytest.mark.django_db
+def test_series_toc_is_cached_until_the_series_changes(client, django_assert_num_queries):
+    series = Series.objects.create(name="Cached Course", slug="cached-course")
+    create_post("Cached 1", series=series, series_order=1, tags=[Tag.objects.create(name="orm", slug="orm")])
+    url = reverse("series_detail", kwargs={"slug": series.slug})
+    client.get(url)
+
+    with django_assert_num_queries(1):  # the Series row only
+        response = client.get(url)
+    assert [post.title for post in response.context["series_posts"]] == ["Cached 1"]
+    assert "#orm" in response.content.decode()
+
+    create_post("Cached 2", series=series, series_order=2)
+    response = client.get(url)
+    assert [post.title for post in response.context["series_posts"]] == ["Cached 1", "Cached 2"]
+
+
+@pytest.mark.django_db
+def test_refresh_series_navigation_command_backfills():
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    series = Series.objects.create(name="Backfill", slug="backfill")
+    first = create_post("Backfill 1", series=series, series_order=1)
+    second = create_post("Backfill 2", series=series, series_order=2)
+    Post.objects.update(series_position=0, series_total=0, series_prev=None, series_next=None)
+
+    out = StringIO()
+    call_command("refresh_series_navigation", stdout=out)
+
+    assert "series=1 updated=2 cleared=0" in out.getvalue()
+    assert _navigation(second) == (2, 2, first.pk, None)
+
+
+@pytest.mark.django_db
+def test_series_navigation_migration_backfills_existing_rows():
+    from importlib import import_module
+
+    from django.apps import apps
+
+    migration = import_module("blog.migrations.0023_backfill_series_navigation")
+    series = Series.objects.create(name="Migrated", slug="migrated")
+    first = create_post("Migrated 1", series=series, series_order=1)
+    draft = create_post("Migrated draft", series=series, series_order=2, status=Post.Status.DRAFT)
+    third = create_post("Migrated 3", series=series, series_order=3)
+    Post.objects.update(series_position=0, series_total=0, series_prev=None, series_next=None)
+    Post.objects.filter(pk=draft.pk).update(series_position=5, series_total=5)
+
+    migration.fill_series_navigation(apps, None)
+
+    assert _navigation(first) == (1, 2, None, third.pk)
+    assert _navigation(third) == (2, 2, first.pk, None)
+    assert _navigation(draft) == (0, 0, None, None)
@@ -4,7 +4,7 @@ from django.test.utils import CaptureQueriesContext
 from django.urls import resolve, reverse
 from io import BytesIO
 from pathlib import Path
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import parse_qs, parse_qsl, urlparse
 
 import pytest
 from bs4 import BeautifulSoup
@@ -104,6 +104,78 @@ def test_post_card_uses_first_image_as_cover(client):
     assert cover["alt"] == "Обложка статьи Пост с обложкой"
 
 
+def attach_media(post, name):
+    media = PostMedia(post=post, original_filename=name)
+    media.file.save(name, ContentFile(b"fake-media"), save=True)
+    return media
+
+
+@pytest.mark.django_db
+def test_media_pointers_follow_media_writes_and_content_type():
+    post = create_post("Пост с медиа")
+    clip = attach_media(post, "clip.mp4")
+    cover = attach_media(post, "cover.webp")
+    second = attach_media(post, "second.webp")
+
+    assert (post.cover_media_id, post.primary_media_id) == (cover.pk, None)
+
+    post.content_type = Post.ContentType.VIDEO
+    post.save(update_fields=["content_type"])
+    post.refresh_from_db()
+    assert (post.cover_media_id, post.primary_media_id) == (cover.pk, clip.pk)
+
+    cover.delete()
+    post.refresh_from_db()
+    assert post.cover_media_id == second.pk
+
+    PostMedia.objects.filter(pk=clip.pk).delete()
+    post.refresh_from_db()
+    assert (post.cover_media_id, post.primary_media_id) == (second.pk, None)
+
+
+@pytest.mark.django_db
+def test_post_list_joins_cover_instead_of_prefetching_media(client):
+    for index in range(3):
+        attach_media(create_post(f"Карточка {index}"), f"card-{index}.webp")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+
+    assert response.status_code == 200
+    assert len(soup(response).select("img.post-card-cover")) == 3
+    assert not [query for query in queries if 'FROM "blog_postmedia"' in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_post_cards_come_from_fragment_cache_with_live_counters(client, tag_python):
+    post = create_post("Карточка из кэша", tags=[tag_python])
+    client.get("/")
+
+    Post.objects.filter(pk=post.pk).update(view_count=21, like_count=3)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+
+    body = response.content.decode()
+    assert "21 просмотр" in body
+    assert "3 лайка" in body
+    assert "#Python" in body
+    assert "/static/post_card/post_card.css" in body
+    assert not [query for query in queries if 'FROM "blog_tag"' in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_post_card_cache_drops_cards_on_tag_changes(client, tag_python, tag_uv):
+    post = create_post("Карточка с тегами", tags=[tag_python])
+    client.get("/")
+
+    post.tags.add(tag_uv)
+    assert "#uv" in client.get("/").content.decode()
+
+    tag_uv.name = "uv-tool"
+    tag_uv.save()
+    assert "#uv-tool" in client.get("/").content.decode()
+
+
 @pytest.mark.django_db
 def test_public_list_shows_published_posts_and_hides_drafts(client):
     create_post("Опубликованный пост")
@@ -564,6 +636,9 @@ def test_post_list_view_second_page_query_count_matches_first(client):
         )
         post.tags.set([tag_python])
 
+    # Warm the taxonomy snapshot and card cache so both pages are measured in steady state.
+    client.get("/")
+    client.get("/", {"page": 2})
     with CaptureQueriesContext(connection) as page1_ctx:
         response1 = client.get("/")
     assert response1.status_code == 200
@@ -799,3 +874,100 @@ def test_detail_view_query_count_is_bounded(client):
         f"Detail view ran {query_count} queries; expected ≤ 20. "
         f"Likely N+1 on media_files, tags, or session interactions."
     )
+
+
+@pytest.mark.django_db
+def test_post_list_taxonomy_sidebar_is_cached_and_invalidated(client):
+    """Sidebar comes from one cached snapshot; tag/post writes refresh it."""
+    category = Category.objects.create(name="Django", slug="django")
+    tag = Tag.objects.create(name="Python", slug="python")
+    post = Post.objects.create(title="Taxonomy post", content="Текст", status=Post.Status.PUBLISHED, category=category)
+    post.tags.set([tag])
+
+    client.get("/")
+    with CaptureQueriesContext(connection) as warm:
+        response = client.get("/", {"category": "django", "tag": "python"})
+    assert response.status_code == 200
+    assert "#Python" in response.content.decode()
+    taxonomy_reads = [
+        query["sql"]
+        for query in warm
+        if "UNION" in query["sql"] or query["sql"].startswith(('SELECT "blog_category"', 'SELECT "blog_tag"'))
+    ]
+    assert taxonomy_reads == []
+
+    post.tags.add(Tag.objects.create(name="Rust", slug="rust"))
+    assert "#Rust" in client.get("/").content.decode()
+
+    post.status = Post.Status.DRAFT
+    post.save()
+    body = client.get("/").content.decode()
+    assert "#Python" not in body and "#Rust" not in body
+    assert client.get("/", {"tag": "missing"}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_htmx_post_list_requests_skip_taxonomy_snapshot(client):
+    """Partial and load-more responses never build the sidebar snapshot."""
+    from django.core.cache import cache
+
+    from blog.taxonomy import taxonomy_cache_key
+
+    Post.objects.create(title="Partial post", content="Текст", status=Post.Status.PUBLISHED)
+    cache.delete(taxonomy_cache_key())
+
+    assert client.get("/", HTTP_HX_REQUEST="true").status_code == 200
+    assert client.get("/", {"load_more": "true"}, HTTP_HX_REQUEST="true").status_code == 200
+    assert cache.get(taxonomy_cache_key()) is None
+
+
+@pytest.mark.django_db
+def test_load_more_follows_keyset_cursor_without_count_or_offset(client):
+    """Cursor chain returns every post once, ties on created_at included."""
+    from django.utils import timezone
+
+    same_moment = timezone.now()
+    for index in range(12):
+        Post.objects.create(title=f"Keyset post {index:02d}", content="Текст", status=Post.Status.PUBLISHED)
+    Post.objects.filter(title__in=["Keyset post 05", "Keyset post 06", "Keyset post 07"]).update(
+        created_at=same_moment
+    )
+    expected = list(Post.objects.order_by("-created_at", "-pk").values_list("title", flat=True))
+
+    def titles(content):
+        page = BeautifulSoup(content, "html.parser")
+        return [link.get_text(strip=True) for link in page.select(".post-card-title-link")]
+
+    def next_request(content):
+        button = BeautifulSoup(content, "html.parser").select_one("button[hx-swap='beforeend']")
+        return dict(parse_qsl(urlparse(button["hx-get"]).query)) if button else None
+
+    first = client.get("/")
+    seen = titles(first.content)
+    params = next_request(first.content)
+    while params:
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get("/", params, HTTP_HX_REQUEST="true")
+        sql = " ".join(query["sql"] for query in ctx)
+        assert "COUNT(" not in sql and "OFFSET" not in sql
+        seen += titles(response.content)
+        params = next_request(response.content)
+
+    assert seen == expected
+
+
+@pytest.mark.django_db
+def test_numbered_pages_reuse_cached_count_until_posts_change(client):
+    for index in range(7):
+        Post.objects.create(title=f"Counted {index}", content="Текст", status=Post.Status.PUBLISHED)
+
+    client.get("/", {"page": 2})
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/", {"page": 2})
+    assert response.status_code == 200
+    assert not any("COUNT(" in query["sql"] for query in ctx)
+
+    for index in range(4):
+        Post.objects.create(title=f"Counted extra {index}", content="Текст", status=Post.Status.PUBLISHED)
+    page = BeautifulSoup(client.get("/", {"page": 3}).content, "html.parser")
+    assert page.select_one(".pagination .active").get_text(strip=True) == "3"
@@ -0,0 +1,108 @@
+"""Markdown renderer registry: one entry point, parity of fast and full."""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from blog.services import convert_markdown_to_html
+from blog.services.renderers import BasicRenderer, available_renderers, get_renderer
+
+NOTES = [
+    "# Заголовок\n\nТекст со сноской[^1].\n\n[^1]: Первая сноска.\n",
+    "Другая сноска[^1] и HTML.\n\n[^1]: Вторая.\n\n*[HTML]: HyperText Markup Language\n",
+    "Без сносок, но HTML снова.\n",
+    "| A | B |\n|---|---|\n| 1 | `код` |\n",
+    "> [!warning] Осторожно\n> Тело callout.\n",
+    "```python\nprint('x')\n```\n\n```mermaid\ngraph TD; A-->B\n```\n",
+    "- [x] готово\n- [ ] нет\n\nТермин\n: определение\n",
+    "![Схема](https://example.com/scheme.png)\n",
+]
+
+
+def test_fast_matches_full_across_sequential_notes():
+    fast, full = get_renderer("fast"), get_renderer("full")
+
+    # Two passes: a reused Markdown instance must not carry footnotes or
+    # abbreviations from one note into the next.
+    for _ in range(2):
+        for note in NOTES:
+            assert fast.render(note) == full.render(note)
+    assert "<abbr" not in fast.render(NOTES[2])
+
+
+def test_fast_renderer_is_thread_safe():
+    expected = [get_renderer("full").render(note) for note in NOTES]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(get_renderer("fast").render, NOTES * 4))
+
+    assert results == expected * 4
+
+
+def test_entry_point_uses_configured_renderer(settings, monkeypatch):
+    calls = []
+    monkeypatch.setattr(type(get_renderer("basic")), "render", lambda self, text, post=None: calls.append(text))
+
+    settings.MARKDOWN_RENDERER = "basic"
+    convert_markdown_to_html("**x**")
+
+    assert calls == ["**x**"]
+    assert convert_markdown_to_html("**x**", renderer="fast") == "<p><strong>x</strong></p>"
+
+
+def test_default_renderer_is_fast_and_unknown_names_fail(settings):
+    assert set(available_renderers()) == {"basic", "fast", "full"}
+    assert get_renderer().name == "fast"
+
+    settings.MARKDOWN_RENDERER = "legacy"
+    with pytest.raises(ImproperlyConfigured, match="legacy"):
+        get_renderer()
+
+
+def test_basic_renderer_skips_post_processing():
+    html = get_renderer("basic").render(NOTES[3])
+
+    assert "<table>" in html
+    assert "table-responsive" not in html
+    assert "table-responsive" in get_renderer("full").render(NOTES[3])
+
+
+def test_basic_renderer_logs_conversion_errors(caplog, capsys, monkeypatch):
+    class Broken:
+        def reset(self):
+            pass
+
+        def convert(self, text):
+            raise ValueError("broken extension")
+
+    monkeypatch.setattr("blog.services.renderers.build_markdown", Broken)
+    with caplog.at_level("ERROR", logger="blog.services.renderers"):
+        assert BasicRenderer().render("**x**") == ""
+
+    assert "Markdown conversion failed (renderer=basic)" in caplog.text
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("name", ["fast", "full"])
+def test_pipeline_renderers_log_conversion_errors(caplog, capsys, monkeypatch, name):
+    def broken(html, responsive_images=None):
+        raise ValueError("broken processor")
+
+    monkeypatch.setattr("blog.services.markdown_converter.process_html", broken)
+    with caplog.at_level("ERROR", logger="blog.services.markdown_converter"):
+        assert get_renderer(name).render("**x**") == ""
+
+    assert "Markdown conversion failed" in caplog.text
+    assert "broken processor" in caplog.text
+    assert capsys.readouterr().out == ""
+
+
+def test_legacy_module_and_codehilite_are_gone():
+    assert not (Path(__file__).parent / "services.py").exists()
+
+    convert_markdown_to_html(NOTES[5])
+
+    assert "markdown.extensions.codehilite" not in sys.modules
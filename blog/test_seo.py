@@ -20,9 +20,24 @@ from publisher.parser import parse_markdown_file
 # ── Sitemap tests ────────────────────────────────────────────────────────────
 
 
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def _sitemap_documents(client):
+    """Fetch /sitemap.xml (an index) and every section it lists."""
+    index = client.get("/sitemap.xml")
+    assert index.status_code == 200
+    locations = [loc.text for loc in ET.fromstring(index.content).iter(f"{SITEMAP_NS}loc")]
+    return [client.get(location.replace("http://testserver", "")) for location in locations]
+
+
+def _sitemap_text(client):
+    return "".join(response.content.decode() for response in _sitemap_documents(client))
+
+
 @pytest.mark.django_db
 def test_sitemap_contains_published_post():
-    """Published post URL appears in sitemap.xml."""
+    """Published post URL appears in the article section of the sitemap index."""
     post = Post.objects.create(
         title="Sitemap Test",
         description="Sitemap desc",
@@ -31,7 +46,9 @@ def test_sitemap_contains_published_post():
         status=Post.Status.PUBLISHED,
     )
     client = Client()
-    response = client.get("/sitemap.xml")
+    index = client.get("/sitemap.xml").content.decode()
+    assert "/sitemap-posts-article.xml" in index
+    response = client.get("/sitemap-posts-article.xml")
     assert response.status_code == 200
     body = response.content.decode()
     assert "/post/sitemap-test/" in body
@@ -40,7 +57,7 @@ def test_sitemap_contains_published_post():
 
 @pytest.mark.django_db
 def test_sitemap_excludes_draft_post():
-    """Draft posts are not in sitemap.xml."""
+    """Draft posts are in no sitemap section."""
     Post.objects.create(
         title="Draft Sitemap",
         description="Hidden",
@@ -48,25 +65,22 @@ def test_sitemap_excludes_draft_post():
         slug="draft-sitemap",
         status=Post.Status.DRAFT,
     )
-    client = Client()
-    response = client.get("/sitemap.xml")
-    assert response.status_code == 200
-    assert "/post/draft-sitemap/" not in response.content.decode()
+    for response in _sitemap_documents(Client()):
+        assert response.status_code == 200
+        assert "/post/draft-sitemap/" not in response.content.decode()
 
 
 @pytest.mark.django_db
 def test_sitemap_contains_static_pages():
-    """Home and about pages are in sitemap.xml."""
-    client = Client()
-    response = client.get("/sitemap.xml")
+    """Home and about pages are in the static section."""
+    response = Client().get("/sitemap-static.xml")
     assert response.status_code == 200
-    body = response.content.decode()
-    assert "<loc>" in body  # has at least some URLs
+    assert "<loc>" in response.content.decode()
 
 
 @pytest.mark.django_db
 def test_sitemap_is_valid_xml():
-    """Sitemap returns valid XML with namespace."""
+    """Index and sections return valid XML with namespace."""
     Post.objects.create(
         title="XML Test",
         description="XML",
@@ -78,8 +92,136 @@ def test_sitemap_is_valid_xml():
     response = client.get("/sitemap.xml")
     assert response.status_code == 200
     assert "xml" in response.headers.get("Content-Type", "")
-    # Should parse without error
-    ET.fromstring(response.content)
+    assert ET.fromstring(response.content).tag == f"{SITEMAP_NS}sitemapindex"
+    for section in _sitemap_documents(client):
+        assert ET.fromstring(section.content).tag == f"{SITEMAP_NS}urlset"
+
+
+@pytest.mark.django_db
+def test_sitemap_sections_split_by_type_series_and_pages(monkeypatch):
+    """Video posts get their own section, series are listed, sections paginate."""
+    from blog import sitemaps as blog_sitemaps
+    from blog.models import Series
+
+    series = Series.objects.create(name="Sitemap Series", slug="sitemap-series")
+    for index in range(3):
+        Post.objects.create(
+            title=f"Paged {index}",
+            description="d",
+            content="x",
+            slug=f"paged-{index}",
+            status=Post.Status.PUBLISHED,
+            series=series,
+        )
+    Post.objects.create(
+        title="Clip",
+        description="d",
+        content="x",
+        slug="clip",
+        content_type=Post.ContentType.VIDEO,
+        media_url="https://cdn.example.com/clip.mp4",
+        status=Post.Status.PUBLISHED,
+    )
+    monkeypatch.setattr(blog_sitemaps.sitemaps["posts-article"], "limit", 2)
+    client = Client()
+
+    index = client.get("/sitemap.xml").content.decode()
+    assert "/sitemap-posts-article.xml?p=2" in index
+    assert "/sitemap-series.xml" in index
+    video = client.get("/sitemap-posts-video.xml").content.decode()
+    assert "/post/clip/" in video and "/post/paged-0/" not in video
+    second = client.get("/sitemap-posts-article.xml?p=2").content.decode()
+    assert "/post/paged-2/" in second and "/post/paged-0/" not in second
+    assert "/series/sitemap-series/" in client.get("/sitemap-series.xml").content.decode()
+    assert client.get("/sitemap-unknown.xml").status_code == 404
+
+
+@pytest.mark.django_db
+def test_sitemap_lists_post_images_and_video():
+    """Image and video extensions come from attached PostMedia."""
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    from blog.models import PostMedia
+
+    post = Post.objects.create(
+        title="Clip With Cover",
+        description="Video desc",
+        content="x",
+        slug="clip-with-cover",
+        content_type=Post.ContentType.VIDEO,
+        media_url="https://cdn.example.com/clip.mp4",
+        status=Post.Status.PUBLISHED,
+    )
+    PostMedia.objects.create(
+        post=post,
+        file=SimpleUploadedFile("cover.gif", b"GIF89a", content_type="image/gif"),
+        media_type=PostMedia.MediaType.IMAGE,
+    )
+
+    body = Client().get("/sitemap-posts-video.xml").content
+    root = ET.fromstring(body)
+    image_ns = "{http://www.google.com/schemas/sitemap-image/1.1}"
+    video_ns = "{http://www.google.com/schemas/sitemap-video/1.1}"
+    images = [loc.text for loc in root.iter(f"{image_ns}loc")]
+    assert len(images) == 1 and images[0].startswith("http://testserver/media/")
+    assert root.find(f".//{video_ns}content_loc").text == "https://cdn.example.com/clip.mp4"
+    assert root.find(f".//{video_ns}title").text == "Clip With Cover"
+
+    # A stale cover pointer falls back to the first image instead of crashing.
+    Post.objects.filter(pk=post.pk).update(cover_media=None, updated_at=post.updated_at.replace(year=2030))
+    root = ET.fromstring(Client().get("/sitemap-posts-video.xml").content)
+    assert root.find(f".//{video_ns}thumbnail_loc").text.startswith("http://testserver/media/")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("page", ["abc", "0", "-1", "1.5"])
+def test_sitemap_rejects_invalid_page_numbers(page):
+    assert Client().get(f"/sitemap-static.xml?p={page}").status_code == 404
+
+
+@pytest.mark.django_db
+def test_series_rename_refreshes_cached_series_sitemap():
+    from blog.models import Series
+
+    series = Series.objects.create(name="Old Series", slug="old-series")
+    Post.objects.create(title="Part", content="x", status=Post.Status.PUBLISHED, series=series)
+    client = Client()
+    assert "/series/old-series/" in client.get("/sitemap-series.xml").content.decode()
+
+    series.slug = "new-series"
+    series.save()
+
+    body = client.get("/sitemap-series.xml").content.decode()
+    assert "/series/new-series/" in body and "/series/old-series/" not in body
+
+
+@pytest.mark.django_db
+def test_sitemap_is_cached_and_conditional(django_assert_num_queries):
+    """Repeat reads cost one stamp query; validators get 304 until a post changes."""
+    post = Post.objects.create(
+        title="Cached Sitemap",
+        description="d",
+        content="x",
+        slug="cached-sitemap",
+        status=Post.Status.PUBLISHED,
+    )
+    client = Client()
+    first = client.get("/sitemap-posts-article.xml")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    with django_assert_num_queries(1):
+        again = client.get("/sitemap-posts-article.xml")
+    assert again.content == first.content
+    with django_assert_num_queries(1):
+        assert client.get("/sitemap-posts-article.xml", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    post.title = "Cached Sitemap edited"
+    post.save()
+    changed = client.get("/sitemap-posts-article.xml", HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
 
 
 # ── robots.txt tests ────────────────────────────────────────────────────────
@@ -495,10 +637,7 @@ def test_e2e_seo_full_cycle_article(tmp_path, live_server):
     detail_body = detail_resp.content.decode()
 
     # 5. Verify sitemap contains the post URL
-    sitemap_resp = client.get("/sitemap.xml")
-    assert sitemap_resp.status_code == 200
-    sitemap_body = sitemap_resp.content.decode()
-    assert f"/post/{slug}/" in sitemap_body
+    assert f"/post/{slug}/" in _sitemap_text(client)
 
     # 6. Verify RSS feed contains the post
     rss_resp = client.get("/feed/rss/")
@@ -594,8 +733,7 @@ def test_e2e_seo_full_cycle_video(tmp_path, live_server):
     body = detail_resp.content.decode()
 
     # Sitemap
-    sitemap_resp = client.get("/sitemap.xml")
-    assert f"/post/{slug}/" in sitemap_resp.content.decode()
+    assert f"/post/{slug}/" in _sitemap_text(client)
 
     # RSS
     rss_resp = client.get("/feed/rss/")
@@ -644,8 +782,7 @@ def test_e2e_seo_draft_not_in_sitemap_or_feed(tmp_path, live_server):
 
     # Not in sitemap
     client = Client()
-    sitemap_resp = client.get("/sitemap.xml")
-    assert f"/post/{slug}/" not in sitemap_resp.content.decode()
+    assert f"/post/{slug}/" not in _sitemap_text(client)
 
     # Not in RSS
     rss_resp = client.get("/feed/rss/")
@@ -676,7 +813,7 @@ def test_e2e_seo_replace_updates_sitemap(tmp_path, live_server):
     slug = r1["slug"]
 
     client = Client()
-    sitemap1 = client.get("/sitemap.xml").content.decode()
+    sitemap1 = _sitemap_text(client)
     assert f"/post/{slug}/" in sitemap1
 
     # v2 with replace
@@ -691,10 +828,81 @@ def test_e2e_seo_replace_updates_sitemap(tmp_path, live_server):
     assert r2["description"] == "v2 updated"
 
     # Sitemap still has the slug
-    sitemap2 = client.get("/sitemap.xml").content.decode()
+    sitemap2 = _sitemap_text(client)
     assert f"/post/{slug}/" in sitemap2
 
     # Detail shows updated description
     detail = client.get(f"/post/{slug}/")
     assert detail.status_code == 200
-    assert b"v2 updated" in detail.content
\ No newline at end of file
+    assert b"v2 updated" in detail.content
+
+@pytest.mark.django_db
+def test_feed_conditional_get_and_cached_xml(django_assert_num_queries):
+    """Polls with validators get 304; repeat polls reuse cached XML after one query."""
+    post = Post.objects.create(
+        title="Cached Feed",
+        description="Cached desc",
+        content="# Cached",
+        slug="cached-feed",
+        status=Post.Status.PUBLISHED,
+    )
+    client = Client()
+    first = client.get("/feed/rss/")
+    assert first.status_code == 200
+    assert first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    with django_assert_num_queries(1):
+        again = client.get("/feed/rss/")
+    assert again.content == first.content
+
+    with django_assert_num_queries(1):
+        not_modified = client.get("/feed/rss/", HTTP_IF_NONE_MATCH=first.headers["ETag"])
+    assert not_modified.status_code == 304
+    since = client.get("/feed/rss/", HTTP_IF_MODIFIED_SINCE=first.headers["Last-Modified"])
+    assert since.status_code == 304
+
+    post.title = "Cached Feed Edited"
+    post.save()
+    changed = client.get("/feed/rss/", HTTP_IF_NONE_MATCH=first.headers["ETag"])
+    assert changed.status_code == 200
+    assert "Cached Feed Edited" in changed.content.decode()
+
+
+@pytest.mark.django_db
+def test_scoped_feeds_and_full_content():
+    """Category/tag/series feeds filter posts; ?full=1 embeds absolute content HTML."""
+    from blog.models import Category, Series, Tag
+
+    category = Category.objects.create(name="Feeds", slug="feeds")
+    tag = Tag.objects.create(name="Syndication", slug="syndication")
+    series = Series.objects.create(name="Feed Course", slug="feed-course")
+    inside = Post.objects.create(
+        title="Inside Scope",
+        description="Inside desc",
+        content="Body with [link](/about/) and **bold** text.",
+        slug="inside-scope",
+        category=category,
+        series=series,
+        status=Post.Status.PUBLISHED,
+    )
+    inside.tags.add(tag)
+    Post.objects.create(
+        title="Outside Scope",
+        description="Outside desc",
+        content="Other",
+        slug="outside-scope",
+        status=Post.Status.PUBLISHED,
+    )
+    client = Client()
+
+    for url in ("/feed/category/feeds/rss/", "/feed/tag/syndication/atom/", "/feed/series/feed-course/rss/"):
+        body = client.get(url).content.decode()
+        assert "Inside Scope" in body
+        assert "Outside Scope" not in body
+
+    full = client.get("/feed/category/feeds/rss/?full=1").content.decode()
+    assert "&lt;strong&gt;bold&lt;/strong&gt;" in full
+    assert 'href="http://testserver/about/"' in full.replace("&quot;", '"')
+
+    assert client.get("/feed/tag/missing/rss/").status_code == 404
@@ -0,0 +1,66 @@
+"""Text similarity engine: tokenization, TF-IDF neighbours, related posts, duplicates."""
+
+import pytest
+
+from blog.models import Post, PostTextVector, RelatedPost
+from blog.similarity import TfidfIndex, find_near_duplicates, text_terms
+
+
+def test_text_terms_stem_transliterate_and_skip_code():
+    terms = text_terms(
+        "Модели Django",
+        "Модель и модели.\n\n```python\nsecret_identifier = 1\n```\n\nСвязи моделей `inline`.",
+    )
+
+    assert terms["model"] == 3 + 3  # title word boosted, body forms share the stem
+    assert "djang" in terms
+    assert not any(term.startswith("secre") for term in terms)
+    assert "и" not in terms
+
+
+def test_tfidf_index_ranks_cosine_neighbours():
+    index = TfidfIndex(
+        {
+            1: {"cache": 3, "djang": 2, "templ": 1},
+            2: {"cache": 3, "djang": 2},
+            3: {"templ": 1, "borsc": 4},
+            4: {"borsc": 3, "svekl": 2},
+            5: {"svekl": 1, "djang": 1, "sadov": 2},
+        }
+    )
+
+    neighbours = index.neighbours(1, limit=3)
+    # "djang" sits in 3 of 5 posts, so post 5 shares nothing that counts.
+    assert [pk for pk, _score in neighbours] == [2, 3]
+    assert neighbours[0][1] > neighbours[1][1] > 0
+    # A term carried by more than half of the posts is dropped as noise.
+    assert "djang" not in TfidfIndex({1: {"djang": 1}, 2: {"djang": 1}, 3: {"djang": 1, "x": 1}}).idf
+
+
+@pytest.mark.django_db
+def test_text_vectors_follow_saves_and_relate_posts_without_taxonomy():
+    shared = "Индексы PostgreSQL ускоряют запросы, планировщик выбирает индекс по статистике. " * 4
+    first = Post.objects.create(title="Индексы PostgreSQL", content=shared, status=Post.Status.PUBLISHED)
+    second = Post.objects.create(title="Планировщик и индексы", content=shared, status=Post.Status.PUBLISHED)
+    Post.objects.create(title="Акварель", content="Кисти, бумага и пигменты для пейзажа. " * 4, status=Post.Status.PUBLISHED)
+
+    assert PostTextVector.objects.get(post=first).terms["indek"] > 0
+    assert list(first.related_links.values_list("related_id", flat=True)) == [second.pk]
+
+    second.content = "Кисти, бумага и пигменты для пейзажа. " * 4
+    second.title = "Пейзаж"
+    second.save()
+    assert "indek" not in PostTextVector.objects.get(post=second).terms
+    assert not RelatedPost.objects.filter(post=first, related=second).exists()
+
+
+@pytest.mark.django_db
+def test_find_near_duplicates_ignores_excluded_and_unrelated_posts():
+    body = "Пошаговая настройка nginx для Django: статика, gzip и кэш заголовков. " * 6
+    original = Post.objects.create(title="Nginx для Django", content=body, status=Post.Status.PUBLISHED)
+    Post.objects.create(title="Черновик копия", content=body, status=Post.Status.DRAFT)
+    Post.objects.create(title="Другое", content="Совсем другая тема про садоводство и рассаду. " * 6, status=Post.Status.PUBLISHED)
+
+    matches = find_near_duplicates("Nginx для Django", body)
+    assert [(post.pk, score >= 0.9) for post, score in matches] == [(original.pk, True)]
+    assert find_near_duplicates("Nginx для Django", body, exclude=[original.pk]) == []
@@ -1,14 +1,23 @@
 """Offline storage compatibility and compensating-cleanup tests."""
 
-from io import BytesIO
+from datetime import timedelta
+from io import BytesIO, StringIO
 
 import pytest
 from django.core.files.base import ContentFile, File
+from django.core.management import call_command
 from django.core.files.storage import Storage
 from django.db import models
+from django.utils import timezone
 from PIL import Image
 
-from blog.models import Post, PostMedia
+from blog.models import Post, PostMedia, PostMediaDerivative, ThumbnailJob
+from blog.thumbnails import (
+    THUMBNAIL_SIZES,
+    decode_for_sizes,
+    render_derivatives,
+    render_thumbnails,
+)
 
 
 @pytest.fixture(autouse=True)
@@ -17,6 +26,7 @@ def restore_post_media_storages():
         PostMedia._meta.get_field("file"),
         PostMedia._meta.get_field("thumbnail_og"),
         PostMedia._meta.get_field("thumbnail_card"),
+        PostMediaDerivative._meta.get_field("file"),
     ]
     original = [field.storage for field in fields]
     yield
@@ -65,7 +75,7 @@ def image_bytes(color="red"):
     return buffer.getvalue()
 
 
-def create_image_media(storage, *, post_slug="storage-post", filename="cover.png"):
+def create_image_media(storage, *, post_slug="storage-post", filename="cover.png", source=None):
     post = Post.objects.create(
         title=post_slug,
         description="storage compatibility",
@@ -73,12 +83,13 @@ def create_image_media(storage, *, post_slug="storage-post", filename="cover.png
         slug=post_slug,
     )
     source_name = storage.save(
-        f"posts/{post_slug}/{filename}", ContentFile(image_bytes())
+        f"posts/{post_slug}/{filename}", ContentFile(source or image_bytes())
     )
     field = PostMedia._meta.get_field("file")
     field.storage = storage
     PostMedia._meta.get_field("thumbnail_og").storage = storage
     PostMedia._meta.get_field("thumbnail_card").storage = storage
+    PostMediaDerivative._meta.get_field("file").storage = storage
     media = PostMedia.objects.create(
         post=post,
         file=source_name,
@@ -165,3 +176,278 @@ def test_post_scoped_thumbnail_names_isolate_duplicate_filenames():
     assert first.thumbnail_card.name != second.thumbnail_card.name
     assert storage.exists(first.thumbnail_og.name)
     assert storage.exists(second.thumbnail_og.name)
+
+
+@pytest.mark.django_db
+def test_deferred_mode_records_job_without_decoding_source(settings):
+    settings.MEDIA_THUMBNAILS_DEFERRED = True
+    storage = PathlessStorage()
+
+    media, _ = create_image_media(storage, post_slug="deferred-post")
+
+    assert storage.open_count == 0
+    assert not media.thumbnail_og and not media.thumbnail_card
+    assert media.thumbnail_og_url == media.file.url
+    assert media.thumbnail_job.state == ThumbnailJob.State.PENDING
+
+
+@pytest.mark.django_db
+def test_generate_thumbnails_worker_completes_pending_jobs(settings):
+    settings.MEDIA_THUMBNAILS_DEFERRED = True
+    storage = PathlessStorage()
+    media, _ = create_image_media(storage, post_slug="worker-post")
+    output = StringIO()
+
+    call_command("generate_thumbnails", "--workers", "1", stdout=output)
+
+    media.refresh_from_db()
+    assert "done=1 failed=0" in output.getvalue()
+    assert media.thumbnail_job.state == ThumbnailJob.State.DONE
+    assert media.thumbnail_job.attempts == 1
+    assert media.thumbnail_og.name == "posts/worker-post/thumbnails/cover.png_og.jpg"
+    with Image.open(storage.open(media.thumbnail_card.name)) as thumbnail:
+        assert thumbnail.size == (400, 300)
+
+
+@pytest.mark.django_db
+def test_generate_thumbnails_worker_retries_then_fails_undecodable_source(settings):
+    settings.MEDIA_THUMBNAILS_DEFERRED = True
+    storage = PathlessStorage()
+    media, source_name = create_image_media(storage, post_slug="broken-post")
+    storage.files[source_name] = b"not an image"
+
+    call_command("generate_thumbnails", "--workers", "1", "--max-attempts", "2", stdout=StringIO())
+    job = ThumbnailJob.objects.get(media=media)
+    assert job.state == ThumbnailJob.State.PENDING
+    assert job.last_error == "UnidentifiedImageError"
+
+    call_command("generate_thumbnails", "--workers", "1", "--max-attempts", "2", stdout=StringIO())
+    job.refresh_from_db()
+    assert job.state == ThumbnailJob.State.FAILED
+    assert job.attempts == 2
+    assert not storage.deleted_names
+
+
+@pytest.mark.django_db
+def test_generate_thumbnails_fails_stale_jobs_out_of_attempts(settings):
+    settings.MEDIA_THUMBNAILS_DEFERRED = True
+    storage = PathlessStorage()
+    exhausted, _ = create_image_media(storage, post_slug="stale-exhausted")
+    retryable, _ = create_image_media(storage, post_slug="stale-retryable")
+    long_ago = timezone.now() - timedelta(hours=2)
+    ThumbnailJob.objects.filter(media=exhausted).update(
+        state=ThumbnailJob.State.RUNNING, attempts=2, updated_at=long_ago
+    )
+    ThumbnailJob.objects.filter(media=retryable).update(
+        state=ThumbnailJob.State.RUNNING, attempts=1, updated_at=long_ago
+    )
+    output = StringIO()
+
+    call_command("generate_thumbnails", "--workers", "1", "--max-attempts", "2", stdout=output)
+
+    assert "done=1 failed=1" in output.getvalue()
+    job = ThumbnailJob.objects.get(media=exhausted)
+    assert job.state == ThumbnailJob.State.FAILED
+    assert job.last_error == "StaleRunningJob"
+    assert ThumbnailJob.objects.get(media=retryable).state == ThumbnailJob.State.DONE
+
+
+def encoded_image(size, image_format):
+    buffer = BytesIO()
+    Image.new("RGB", size, "teal").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def test_jpeg_thumbnails_decode_at_reduced_draft_scale():
+    with Image.open(BytesIO(encoded_image((2600, 2000), "JPEG"))) as image:
+        working = decode_for_sizes(image, THUMBNAIL_SIZES.values())
+
+        assert working.size == (1300, 1000)
+        assert working.width >= 1200 and working.height >= 630
+
+
+def test_non_draft_formats_are_box_reduced_and_cascade_to_exact_sizes():
+    source = encoded_image((5000, 2600), "PNG")
+
+    with Image.open(BytesIO(source)) as image:
+        assert decode_for_sizes(image, THUMBNAIL_SIZES.values()).size == (1250, 650)
+
+    thumbnails = render_thumbnails(source)
+    for field_name, size in THUMBNAIL_SIZES.items():
+        with Image.open(BytesIO(thumbnails[field_name])) as thumbnail:
+            assert thumbnail.size == size
+
+
+def test_responsive_variants_skip_upscaling_and_unknown_formats():
+    rendered = render_derivatives(
+        encoded_image((1000, 500), "PNG"),
+        widths=(480, 960, 1440),
+        formats=("webp", "gif"),
+    )
+
+    assert rendered["size"] == (1000, 500)
+    assert [(item.format, item.width, item.height) for item in rendered["variants"]] == [
+        ("webp", 960, 480),
+        ("webp", 480, 240),
+    ]
+    with Image.open(BytesIO(rendered["variants"][1].data)) as variant:
+        assert variant.format == "WEBP"
+        assert variant.size == (480, 240)
+
+
+@pytest.mark.django_db
+def test_image_media_stores_variants_and_renders_picture_srcset(settings):
+    settings.MEDIA_RESPONSIVE_WIDTHS = [480, 960, 1440]
+    settings.MEDIA_RESPONSIVE_FORMATS = ["webp"]
+    storage = PathlessStorage()
+    media, _ = create_image_media(
+        storage,
+        post_slug="responsive-post",
+        filename="photo.png",
+        source=encoded_image((1000, 500), "PNG"),
+    )
+
+    media.refresh_from_db()
+    assert (media.width, media.height) == (1000, 500)
+    assert not media.needs_derivatives
+    assert sorted(media.derivatives.values_list("format", "width")) == [
+        ("webp", 480),
+        ("webp", 960),
+    ]
+    assert storage.exists("posts/responsive-post/derivatives/photo.png_960w.webp")
+
+    post = media.post
+    post.content = "![[photo.png|Фото]]"
+    post.save()
+
+    assert "<picture>" in post.content_html
+    assert (
+        '<source sizes="(min-width: 992px) 860px, 100vw" srcset="'
+        "/test-media/posts/responsive-post/derivatives/photo.png_480w.webp 480w, "
+        '/test-media/posts/responsive-post/derivatives/photo.png_960w.webp 960w" '
+        'type="image/webp"/>'
+    ) in post.content_html
+    assert 'height="500"' in post.content_html and 'width="1000"' in post.content_html
+
+
+@pytest.mark.django_db
+def test_image_media_stores_dominant_color_and_inlines_lqip_placeholder():
+    storage = PathlessStorage()
+    media, _ = create_image_media(
+        storage,
+        post_slug="placeholder-post",
+        filename="photo.png",
+        source=encoded_image((640, 480), "PNG"),
+    )
+
+    media.refresh_from_db()
+    assert media.dominant_color == "#008080"
+    assert media.lqip.startswith("data:image/webp;base64,")
+    assert len(media.lqip) < 1000
+
+    post = media.post
+    post.content = "![[photo.png]]"
+    post.save()
+
+    assert "has-placeholder" in post.content_html
+    assert f"background-image:url({media.lqip})" in post.content_html
+    assert "background-color:#008080" in post.content_html
+
+
+def test_transparent_images_get_no_background_placeholder():
+    buffer = BytesIO()
+    Image.new("RGBA", (64, 64), (255, 0, 0, 0)).save(buffer, format="PNG")
+
+    rendered = render_derivatives(buffer.getvalue())
+
+    assert rendered["color"] == "" and rendered["lqip"] == ""
+
+
+def test_transparent_images_keep_alpha_in_responsive_variants():
+    image = Image.new("RGBA", (1000, 500), (255, 0, 0, 0))
+    image.paste((0, 0, 255, 255), (0, 0, 500, 500))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+
+    rendered = render_derivatives(buffer.getvalue(), widths=(480,), formats=("webp", "avif"))
+
+    assert [item.format for item in rendered["variants"]] == ["webp", "avif"]
+    for item in rendered["variants"]:
+        with Image.open(BytesIO(item.data)) as variant:
+            variant = variant.convert("RGBA")
+            assert variant.getpixel((400, 120))[3] == 0
+            assert variant.getpixel((80, 120))[3] == 255
+
+
+def test_animated_images_keep_every_frame_in_responsive_variants():
+    frames = [Image.new("RGB", (1000, 500), color) for color in ("red", "green", "blue")]
+    buffer = BytesIO()
+    frames[0].save(buffer, format="GIF", save_all=True, append_images=frames[1:], duration=120, loop=0)
+
+    rendered = render_derivatives(buffer.getvalue(), widths=(480,), formats=("webp", "avif"))
+
+    assert [item.format for item in rendered["variants"]] == ["webp", "avif"]
+    for item in rendered["variants"]:
+        with Image.open(BytesIO(item.data)) as variant:
+            assert variant.size == (480, 240)
+            assert variant.n_frames == 3
+            variant.seek(2)
+            red, green, blue = variant.convert("RGB").getpixel((240, 120))
+            assert blue > 200 and red < 60 and green < 60
+
+
+@pytest.mark.django_db
+def test_generate_thumbnails_enqueue_missing_backfills_new_widths(settings):
+    settings.MEDIA_RESPONSIVE_WIDTHS = [480]
+    settings.MEDIA_RESPONSIVE_FORMATS = ["webp"]
+    storage = PathlessStorage()
+    media, _ = create_image_media(
+        storage, post_slug="backfill-post", source=encoded_image((1000, 500), "PNG")
+    )
+    settings.MEDIA_RESPONSIVE_WIDTHS = [480, 960]
+    output = StringIO()
+
+    call_command("generate_thumbnails", "--workers", "1", "--enqueue-missing", stdout=output)
+
+    assert "done=1" in output.getvalue()
+    assert "rerendered=1 enqueued=1" in output.getvalue()
+    assert sorted(media.derivatives.values_list("width", flat=True)) == [480, 960]
+
+
+@pytest.mark.django_db
+def test_generate_thumbnails_rerender_writes_only_rendered_fields(settings, monkeypatch):
+    settings.MEDIA_THUMBNAILS_DEFERRED = True
+    settings.MEDIA_RESPONSIVE_WIDTHS = [480]
+    settings.MEDIA_RESPONSIVE_FORMATS = ["webp"]
+    storage = PathlessStorage()
+    media, _ = create_image_media(
+        storage, post_slug="rerender-post", source=encoded_image((1000, 500), "PNG")
+    )
+    long_ago = timezone.now() - timedelta(days=3)
+    Post.objects.filter(pk=media.post_id).update(updated_at=long_ago, content_html="stale")
+    refreshed = []
+    monkeypatch.setattr("blog.signals.schedule_related_refresh", refreshed.extend)
+    output = StringIO()
+
+    call_command("generate_thumbnails", "--workers", "1", stdout=output)
+
+    assert "rerendered=1" in output.getvalue()
+    post = Post.objects.get(pk=media.post_id)
+    assert post.content_html != "stale"
+    assert post.updated_at == long_ago
+    assert refreshed == []
+
+
+@pytest.mark.django_db
+def test_enqueue_keeps_running_job_claimed(settings):
+    settings.MEDIA_THUMBNAILS_DEFERRED = True
+    storage = PathlessStorage()
+    media, _ = create_image_media(storage, post_slug="claimed-post")
+    ThumbnailJob.objects.filter(media=media).update(state=ThumbnailJob.State.RUNNING, attempts=1)
+
+    job = ThumbnailJob.enqueue(media)
+
+    assert (job.state, job.attempts) == (ThumbnailJob.State.RUNNING, 1)
+    ThumbnailJob.objects.filter(media=media).update(state=ThumbnailJob.State.FAILED, last_error="OSError")
+    job = ThumbnailJob.enqueue(media)
+    assert (job.state, job.attempts, job.last_error) == (ThumbnailJob.State.PENDING, 0, "")
@@ -0,0 +1,95 @@
+"""Post-deploy cache warm-up command."""
+
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from blog.cache_keys import versioned_key
+from blog.models import Post, SessionPostInteraction
+from blog.session_interactions import WARMUP_HEADER
+from blog.warmup import warm, warmup_paths
+
+
+def make_posts():
+    hot = Post.objects.create(title="Hot", content="Горячий пост", status=Post.Status.PUBLISHED, view_count=50)
+    warm_post = Post.objects.create(title="Warm", content="Тёплый", status=Post.Status.PUBLISHED, view_count=10)
+    Post.objects.create(title="Cold", content="Холодный", status=Post.Status.PUBLISHED, view_count=1)
+    Post.objects.create(title="Draft", content="Черновик", status=Post.Status.DRAFT, view_count=99)
+    return hot, warm_post
+
+
+@pytest.mark.django_db
+def test_warmup_paths_take_top_public_posts_by_views():
+    hot, warm_post = make_posts()
+
+    paths = warmup_paths(2)
+
+    assert paths[:4] == ["/", "/feed/rss/", "/feed/atom/", "/sitemap.xml"]
+    assert paths[-2:] == [hot.get_absolute_url(), warm_post.get_absolute_url()]
+    assert "/sitemap-series.xml" in paths
+
+
+@pytest.mark.django_db
+def test_warm_caches_renders_pages_without_counting_views():
+    hot, _warm_post = make_posts()
+    cache.clear()
+    output = StringIO()
+
+    call_command("warm_caches", "--top", "2", "--threads", "1", stdout=output)
+
+    lines = output.getvalue().splitlines()
+    assert f"path={hot.get_absolute_url()}" in lines[-3]
+    assert lines[-1].startswith("urls=12 failed=0 threads=1 ")
+    assert cache.get(versioned_key("post_html", hot.pk)) is not None
+    hot.refresh_from_db()
+    assert hot.view_count == 50
+    assert not SessionPostInteraction.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_caches_uses_parallel_threads():
+    make_posts()
+    output = StringIO()
+
+    call_command("warm_caches", "--top", "3", "--threads", "4", stdout=output)
+
+    assert output.getvalue().splitlines()[-1].startswith("urls=13 failed=0 threads=4 ")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_caches_over_http_hits_the_running_site(live_server):
+    hot, _warm_post = make_posts()
+    output = StringIO()
+
+    call_command("warm_caches", "--top", "1", "--base-url", live_server.url, "--host", "localhost", stdout=output)
+
+    assert "status=200 " in output.getvalue()
+    assert f"path={hot.get_absolute_url()}" in output.getvalue()
+    hot.refresh_from_db()
+    assert hot.view_count == 50
+
+
+def test_failed_pages_fail_the_command():
+    results = warm(["/ok/", "/missing/"], lambda path: 200 if path == "/ok/" else 404)
+    assert [result.ok for result in results] == [True, False]
+
+
+@pytest.mark.django_db
+def test_warm_caches_reports_failures(monkeypatch):
+    monkeypatch.setattr("blog.management.commands.warm_caches.warmup_paths", lambda top: ["/missing-page/"])
+
+    with pytest.raises(CommandError, match="/missing-page/"):
+        call_command("warm_caches", "--threads", "1", stdout=StringIO())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("value", ["1", "forged-token"])
+def test_untrusted_warmup_header_still_counts_views(client, value):
+    hot, _warm_post = make_posts()
+
+    client.get(hot.get_absolute_url(), headers={WARMUP_HEADER: value})
+
+    hot.refresh_from_db()
+    assert hot.view_count == 51
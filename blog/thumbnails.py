@@ -0,0 +1,253 @@
+"""Pure Pillow rendering of PostMedia thumbnail and responsive derivatives.
+
+Functions here take and return bytes only, so they are safe to run in a
+``ProcessPoolExecutor`` worker without Django, database or storage access.
+
+Large originals are never decoded at full resolution when a smaller decode is
+enough: JPEG uses libjpeg DCT scaling via ``Image.draft()``, other formats are
+shrunk with the cheap power-of-two ``Image.reduce()`` box filter before the
+final LANCZOS fit. Derivatives are rendered largest first and each smaller one
+cascades from the already reduced working image instead of the original.
+
+Responsive variants keep what the ``<img>`` fallback would show: transparent
+sources are encoded with their alpha channel and animated ones with every
+frame, since browsers pick the ``<source>`` over the fallback.
+
+Pillow is imported inside the functions that decode or encode: ``blog.models``
+imports this module for its constants, and management commands and web
+workers that never touch an image should not load it.
+"""
+
+from __future__ import annotations
+
+import base64
+import math
+from dataclasses import dataclass
+from io import BytesIO
+
+THUMBNAIL_SIZES = {
+    "thumbnail_og": (1200, 630),
+    "thumbnail_card": (400, 300),
+}
+THUMBNAIL_SUFFIXES = {
+    "thumbnail_og": "og",
+    "thumbnail_card": "card",
+}
+DRAFT_FORMATS = {"JPEG", "MPO"}
+RESPONSIVE_MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+RESPONSIVE_QUALITY = {"avif": 60, "webp": 80}
+PLACEHOLDER_WIDTH = 16
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    """One width-bucketed modern-format rendition of a source image."""
+
+    width: int
+    height: int
+    format: str
+    data: bytes
+
+
+def thumbnail_bytes(image, size, quality=85):
+    """Render one derivative from an already decoded image."""
+    from PIL import Image, ImageOps
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    derivative = ImageOps.fit(
+        image, size, method=Image.LANCZOS, centering=(0.5, 0.4)
+    )
+    buffer = BytesIO()
+    derivative.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def responsive_widths(source_width, widths) -> list[int]:
+    """Return configured widths narrower than the source, widest first."""
+    return sorted({int(width) for width in widths if 0 < int(width) < source_width}, reverse=True)
+
+
+def supported_formats(formats) -> list[str]:
+    """Keep only responsive formats this Pillow build can encode."""
+    from PIL import features
+
+    return [
+        image_format
+        for image_format in dict.fromkeys(str(value).casefold() for value in formats)
+        if image_format in RESPONSIVE_MIME_TYPES and features.check(image_format)
+    ]
+
+
+def variant_bytes(image, size, image_format):
+    """Resize the working image to ``size`` and encode it as ``image_format``."""
+    from PIL import Image
+
+    buffer = BytesIO()
+    image.resize(size, Image.LANCZOS).save(
+        buffer,
+        format=image_format.upper(),
+        quality=RESPONSIVE_QUALITY[image_format],
+    )
+    return buffer.getvalue()
+
+
+def resized_frames(image, size) -> tuple[list, list[int]]:
+    """Return every frame of an animated ``image`` resized to ``size`` and their durations."""
+    from PIL import Image, ImageSequence
+
+    frames, durations = [], []
+    for frame in ImageSequence.Iterator(image):
+        durations.append(frame.info.get("duration", 100))
+        frames.append(frame.convert("RGBA").resize(size, Image.LANCZOS))
+    return frames, durations
+
+
+def animated_variant_bytes(frames, durations, image_format, loop=0):
+    """Encode already resized ``frames`` as an animated ``image_format``."""
+    buffer = BytesIO()
+    frames[0].save(
+        buffer,
+        format=image_format.upper(),
+        save_all=True,
+        append_images=frames[1:],
+        duration=durations,
+        loop=loop,
+        quality=RESPONSIVE_QUALITY[image_format],
+    )
+    return buffer.getvalue()
+
+
+def is_animated(image) -> bool:
+    return getattr(image, "n_frames", 1) > 1
+
+
+def has_transparency(image) -> bool:
+    """Return True when the image may be see-through (placeholder would show)."""
+    return image.mode in {"RGBA", "LA", "PA", "La", "RGBa"} or "transparency" in image.info
+
+
+def placeholder(image) -> tuple[str, str]:
+    """Return ``(dominant "#rrggbb", tiny LQIP data URI)`` for a working image.
+
+    The colour is the 1×1 box-filter average; the LQIP is a ``PLACEHOLDER_WIDTH``
+    wide low-quality WebP (JPEG without WebP support) of a few hundred bytes,
+    meant to be inlined as a CSS background and blurred by upscaling.
+    """
+    from PIL import Image, features
+
+    red, green, blue = image.resize((1, 1), Image.BOX).getpixel((0, 0))
+    width = min(PLACEHOLDER_WIDTH, image.width)
+    height = max(1, round(width * image.height / image.width))
+    image_format = "WEBP" if features.check("webp") else "JPEG"
+    buffer = BytesIO()
+    image.resize((width, height), Image.BOX).save(buffer, format=image_format, quality=30)
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return (
+        f"#{red:02x}{green:02x}{blue:02x}",
+        f"data:image/{image_format.lower()};base64,{encoded}",
+    )
+
+
+def required_scale(source_size, sizes) -> float:
+    """Return the smallest source scale that still covers every target crop."""
+    width, height = source_size
+    if not width or not height:
+        return 1.0
+    return min(
+        1.0,
+        max(max(target_w / width, target_h / height) for target_w, target_h in sizes),
+    )
+
+
+def reduce_factor(source_size, sizes) -> int:
+    """Return the largest power-of-two shrink that keeps every target covered."""
+    scale = required_scale(source_size, sizes)
+    if scale >= 0.5:
+        return 1
+    return 2 ** int(math.floor(math.log2(1 / scale)))
+
+
+def decode_for_sizes(image, sizes):
+    """Decode ``image`` as RGB (RGBA if transparent) at the nearest power-of-two scale.
+
+    Must be called before pixel data is loaded. JPEG decodes directly at the
+    reduced scale; other formats decode fully and are box-reduced at once so
+    the expensive LANCZOS pass runs on the smaller working image.
+    """
+    if image.format in DRAFT_FORMATS:
+        scale = required_scale(image.size, sizes)
+        if scale < 1.0:
+            image.draft(
+                "RGB",
+                (math.ceil(image.width * scale), math.ceil(image.height * scale)),
+            )
+    image = image.convert("RGBA" if has_transparency(image) else "RGB")
+    factor = reduce_factor(image.size, sizes)
+    if factor > 1:
+        image = image.reduce(factor)
+    return image
+
+
+def render_derivatives(source, *, widths=(), formats=()) -> dict:
+    """Decode ``source`` once and render thumbnails plus responsive variants.
+
+    ``source`` is raw image bytes or a readable binary file object.
+
+    Returns:
+        ``{"size": (width, height), "thumbnails": {field: bytes},
+        "variants": [ImageVariant, ...], "color": "#rrggbb" | "",
+        "lqip": data URI | ""}``. Colour and LQIP stay empty for images with
+        transparency, where a background placeholder would show through.
+    """
+    from PIL import Image
+
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    with Image.open(source) as image:
+        source_width, source_height = image.size
+        transparent = has_transparency(image)
+        animated = is_animated(image)
+        targets = [
+            (size, "thumbnail", field_name)
+            for field_name, size in THUMBNAIL_SIZES.items()
+        ]
+        image_formats = supported_formats(formats)
+        for width in responsive_widths(source_width, widths) if image_formats else ():
+            height = max(1, round(width * source_height / source_width))
+            targets.append(((width, height), "variant", width))
+        targets.sort(key=lambda target: target[0][0] * target[0][1], reverse=True)
+
+        working = decode_for_sizes(image, [size for size, _kind, _key in targets])
+        thumbnails = {}
+        variants = []
+        for index, (size, kind, key) in enumerate(targets):
+            factor = reduce_factor(working.size, [s for s, _k, _key in targets[index:]])
+            if factor > 1:
+                working = working.reduce(factor)
+            if kind == "thumbnail":
+                thumbnails[key] = thumbnail_bytes(working, size)
+                continue
+            if animated:
+                frames, durations = resized_frames(image, size)
+            for image_format in image_formats:
+                if animated:
+                    data = animated_variant_bytes(frames, durations, image_format, image.info.get("loop", 0))
+                else:
+                    data = variant_bytes(working, size, image_format)
+                variants.append(
+                    ImageVariant(width=size[0], height=size[1], format=image_format, data=data)
+                )
+        color, lqip = ("", "") if transparent else placeholder(working)
+        return {
+            "size": (source_width, source_height),
+            "thumbnails": thumbnails,
+            "variants": variants,
+            "color": color,
+            "lqip": lqip,
+        }
+
+
+def render_thumbnails(source) -> dict[str, bytes]:
+    """Decode ``source`` once and return every thumbnail keyed by field name."""
+    return render_derivatives(source)["thumbnails"]
@@ -1,23 +1,34 @@
 import hashlib
 import json
 import re
+from functools import partial
 
 from django.conf import settings
-from django.core.paginator import Paginator
 from django.core.serializers.json import DjangoJSONEncoder
-from django.db.models import Count, Q
-from django.http import HttpResponse
+from django.db.models import Q
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.decorators import method_decorator
 from django.utils.safestring import mark_safe
 from django.views.decorators.http import condition
 from django.views.generic import DetailView, ListView, TemplateView, View
 
-from .models import Category, Post, Series, Tag
+from .card_cache import render_post_cards
+from .media_urls import prime_media_urls
+from .models import Post, Series
+from .pagination import POST_LIST_ORDERING, CachedCountPaginator, decode_cursor, encode_cursor
+from .series import get_series_toc
 from .session_interactions import SessionInteractionMixin
+from .taxonomy import get_taxonomy_snapshot
 
 
 POST_DETAIL_RENDER_VERSION = "social-image-v7"
+# Prev/next links need only slug and title; skip the neighbours' bodies.
+SERIES_NEIGHBOUR_DEFERRED = [
+    f"{relation}__{field}"
+    for relation in ("series_prev", "series_next")
+    for field in ("content", "content_html", "excerpt", "description", "timecodes")
+]
 
 _JSON_SCRIPT_ESCAPES = {
     ord("<"): "\\u003C",
@@ -60,9 +71,9 @@ def _build_post_json_ld(request, post):
 def _post_detail_probe(request, slug):
     """Single lightweight DB probe shared by etag/last-modified funcs.
 
-    Returns ``(pk, updated_at)`` for the published post with ``slug``, cached
-    on the request object so the ``condition`` decorator does not run two
-    separate ``values_list`` queries on every fresh request.
+    Returns ``(pk, updated_at, *series navigation)`` for the published post
+    with ``slug``, cached on the request object so the ``condition`` decorator
+    does not run two separate ``values_list`` queries on every fresh request.
     """
     cache_attr = f"_post_detail_probe_{slug}"
     if not hasattr(request, cache_attr):
@@ -70,7 +81,14 @@ def _post_detail_probe(request, slug):
             slug=slug,
             status=Post.Status.PUBLISHED,
             deleted_at__isnull=True,
-        ).values_list("pk", "updated_at").first()
+        ).values_list(
+            "pk",
+            "updated_at",
+            "series_position",
+            "series_total",
+            "series_prev_id",
+            "series_next_id",
+        ).first()
         setattr(request, cache_attr, row)
     return getattr(request, cache_attr)
 
@@ -93,7 +111,9 @@ def _post_detail_etag(request, *args, **kwargs):
 
     Returns an md5 of post state plus the detail-render version. The render
     version intentionally invalidates browser HTML caches when templates or
-    TOC/header behaviour changes without touching the post row.
+    TOC/header behaviour changes without touching the post row. Series
+    navigation is part of the state: a neighbour published later changes
+    the prev/next links without bumping ``updated_at``.
     """
     slug = kwargs.get("slug")
     if not slug:
@@ -101,8 +121,8 @@ def _post_detail_etag(request, *args, **kwargs):
     row = _post_detail_probe(request, slug)
     if row is None:
         return None
-    pk, updated_at = row
-    raw = f"post:{pk}:{updated_at.isoformat()}:{POST_DETAIL_RENDER_VERSION}"
+    pk, updated_at, *navigation = row
+    raw = f"post:{pk}:{updated_at.isoformat()}:{navigation}:{POST_DETAIL_RENDER_VERSION}"
     return hashlib.md5(raw.encode()).hexdigest()
 
 
@@ -167,27 +187,20 @@ def _build_body_html_and_toc(html_content):
 def _get_related_posts(post, limit=3):
     """Return up to ``limit`` published, non-deleted posts related to ``post``.
 
-    Related = same category OR shared tags, excluding the current post.
+    Reads the precomputed ``RelatedPost`` ranking (see ``blog.related``) in one
+    indexed query; the public filter guards against lists not yet refreshed.
     """
-    related = (
+    if not (post.category_id or post.series_id or post.tags.all()):
+        return []  # Nothing to overlap on, so nothing was stored.
+    return list(
         Post.objects.filter(
+            related_backlinks__post_id=post.pk,
             status=Post.Status.PUBLISHED,
             deleted_at__isnull=True,
         )
-        .exclude(pk=post.pk)
-        .select_related("category")
+        .select_related("category", "cover_media")
         .prefetch_related("tags")
-    )
-    category_q = Q(category=post.category) if post.category_id else Q()
-    tag_q = Q(tags__in=post.tags.all()) if post.tags.exists() else Q()
-    combined = category_q | tag_q
-    if not combined:
-        return []
-    # Use distinct to avoid duplicates from tag join; annotate for stable order
-    return list(
-        related.filter(combined)
-        .distinct()
-        .order_by("-created_at")[:limit]
+        .order_by("related_backlinks__rank")[:limit]
     )
 
 
@@ -211,22 +224,26 @@ class PostListView(ListView):
     def get_queryset(self):
         posts = (
             Post.objects.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)
-            .select_related("category")
-            .prefetch_related("tags", "media_files")
+            .select_related("category", "cover_media")
         )
 
-        if self.category_slug:
-            self.active_category = get_object_or_404(Category, slug=self.category_slug)
-            posts = posts.filter(category=self.active_category)
-
-        if self.tag_slug:
-            self.active_tag = get_object_or_404(Tag, slug=self.tag_slug)
-            posts = posts.filter(tags=self.active_tag)
-
-        if self.content_type_filter:
-            valid_types = dict(Post.ContentType.choices).keys()
-            if self.content_type_filter in valid_types:
-                posts = posts.filter(content_type=self.content_type_filter)
+        if self.category_slug or self.tag_slug:
+            # Slugs resolve against the cached taxonomy: no lookup queries.
+            taxonomy = get_taxonomy_snapshot()
+            if self.category_slug:
+                self.active_category = taxonomy.categories_by_slug.get(self.category_slug)
+                if self.active_category is None:
+                    raise Http404("Category not found.")
+                posts = posts.filter(category=self.active_category)
+            if self.tag_slug:
+                self.active_tag = taxonomy.tags_by_slug.get(self.tag_slug)
+                if self.active_tag is None:
+                    raise Http404("Tag not found.")
+                posts = posts.filter(tags=self.active_tag)
+
+        content_type = self.content_type_filter if self.content_type_filter in Post.ContentType.values else ""
+        if content_type:
+            posts = posts.filter(content_type=content_type)
 
         if self.search:
             search_filter = (
@@ -238,19 +255,29 @@ class PostListView(ListView):
             if _needs_python_casefold(self.search):
                 needle = self.search.casefold()
                 casefold_matches = [
-                    post.pk for post in posts if _post_matches_casefold(post, needle)
+                    post.pk
+                    for post in posts.prefetch_related("tags")
+                    if _post_matches_casefold(post, needle)
                 ]
                 posts = posts.filter(search_filter | Q(pk__in=casefold_matches)).distinct()
             else:
                 posts = posts.filter(search_filter).distinct()
 
-        return posts
+        self.count_key = "|".join((self.category_slug, self.tag_slug, content_type, self.search))
+        return posts.order_by(*POST_LIST_ORDERING)
 
     def paginate_queryset(self, queryset, page_size):
-        paginator = Paginator(queryset, page_size)
-        page_number = self.request.GET.get("page", 1)
-        page_obj = paginator.get_page(page_number)
-        return paginator, page_obj, page_obj.object_list, page_obj.has_other_pages()
+        paginator = CachedCountPaginator(queryset, page_size, count_key=self.count_key)
+        cursor = decode_cursor(self.request.GET.get("after", ""))
+        if self.request.htmx and self.request.GET.get("load_more") == "true" and cursor:
+            # Load-more seeks past the last card: no OFFSET, no COUNT.
+            number = self.request.GET.get("page", "")
+            page_obj = paginator.keyset_page(cursor, int(number) if number.isdigit() else 2)
+        else:
+            page_obj = paginator.get_page(self.request.GET.get("page", 1))
+        object_list = page_obj.object_list = list(page_obj.object_list)
+        page_obj.next_cursor = encode_cursor(object_list[-1]) if object_list and page_obj.has_next() else None
+        return paginator, page_obj, object_list, page_obj.has_other_pages()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -264,25 +291,22 @@ class PostListView(ListView):
                 # Templates override the parameter they own and drop stale
                 # pagination state via Django's built-in ``querystring`` tag.
                 "filter_params": self.request.GET,
+                # Cards come from the fragment cache; tags load for misses only.
+                # The template calls the partial, so cards render inside it.
+                "post_cards": partial(render_post_cards, self.request, context["posts"]),
                 "active_category": self.active_category,
                 "active_tag": self.active_tag,
-                "categories": Category.objects.all(),
-                "tags": Tag.objects.all(),
-                "tag_map": Tag.objects.annotate(
-                    public_post_count=Count(
-                        "posts",
-                        filter=Q(
-                            posts__status=Post.Status.PUBLISHED,
-                            posts__deleted_at__isnull=True,
-                        ),
-                        distinct=True,
-                    )
-                ).filter(public_post_count__gt=0),
                 "content_type_choices": Post.ContentType.choices,
                 "is_post_list": True,
                 "is_about": False,
             }
         )
+        if not self.request.htmx:
+            # HTMX partials never render the sidebar; full pages read it cached.
+            taxonomy = get_taxonomy_snapshot()
+            context.update(
+                {"categories": taxonomy.categories, "tags": taxonomy.tags, "tag_map": taxonomy.tag_map}
+            )
         return context
 
     def get_template_names(self):
@@ -319,17 +343,16 @@ class PostDetailView(SessionInteractionMixin, DetailView):
     slug_url_kwarg = "slug"
 
     def get_queryset(self):
-        # prefetch_related("media_files") is correct for the detail view:
-        # ``Post.cover_media`` and ``Post.primary_media`` iterate the
-        # prefetched cache (_prefetched_objects_cache) to pick the cover
-        # image and the primary audio/video player, avoiding extra queries.
-        # A typical post has 1-3 media items, so fetching all of them in a
-        # single prefetch is cheaper and simpler than two targeted filtered
-        # prefetches. No optimization is needed here.
+        # ``cover_media`` and ``primary_media`` are stored pointers: the
+        # cover (social image, JSON-LD) and the player file come in the same
+        # join, without loading the post's other media rows.
         return (
             Post.objects.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)
-            .select_related("category")
-            .prefetch_related("tags", "media_files")
+            .select_related(
+                "category", "series", "series_prev", "series_next", "cover_media", "primary_media"
+            )
+            .defer(*SERIES_NEIGHBOUR_DEFERRED)
+            .prefetch_related("tags")
         )
 
     def get_object(self, queryset=None):
@@ -339,6 +362,11 @@ class PostDetailView(SessionInteractionMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         cover = self.object.cover_media
+        primary = self.object.primary_media
+        # Social image, JSON-LD and the player: one cache round trip for signed URLs.
+        prime_media_urls(
+            [*([cover.thumbnail_og or cover.file] if cover else []), *([primary.file] if primary else [])]
+        )
         context.update(
             {
                 "post_is_liked": self.is_post_liked(self.object),
@@ -352,30 +380,14 @@ class PostDetailView(SessionInteractionMixin, DetailView):
                 "is_about": False,
             }
         )
-        # Series navigation: prev/next posts in the same series
+        # Series navigation is denormalized on the row (see ``blog.series``).
         post = self.object
-        if post.series:
-            series_posts = list(
-                post.series.posts.filter(
-                    status=Post.Status.PUBLISHED,
-                    deleted_at__isnull=True,
-                )
-                .order_by("series_order", "created_at")
-                .values_list("pk", "slug", "title")
-            )
-            current_index = next(
-                (i for i, (pk, _, _) in enumerate(series_posts) if pk == post.pk),
-                None,
-            )
-            if current_index is not None:
-                if current_index > 0:
-                    _, prev_slug, prev_title = series_posts[current_index - 1]
-                    context["series_prev"] = {"slug": prev_slug, "title": prev_title}
-                if current_index < len(series_posts) - 1:
-                    _, next_slug, next_title = series_posts[current_index + 1]
-                    context["series_next"] = {"slug": next_slug, "title": next_title}
-                context["series_total"] = len(series_posts)
-                context["series_position"] = current_index + 1
+        if post.series and post.series_position:
+            for key, neighbour in (("series_prev", post.series_prev), ("series_next", post.series_next)):
+                if neighbour:
+                    context[key] = {"slug": neighbour.slug, "title": neighbour.title}
+            context["series_total"] = post.series_total
+            context["series_position"] = post.series_position
 
         # Related posts (same category or shared tags, excluding current)
         context["related_posts"] = _get_related_posts(post, limit=3)
@@ -441,16 +453,7 @@ class SeriesDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        posts = (
-            self.object.posts.filter(
-                status=Post.Status.PUBLISHED,
-                deleted_at__isnull=True,
-            )
-            .select_related("category")
-            .prefetch_related("tags")
-            .order_by("series_order", "created_at")
-        )
-        context["series_posts"] = posts
+        context["series_posts"] = get_series_toc(self.object)
         context["is_post_list"] = False
         context["is_about"] = False
         return context
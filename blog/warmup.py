@@ -0,0 +1,106 @@
+"""Cache warm-up after a deploy: render the hottest pages before visitors do.
+
+``warmup_paths`` lists the post list, feeds, sitemaps and the top posts by
+``view_count``; ``warm`` requests them from a thread pool and times each one.
+Requests either go through the Django test client in this process, which
+fills the shared cache (``CACHES``) — body HTML, cards, taxonomy, feeds and
+sitemaps — or over HTTP to the running site, which also warms what lives
+inside each Gunicorn worker: the cached template loader, component
+registries, imported modules.
+
+Warm-up requests carry ``WARMUP_HEADER`` with ``warmup_token()`` (an HMAC of
+``SECRET_KEY``) so detail pages count no views; the header alone does nothing.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from .models import Post
+from .session_interactions import WARMUP_HEADER, warmup_token
+from .sitemaps import sitemaps
+
+HTTP_TIMEOUT = 30
+
+
+@dataclass(frozen=True)
+class WarmResult:
+    path: str
+    status: int
+    ms: float
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+
+def warmup_paths(top: int) -> list[str]:
+    """Paths to warm: list, feeds, sitemaps, then ``top`` posts by views."""
+    paths = [reverse("post_list"), reverse("feed_rss"), reverse("feed_atom"), reverse("sitemap")]
+    paths += [reverse("sitemap_section", kwargs={"section": section}) for section in sitemaps]
+    slugs = (
+        Post.objects.filter(status=Post.Status.PUBLISHED, deleted_at__isnull=True)
+        .order_by("-view_count", "-pk")
+        .values_list("slug", flat=True)[:top]
+    )
+    paths += [reverse("post_detail", kwargs={"slug": slug}) for slug in slugs]
+    return paths
+
+
+def in_process_fetcher(host: str, *, secure: bool) -> Callable[[str], int]:
+    def fetch(path: str) -> int:
+        client = Client(raise_request_exception=False, headers={WARMUP_HEADER: warmup_token()})
+        return client.get(path, HTTP_HOST=host, secure=secure).status_code
+
+    return fetch
+
+
+def http_fetcher(base_url: str, host: str) -> Callable[[str], int]:
+    base_url = base_url.rstrip("/")
+
+    def fetch(path: str) -> int:
+        # Same headers the Nginx proxy sets, so cache keys match real traffic.
+        request = urllib.request.Request(
+            base_url + path,
+            headers={"Host": host, "X-Forwarded-Proto": "https", WARMUP_HEADER: warmup_token()},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+        except OSError:
+            return 0
+
+    return fetch
+
+
+def warm(paths: Iterable[str], fetch: Callable[[str], int], *, threads: int = 1) -> list[WarmResult]:
+    """Fetch ``paths`` with ``threads`` workers; results keep the input order."""
+
+    def timed(path: str) -> WarmResult:
+        started = time.perf_counter()
+        try:
+            status = fetch(path)
+        finally:
+            # Pool threads open their own connections; do not leak them.
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
+        return WarmResult(path, status, (time.perf_counter() - started) * 1000)
+
+    paths = list(paths)
+    if threads <= 1:
+        return [timed(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="warm-caches") as executor:
+        return list(executor.map(timed, paths))
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import importlib.util
 import os
 
 
@@ -34,6 +35,12 @@ def env_int(name: str, default: int) -> int:
         raise RuntimeError(f"Environment variable must be an integer: {name}") from exc
 
 
+def require_module(module: str, setting: str) -> None:
+    """Fail settings import when ``setting`` needs a package that is not installed."""
+    if importlib.util.find_spec(module) is None:
+        raise RuntimeError(f"{setting} needs the '{module}' package; install it on this host first")
+
+
 def env_list(name: str, default: list[str] | None = None) -> list[str]:
     """Read a comma-separated env var into a cleaned list."""
     value = os.environ.get(name)
@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 from pathlib import Path
 
-from config.env import env, env_bool, env_list
+from config.env import env, env_bool, env_int, env_list, require_module
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -156,6 +156,66 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Serving local MEDIA_ROOT outside DEBUG: "django" (sendfile-backed FileResponse),
+# "x-accel-redirect" (nginx internal location) or "x-sendfile". Empty = DEBUG only.
+MEDIA_SERVE_MODE = env("MEDIA_SERVE_MODE").strip().lower()
+if MEDIA_SERVE_MODE not in {"", "django", "x-accel-redirect", "x-sendfile"}:
+    raise RuntimeError("MEDIA_SERVE_MODE must be django, x-accel-redirect or x-sendfile")
+MEDIA_ACCEL_REDIRECT_PREFIX = env("MEDIA_ACCEL_REDIRECT_PREFIX", "/_protected_media/")
+
+# Move PostMedia thumbnail rendering out of request/API transactions into the
+# ``generate_thumbnails`` worker command.
+MEDIA_THUMBNAILS_DEFERRED = env_bool("MEDIA_THUMBNAILS_DEFERRED", False)
+
+# Queue related-posts refreshes of saves, deletes and tag changes in
+# ``RelatedRefreshJob`` for the ``rebuild_related_posts --pending`` worker
+# instead of recomputing them inside the request.
+RELATED_POSTS_DEFERRED = env_bool("RELATED_POSTS_DEFERRED", False)
+
+# Width buckets and modern formats for in-body image ``srcset`` variants.
+MEDIA_RESPONSIVE_WIDTHS = [
+    int(width) for width in env_list("MEDIA_RESPONSIVE_WIDTHS", ["480", "960", "1440"])
+]
+MEDIA_RESPONSIVE_FORMATS = env_list("MEDIA_RESPONSIVE_FORMATS", ["avif", "webp"])
+
+# Cache shared by every worker process. "locmem" is per-process and only fits
+# development and tests; "file" shares a directory between workers of one
+# host, "database" uses the ``createcachetable`` table, "memcached"/"redis"
+# talk to a local service (``unix:`` socket or host:port in
+# DJANGO_CACHE_LOCATION; needs pymemcache/redis installed).
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "database": "django.core.cache.backends.db.DatabaseCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+# Client libraries Django's memcached/redis backends import on first access.
+CACHE_CLIENT_MODULES = {"memcached": "pymemcache", "redis": "redis"}
+CACHE_BACKEND = env("DJANGO_CACHE_BACKEND", "locmem").strip().lower()
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise RuntimeError(f"DJANGO_CACHE_BACKEND must be one of: {', '.join(CACHE_BACKENDS)}")
+if CACHE_BACKEND in CACHE_CLIENT_MODULES:
+    require_module(CACHE_CLIENT_MODULES[CACHE_BACKEND], f"DJANGO_CACHE_BACKEND={CACHE_BACKEND}")
+CACHE_LOCATION = env("DJANGO_CACHE_LOCATION").strip() or {
+    "file": str(BASE_DIR / ".cache" / "django"),
+    "database": "django_cache",
+    "memcached": "127.0.0.1:11211",
+    "redis": "redis://127.0.0.1:6379/1",
+}.get(CACHE_BACKEND, "")
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": CACHE_LOCATION,
+        "KEY_PREFIX": env("DJANGO_CACHE_KEY_PREFIX", "django-6-blog"),
+        "OPTIONS": (
+            {"MAX_ENTRIES": env_int("DJANGO_CACHE_MAX_ENTRIES", 20000)}
+            if CACHE_BACKEND in {"locmem", "file", "database"}
+            else {}
+        ),
+    }
+}
+
 STORAGES = {
     "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
     "staticfiles": {
@@ -167,6 +227,11 @@ STORAGES = {
     },
 }
 
+# Markdown → HTML renderer from ``blog.services.renderers``: "fast" (reused
+# Markdown instance per thread), "full" (reference, fresh instance per call)
+# or "basic" (no media/Bootstrap post-processing, previews only).
+MARKDOWN_RENDERER = env("MARKDOWN_RENDERER", "fast").strip().lower()
+
 # Django Components Finder
 STATICFILES_FINDERS = [
     "django.contrib.staticfiles.finders.FileSystemFinder",
@@ -8,7 +8,7 @@ from urllib.parse import urlparse
 
 import dj_database_url
 
-from config.env import env, env_bool, env_int, env_list, env_required
+from config.env import env, env_bool, env_int, env_list, env_required, require_module
 from config.settings import *  # noqa: F403
 
 
@@ -111,6 +111,33 @@ STORAGES = {
     },
 }
 
+# Gunicorn workers must share cache hits and invalidations; systemd's
+# ``CacheDirectory`` provides the default file cache location.
+CACHE_BACKEND = env("DJANGO_CACHE_BACKEND", "file").strip().lower()
+if CACHE_BACKEND not in CACHE_BACKENDS or CACHE_BACKEND == "locmem":  # noqa: F405
+    raise RuntimeError("Production DJANGO_CACHE_BACKEND must be a shared cache: file, database, memcached or redis")
+if CACHE_BACKEND in CACHE_CLIENT_MODULES:  # noqa: F405
+    require_module(CACHE_CLIENT_MODULES[CACHE_BACKEND], f"DJANGO_CACHE_BACKEND={CACHE_BACKEND}")  # noqa: F405
+if CACHE_BACKEND == "file":
+    CACHE_LOCATION = env("DJANGO_CACHE_LOCATION", "/var/cache/django-6-blog").strip()
+    if not CACHE_LOCATION.startswith("/"):
+        raise RuntimeError("Production DJANGO_CACHE_LOCATION must be an absolute path")
+else:
+    CACHE_LOCATION = env("DJANGO_CACHE_LOCATION").strip()
+    if not CACHE_LOCATION:
+        raise RuntimeError("Production DJANGO_CACHE_LOCATION is required for this cache backend")
+CACHES["default"].update(  # noqa: F405
+    {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],  # noqa: F405
+        "LOCATION": CACHE_LOCATION,
+        "OPTIONS": (
+            {"MAX_ENTRIES": env_int("DJANGO_CACHE_MAX_ENTRIES", 20000)}
+            if CACHE_BACKEND in {"file", "database"}
+            else {}
+        ),
+    }
+)
+
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 SECURE_SSL_REDIRECT = True
 SESSION_COOKIE_SECURE = True
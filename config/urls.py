@@ -17,37 +17,49 @@ Including another URLconf
 
 from django.conf import settings
 from django.contrib import admin
-from django.contrib.sitemaps.views import sitemap
 from django.urls import include, path, re_path
 
-from blog.dev_media import serve_media_with_range
-from blog.feeds import AtomLatestPostsFeed, LatestPostsFeed
-from blog.sitemaps import PostSitemap, StaticViewSitemap
+from blog.feeds import (
+    AtomCategoryPostsFeed,
+    AtomLatestPostsFeed,
+    AtomSeriesPostsFeed,
+    AtomTagPostsFeed,
+    CategoryPostsFeed,
+    LatestPostsFeed,
+    SeriesPostsFeed,
+    TagPostsFeed,
+)
+from blog.media_delivery import serve_media
+from blog.sitemaps import sitemap_index, sitemap_section
 from blog.views import robots_txt
 
-sitemaps = {
-    "posts": PostSitemap,
-    "static": StaticViewSitemap,
-}
-
 urlpatterns = [
     path("admin/", admin.site.urls),
     # Приложение блога (главная страница и все маршруты)
     path("", include("blog.urls")),
     path("api/v1/", include("api.urls", namespace="api")),
     # SEO
-    path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="sitemap"),
+    path("sitemap.xml", sitemap_index, name="sitemap"),
+    path("sitemap-<slug:section>.xml", sitemap_section, name="sitemap_section"),
     path("robots.txt", robots_txt, name="robots_txt"),
     path("feed/rss/", LatestPostsFeed(), name="feed_rss"),
     path("feed/atom/", AtomLatestPostsFeed(), name="feed_atom"),
+    path("feed/category/<slug:slug>/rss/", CategoryPostsFeed(), name="feed_category_rss"),
+    path("feed/category/<slug:slug>/atom/", AtomCategoryPostsFeed(), name="feed_category_atom"),
+    path("feed/tag/<slug:slug>/rss/", TagPostsFeed(), name="feed_tag_rss"),
+    path("feed/tag/<slug:slug>/atom/", AtomTagPostsFeed(), name="feed_tag_atom"),
+    path("feed/series/<slug:slug>/rss/", SeriesPostsFeed(), name="feed_series_rss"),
+    path("feed/series/<slug:slug>/atom/", AtomSeriesPostsFeed(), name="feed_series_atom"),
 ]
 
-# Раздача медиа-файлов в режиме разработки с поддержкой HTTP Range для seek в audio/video.
-if settings.DEBUG:
+# Раздача медиа-файлов из MEDIA_ROOT с поддержкой HTTP Range для seek в audio/video:
+# в DEBUG всегда, в остальных окружениях — при явном MEDIA_SERVE_MODE
+# (django / x-accel-redirect / x-sendfile, см. blog/media_delivery.py).
+if settings.DEBUG or settings.MEDIA_SERVE_MODE:
     urlpatterns += [
         re_path(
             rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.*)$",
-            serve_media_with_range,
+            serve_media,
             {"document_root": settings.MEDIA_ROOT},
         )
     ]
@@ -22,6 +22,9 @@ Examples:
     # Replace existing post with same slug
     python -m publisher.cli publish note.md --replace
 
+    # Nightly sync: skip unchanged notes, upload only changed assets
+    python -m publisher.cli publish note.md --sync
+
     # Override frontmatter
     python -m publisher.cli publish note.md --title "Custom Title" --content-type video
 """
@@ -36,7 +39,7 @@ import sys
 from pathlib import Path
 
 from .client import ApiError, publish_package, publish_post
-from .package import build_publish_package
+from .package import build_publish_package, stored_package
 from .parser import parse_markdown_file
 
 
@@ -112,6 +115,11 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Replace existing post with the same slug.",
     )
+    pub.add_argument(
+        "--sync",
+        action="store_true",
+        help="Update the post only if the note or its assets changed; upload only changed assets.",
+    )
     pub.add_argument(
         "--assets-dir",
         type=Path,
@@ -132,6 +140,23 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _publish_synced(args: argparse.Namespace, manifest: dict, package_files: dict) -> dict:
+    """Send a sync package with all assets stored, then resend missing ones."""
+    sync_manifest, files, key = stored_package(manifest, package_files)
+    try:
+        return publish_package(
+            url=args.url, api_key=args.key, manifest=sync_manifest, files=files, idempotency_key=key
+        )
+    except ApiError as exc:
+        missing = exc.body.get("missing_assets")
+        if exc.status_code != 409 or not missing:
+            raise
+    sync_manifest, files, key = stored_package(manifest, package_files, missing)
+    return publish_package(
+        url=args.url, api_key=args.key, manifest=sync_manifest, files=files, idempotency_key=key
+    )
+
+
 def cmd_publish(args: argparse.Namespace) -> int:
     """Execute the publish command."""
     if not args.file.exists():
@@ -158,6 +183,7 @@ def cmd_publish(args: argparse.Namespace) -> int:
             payload,
             assets_dir=args.assets_dir,
             replace=args.replace,
+            sync=args.sync,
         )
     except ValueError as exc:
         print(f"Asset error: {exc}", file=sys.stderr)
@@ -185,8 +211,14 @@ def cmd_publish(args: argparse.Namespace) -> int:
         print("Error: --key is required (or set BLOG_API_KEY env var).", file=sys.stderr)
         return 1
 
+    if args.sync and args.idempotency_key:
+        print("Error: --sync derives its own idempotency keys.", file=sys.stderr)
+        return 1
+
     try:
-        if package_files:
+        if args.sync:
+            result = _publish_synced(args, manifest, package_files)
+        elif package_files:
             result = publish_package(
                 url=args.url,
                 api_key=args.key,
@@ -208,10 +240,15 @@ def cmd_publish(args: argparse.Namespace) -> int:
         print(f"Connection error: {exc}", file=sys.stderr)
         return 1
 
+    if result.get("unchanged"):
+        print(f"= Unchanged: {result.get('title', '?')}")
+        return 0
     print(f"✓ Published: {result.get('title', '?')}")
     print(f"  Slug: {result.get('slug', '?')}")
     print(f"  Status: {result.get('status', '?')}")
     print(f"  URL: {args.url.rstrip('/')}{result.get('url', '')}")
+    for duplicate in result.get("near_duplicates") or []:
+        print(f"! Near duplicate: {duplicate['slug']} (similarity {duplicate['score']:.2f})", file=sys.stderr)
     return 0
 
 
@@ -6,12 +6,13 @@ import hashlib
 import json
 import re
 from pathlib import Path, PurePosixPath
-from typing import Any
+from typing import Any, Iterable
+
+from blog.content_import.markdown_tokens import EMBED, MEDIA_KINDS, tokenize
+from blog.content_import.vault_index import get_vault_index, vault_index_run
 
 from .parser import split_frontmatter
 
-OBSIDIAN_EMBED_RE = re.compile(r"!\[\[([^\]|]+)(?:\|[^\]]+)?\]\]")
-MARKDOWN_EMBED_RE = re.compile(r"!\[[^\]]*\]\(([^)]+)\)")
 EXTERNAL_RE = re.compile(r"^https?://", re.I)
 ALLOWED_EXTENSIONS = {
     ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png",
@@ -55,7 +56,17 @@ def _resolve_asset(root: Path, logical: str) -> Path:
     except ValueError as exc:
         raise ValueError("Local asset reference escapes --assets-dir") from exc
     if not candidate.is_file():
-        raise ValueError(f"Local asset is missing: {PurePosixPath(logical).name}")
+        # Obsidian resolves bare ``![[name.ext]]`` anywhere in the vault; look
+        # the name up in the shared index of --assets-dir instead of rglob.
+        name = PurePosixPath(logical).name
+        found = get_vault_index(root).find_name(name) if "/" not in logical else None
+        if found is None:
+            raise ValueError(f"Local asset is missing: {name}")
+        candidate = found.resolve()
+        try:
+            candidate.relative_to(root)
+        except ValueError as exc:
+            raise ValueError("Local asset reference escapes --assets-dir") from exc
     return candidate
 
 
@@ -67,14 +78,20 @@ def _sha256(path: Path) -> str:
     return digest.hexdigest()
 
 
+@vault_index_run()
 def build_publish_package(
     note_path: Path,
     payload: dict[str, Any],
     *,
     assets_dir: Path | None = None,
     replace: bool = False,
+    sync: bool = False,
 ) -> tuple[dict[str, Any], dict[str, Path], str]:
-    """Return manifest, upload part paths, and deterministic idempotency key."""
+    """Return manifest, upload part paths, and deterministic idempotency key.
+
+    ``sync`` asks the server to skip the package when the post is unchanged;
+    pair it with :func:`stored_package` to avoid re-uploading known assets.
+    """
     note_path = Path(note_path)
     root = Path(assets_dir) if assets_dir else note_path.parent
     raw = note_path.read_text(encoding="utf-8")
@@ -82,13 +99,10 @@ def build_publish_package(
     content = payload.get("content", "")
 
     refs: list[str] = []
-    for match in OBSIDIAN_EMBED_RE.finditer(content):
-        refs.append(_logical_target(match.group(1)))
-    for match in MARKDOWN_EMBED_RE.finditer(content):
-        raw_target = match.group(1).strip()
-        if _is_external(raw_target):
+    for token in tokenize(content).of(*MEDIA_KINDS):
+        if token.kind != EMBED and _is_external(token.target):
             continue
-        refs.append(_logical_target(raw_target))
+        refs.append(_logical_target(token.target))
 
     body_refs = set(refs)
     cover = str(metadata.get("cover") or "").strip().strip("\"'")
@@ -182,6 +196,35 @@ def build_publish_package(
         post.pop("media_url", None)
     if replace:
         post["replace"] = True
+    if sync:
+        post["sync"] = True
     manifest: dict[str, Any] = {"protocol_version": 1, "post": post, "assets": assets}
     manifest["package_sha256"] = _canonical_hash(manifest)
     return manifest, parts, manifest["package_sha256"]
+
+
+def stored_package(
+    manifest: dict[str, Any],
+    parts: dict[str, Path],
+    upload_ids: Iterable[str] = (),
+) -> tuple[dict[str, Any], dict[str, Path], str]:
+    """Mark every asset except ``upload_ids`` as already stored on the server.
+
+    Stored assets carry no upload part; the server reuses the media row with
+    the same ``original_filename`` and ``sha256`` or answers 409 with
+    ``missing_assets`` so the client can resend just those.
+    """
+    upload_ids = set(upload_ids)
+    assets = []
+    upload_parts: dict[str, Path] = {}
+    for asset in manifest["assets"]:
+        if asset["id"] in upload_ids:
+            assets.append(asset)
+            upload_parts[asset["part"]] = parts[asset["part"]]
+        else:
+            stored = {key: value for key, value in asset.items() if key != "part"}
+            assets.append({**stored, "stored": True})
+    result = {key: value for key, value in manifest.items() if key != "package_sha256"}
+    result["assets"] = assets
+    result["package_sha256"] = _canonical_hash(result)
+    return result, upload_parts, result["package_sha256"]
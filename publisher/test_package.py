@@ -288,3 +288,14 @@ def test_cli_asset_error_precedes_network_and_does_not_leak_key(tmp_path):
     assert "Asset error" in result.stderr
     assert "missing.png" in result.stderr
     assert token not in result.stdout + result.stderr
+
+
+def test_bare_obsidian_embed_resolves_nested_asset_through_vault_index(tmp_path):
+    (tmp_path / "999_files" / "lesson").mkdir(parents=True)
+    (tmp_path / "999_files" / "lesson" / "diagram.png").write_bytes(b"\x89PNG\r\n\x1a\nimage")
+    note = _note(tmp_path, "---\ntitle: Nested\ndescription: vault\n---\n![[diagram.png]]\n")
+
+    manifest, files, _key = build_publish_package(note, parse_markdown_file(note))
+
+    assert _asset_by_name(manifest, "diagram.png")["source_refs"] == ["diagram.png"]
+    assert files["asset_a001"] == (tmp_path / "999_files" / "lesson" / "diagram.png").resolve()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Сравнить скорость рендереров Markdown и совпадение их HTML с эталоном ``full``.
+
+Usage:
+    uv run python scripts/bench/markdown_renderers.py
+    uv run python scripts/bench/markdown_renderers.py note1.md note2.md --repeat 20
+
+Without arguments every ``doc/**/*.md`` of the repository is rendered, plus a
+synthetic note with footnotes, abbreviations, tables, callouts, code and a
+Mermaid fence. Each renderer of ``blog.services.renderers`` renders all notes
+``--repeat`` times; the table shows notes per second, the mean time per note
+and how many notes differ from ``full``. ``basic`` skips media and Bootstrap
+post-processing, so it differs by design. Exits non-zero when the renderer of
+``settings.MARKDOWN_RENDERER`` does not match ``full`` or when the legacy
+``codehilite`` extension got imported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+SYNTHETIC = """# Заметка
+
+Текст со сноской[^1] и аббревиатурой HTML.
+
+| A | B |
+|---|---|
+| 1 | `код` |
+
+> [!note] Callout
+> Тело callout.
+
+```python
+print("hello")
+```
+
+```mermaid
+graph TD; A-->B
+```
+
+- [x] готово
+- [ ] в работе
+
+[^1]: Сноска.
+
+*[HTML]: HyperText Markup Language
+"""
+
+
+def load_notes(paths: list[Path]) -> list[tuple[str, str]]:
+    if paths:
+        return [(path.name, path.read_text(encoding="utf-8")) for path in paths]
+    notes = [(path.name, path.read_text(encoding="utf-8")) for path in sorted((ROOT / "doc").rglob("*.md"))]
+    return [*notes, ("synthetic", SYNTHETIC)]
+
+
+def measure(renderer, notes: list[tuple[str, str]], repeat: int) -> float:
+    renderer.render(notes[0][1])  # первый вызов собирает Markdown и импортирует расширения
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _name, text in notes:
+            renderer.render(text)
+    return time.perf_counter() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("notes", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    import os
+
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+    from django.conf import settings
+
+    from blog.services.renderers import available_renderers, get_renderer
+
+    notes = load_notes(args.notes)
+    reference = [get_renderer("full").render(text) for _name, text in notes]
+    repeat = max(1, args.repeat)
+    rendered = len(notes) * repeat
+
+    print(f"notes={len(notes)} repeat={repeat} default={settings.MARKDOWN_RENDERER}")
+    print(f"{'renderer':<10} {'notes/s':>10} {'ms/note':>9} {'differs':>8}")
+    mismatched = []
+    for name in available_renderers():
+        renderer = get_renderer(name)
+        elapsed = measure(renderer, notes, repeat)
+        differs = [note for (note, text), html in zip(notes, reference) if renderer.render(text) != html]
+        if differs and name == settings.MARKDOWN_RENDERER:
+            mismatched = differs
+        print(f"{name:<10} {rendered / elapsed:>10.1f} {elapsed * 1000 / rendered:>9.2f} {len(differs):>8}")
+
+    codehilite = "markdown.extensions.codehilite" in sys.modules
+    print(f"codehilite_loaded={'yes' if codehilite else 'no'}")
+    for note in mismatched:
+        print(f"mismatch renderer={settings.MARKDOWN_RENDERER} note={note}")
+    return 1 if mismatched or codehilite else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Сравнить прежние регулярные проходы по заметке с одним проходом markdown_tokens.
+
+Usage:
+    uv run python scripts/bench/markdown_tokens.py
+    uv run python scripts/bench/markdown_tokens.py note1.md note2.md --repeat 10
+
+Without arguments synthetic notes of 100 KB, 1 MB and 5 MB are generated with
+embeds, images, wikilinks, links, code and timecode fences. Both sides repeat
+the scans of one import + render with the call counts of the real flow: media
+targets (import report, broken links, importer), document targets, bundle and
+publisher refs, wikilink normalization, timecode extraction, the media
+preprocessor rewrite and the card excerpt. The token cache is cleared before
+every repetition, so the new path pays for its scans each time; the last
+column is the excerpt of an already scanned body.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+SAMPLE_SIZES = (100_000, 1_000_000, 5_000_000)
+SECTION = """
+## Раздел {index}
+
+Текст раздела со ссылкой на [[Заметка {index}|заметку]] и [документ](docs/doc-{index}.md).
+![[999_files/img-{index}.webp|500]]
+![Схема {index}](../media/scheme-{index}.png) и [сайт](https://example.com/{index}).
+
+> Цитата с **выделением** и `кодом`.
+
+- пункт один
+- пункт два
+
+| A | B |
+|---|---|
+| {index} | ![[table-{index}.png]] |
+
+```python
+print("![[not-an-asset-{index}.png]]")
+```
+"""
+TIMECODES = "\n```timecodes\n00:00 Intro\n01:30 Main\n```\n"
+
+# Regexes of the call sites before the shared scanner.
+LEGACY = {
+    "embed": re.compile(r"!\[\[([^\]|]+)(?:\|([^\]]+))?\]\]"),
+    "note_link": re.compile(r"(?<!!)\[\[([^\]|]+)(?:\|([^\]]+))?\]\]"),
+    "image": re.compile(r"!\[([^\]]*)\]\(([^)]+)\)"),
+    "link": re.compile(r"(?<!!)\[([^\]]+)\]\(([^)]+)\)"),
+    "timecodes": re.compile(r"(?ms)^```timecodes\s*\n(?P<body>.*?)\n```\s*$"),
+}
+LEGACY_EXCERPT = (
+    (r"(?s)^---.*?---", " "),
+    (r"(?s)```.*?```", " "),
+    (r"(?m)^\s*\|.*\|\s*$", " "),
+    (r"!\[\[[^\]]+\]\]", " "),
+    (r"\[\[[^\]]+\]\]", " "),
+    (r"!\[[^\]]*\]\([^)]*\)", " "),
+    (r"\[([^\]]+)\]\([^)]*\)", r"\1"),
+    (r"(?m)^\s{0,3}#{1,6}\s*", ""),
+    (r"(?m)^\s{0,3}>\s?", ""),
+    (r"(?m)^\s*[-*+]\s+", ""),
+    (r"[#*_>`~\-]{2,}", " "),
+    (r"\s+", " "),
+)
+
+
+def legacy_media_targets(text: str) -> list[str]:
+    """``media_links.iter_local_media_targets`` before the shared scanner."""
+    from blog.content_import.media_links import clean_target, is_external_or_absolute, normalize_target
+
+    matches = [(match.start(), clean_target(match.group(1))) for match in LEGACY["embed"].finditer(text)]
+    for match in LEGACY["image"].finditer(text):
+        raw_target = match.group(2).strip().strip("<>")
+        if not is_external_or_absolute(raw_target):
+            matches.append((match.start(), clean_target(raw_target)))
+    return _dedupe(matches, normalize_target)
+
+
+def legacy_document_targets(text: str) -> list[str]:
+    """``media_links.iter_local_document_targets`` before the shared scanner."""
+    from blog.content_import.media_links import clean_target, is_external_or_absolute, normalize_target
+
+    matches = [(match.start(), clean_target(match.group(1))) for match in LEGACY["note_link"].finditer(text)]
+    for match in LEGACY["link"].finditer(text):
+        raw_target = match.group(2).strip().strip("<>")
+        if not is_external_or_absolute(raw_target) and not raw_target.startswith("#"):
+            matches.append((match.start(), clean_target(raw_target)))
+    return _dedupe(matches, normalize_target)
+
+
+def legacy_bundle_targets(text: str) -> list[str]:
+    """``media_bundle.iter_media_targets_for_bundle`` before the shared scanner."""
+    from blog.content_import.media_bundle import normalize_bundle_target
+    from blog.content_import.media_links import is_external_or_absolute
+
+    matches = []
+    for match in [*LEGACY["embed"].finditer(text), *LEGACY["image"].finditer(text)]:
+        target = normalize_bundle_target(match.group(1) if match.re is LEGACY["embed"] else match.group(2))
+        if target and not is_external_or_absolute(target):
+            matches.append((match.start(), target))
+    return _dedupe(matches, str.casefold)
+
+
+def _dedupe(matches, key) -> list[str]:
+    seen = set()
+    targets = []
+    for _position, target in sorted(matches, key=lambda item: item[0]):
+        if key(target) not in seen:
+            seen.add(key(target))
+            targets.append(target)
+    return targets
+
+
+def legacy_excerpt(text: str) -> str:
+    for pattern, replacement in LEGACY_EXCERPT:
+        text = re.sub(pattern, replacement, text)
+    return text
+
+
+def legacy_pass(text: str) -> str:
+    for _ in range(3):  # import command report, broken links, importer
+        legacy_media_targets(text)
+    legacy_document_targets(text)
+    legacy_bundle_targets(text)
+    legacy_bundle_targets(text)  # publisher.package scans the same spans
+    body = LEGACY["note_link"].sub(lambda match: match.group(2) or match.group(1), text)
+    body = LEGACY["timecodes"].sub("", body)
+    rendered = LEGACY["embed"].sub(lambda match: f"![{match.group(2) or ''}]({match.group(1)})", body)
+    LEGACY["image"].sub(lambda match: match.group(0), rendered)
+    return legacy_excerpt(body)
+
+
+def token_pass(text: str) -> str:
+    from blog.content_import.markdown_tokens import EMBED, MEDIA_KINDS, tokenize
+    from blog.content_import.media_bundle import iter_media_targets_for_bundle
+    from blog.content_import.media_links import iter_local_document_targets, iter_local_media_targets
+    from blog.content_import.obsidian import normalize_obsidian_note_links
+    from blog.content_import.timecodes import extract_timecode_blocks
+
+    tokenize.cache_clear()
+    for _ in range(3):
+        list(iter_local_media_targets(text))
+    list(iter_local_document_targets(text))
+    list(iter_media_targets_for_bundle(text))
+    list(iter_media_targets_for_bundle(text))
+    body = normalize_obsidian_note_links(text)
+    body, _entries = extract_timecode_blocks(body)
+    tokenize(body).rewrite(
+        lambda token: f"![{token.label}]({token.target})" if token.kind == EMBED else None, MEDIA_KINDS
+    )
+    return token_excerpt(body)
+
+
+def token_excerpt(text: str) -> str:
+    from blog.content_import.markdown_tokens import tokenize
+    from blog.models import (
+        EXCERPT_LINE_PREFIX_RE,
+        EXCERPT_TABLE_ROW_RE,
+        EXCERPT_TOKEN_KINDS,
+        _excerpt_token_text,
+    )
+
+    text = tokenize(text).rewrite(_excerpt_token_text, EXCERPT_TOKEN_KINDS)
+    text = EXCERPT_TABLE_ROW_RE.sub(" ", text)
+    text = EXCERPT_LINE_PREFIX_RE.sub("", text)
+    text = re.sub(r"[#*_>`~\-]{2,}", " ", text)
+    return re.sub(r"\s+", " ", text)
+
+
+def generate_note(size: int) -> str:
+    parts = ["---\ntitle: Benchmark\ndescription: Large note\n---\n", TIMECODES]
+    length = sum(map(len, parts))
+    index = 0
+    while length < size:
+        section = SECTION.format(index=index)
+        parts.append(section)
+        length += len(section)
+        index += 1
+    return "".join(parts)
+
+
+def measure(function, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(text)
+    return (time.perf_counter() - started) / repeat
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("notes", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    import os
+
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+    samples = [(path.name, path.read_text(encoding="utf-8")) for path in args.notes] or [
+        (f"synthetic-{size // 1000}KB", generate_note(size)) for size in SAMPLE_SIZES
+    ]
+    print(
+        f"{'note':<20} {'legacy ms':>10} {'tokens ms':>10} {'speedup':>8} "
+        f"{'excerpt legacy':>15} {'excerpt warm':>13}"
+    )
+    for name, text in samples:
+        legacy_time = measure(legacy_pass, text, args.repeat)
+        token_time = measure(token_pass, text, args.repeat)
+        # Cards re-read the excerpt of a stored body: the scan is already cached.
+        legacy_excerpt_time = measure(legacy_excerpt, text, args.repeat)
+        token_excerpt(text)
+        warm_excerpt_time = measure(token_excerpt, text, args.repeat)
+        print(
+            f"{name:<20} {legacy_time * 1000:>10.1f} {token_time * 1000:>10.1f} "
+            f"{legacy_time / token_time:>7.1f}x {legacy_excerpt_time * 1000:>15.1f} "
+            f"{warm_excerpt_time * 1000:>13.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Профиль импорта при старте Django: то, что платит каждый ``manage.py``.
+
+Usage:
+    uv run python scripts/bench/startup.py
+    uv run python scripts/bench/startup.py --repeat 5 --top 30
+    uv run python scripts/bench/startup.py --command publish_scheduled
+
+Runs ``python -X importtime`` in a fresh interpreter (``django.setup()`` by
+default, or a whole management command), keeps the fastest of ``--repeat``
+runs and prints the total import time, the slowest top-level imports and
+which heavy rendering dependencies were loaded. ``tests/test_startup_imports.py``
+enforces the same boundaries and a time budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SETUP_CODE = "import django; django.setup()"
+# Loaded only when Markdown is rendered or an image is decoded.
+LAZY_MODULES = (
+    "PIL.Image",
+    "markdown",
+    "pymdownx",
+    "bs4",
+    "pygments",
+    "blog.services.markdown_converter",
+    "blog.content_import.media_bundle",
+)
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile(args: list[str]) -> dict[str, tuple[int, int, int]]:
+    """Return ``{module: (self_us, cumulative_us, depth)}`` of one fresh run."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if match := LINE_RE.match(line):
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+def total_ms(modules: dict[str, tuple[int, int, int]]) -> float:
+    return sum(self_us for self_us, _cumulative, _depth in modules.values()) / 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--command", help="Profile `manage.py <command>` instead of django.setup().")
+    options = parser.parse_args()
+
+    args = ["manage.py", options.command] if options.command else ["-c", SETUP_CODE]
+    runs = [profile(args) for _ in range(max(1, options.repeat))]
+    best = min(runs, key=total_ms)
+
+    print(f"modules={len(best)} import_ms={total_ms(best):.1f} runs={len(runs)}")
+    print(f"{'cumulative ms':>14}  module")
+    top_level = [(cumulative, name) for name, (_self, cumulative, depth) in best.items() if depth <= 1]
+    for cumulative, name in sorted(top_level, reverse=True)[: options.top]:
+        print(f"{cumulative / 1000:14.1f}  {name}")
+    for name in LAZY_MODULES:
+        print(f"{'loaded' if name in best else 'lazy':>14}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
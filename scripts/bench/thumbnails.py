@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Сравнить полное декодирование и draft/reduce-декодирование превью PostMedia.
+
+Usage:
+    uv run python scripts/bench/thumbnails.py
+    uv run python scripts/bench/thumbnails.py photo1.jpg photo2.webp --repeat 5
+
+Without arguments synthetic 4000 px and 8000 px JPEG/WebP samples are generated
+in a temporary directory. Every measurement runs in a fresh spawned process so
+the reported peak RSS delta belongs to one decode, not to the benchmark itself.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+SAMPLE_SIZES = ((4000, 3000), (8000, 4500))
+SAMPLE_FORMATS = (("JPEG", ".jpg"), ("WEBP", ".webp"))
+
+
+def full_decode_thumbnails(source: bytes) -> dict[str, bytes]:
+    """Legacy path: decode the original at full size, fit each derivative from it."""
+    from io import BytesIO
+
+    from PIL import Image
+
+    from blog.thumbnails import THUMBNAIL_SIZES, thumbnail_bytes
+
+    with Image.open(BytesIO(source)) as image:
+        image = image.convert("RGB")
+        return {name: thumbnail_bytes(image, size) for name, size in THUMBNAIL_SIZES.items()}
+
+
+def _peak_rss_kb() -> int:
+    # ru_maxrss survives execve on Linux and would report the parent's peak in
+    # a spawned child; VmHWM belongs to the current address space only.
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(mode: str, path: str, repeat: int) -> tuple[float, int]:
+    from blog.thumbnails import render_thumbnails
+
+    source = Path(path).read_bytes()
+    render = render_thumbnails if mode == "reduced" else full_decode_thumbnails
+    baseline_kb = _peak_rss_kb()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render(source)
+    elapsed = (time.perf_counter() - started) / repeat
+    return elapsed, _peak_rss_kb() - baseline_kb
+
+
+def measure(mode: str, path: Path, repeat: int) -> tuple[float, int]:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_measure, mode, str(path), repeat).result()
+
+
+def generate_samples(directory: Path) -> list[Path]:
+    from PIL import Image
+
+    samples = []
+    for width, height in SAMPLE_SIZES:
+        gradient = Image.linear_gradient("L").resize((width, height))
+        noise = Image.effect_noise((width, height), 64)
+        image = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+        for image_format, suffix in SAMPLE_FORMATS:
+            path = directory / f"sample-{width}x{height}{suffix}"
+            image.save(path, format=image_format, quality=90)
+            samples.append(path)
+    return samples
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        images = args.images or generate_samples(Path(tmp))
+        print(f"{'image':<28} {'full ms':>9} {'reduced ms':>11} {'speedup':>8} {'full MB':>8} {'reduced MB':>11}")
+        for path in images:
+            full_time, full_kb = measure("full", path, args.repeat)
+            reduced_time, reduced_kb = measure("reduced", path, args.repeat)
+            print(
+                f"{path.name:<28} {full_time * 1000:>9.1f} {reduced_time * 1000:>11.1f} "
+                f"{full_time / reduced_time:>7.1f}x {full_kb / 1024:>8.1f} {reduced_kb / 1024:>11.1f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,7 @@
 #!/usr/bin/env bash
 set -euo pipefail
 instance=${1:-}
-[[ "$instance" =~ ^(migrate|check|collectstatic):([0-9]{8}T[0-9]{6}Z-[0-9a-f]{12})$ ]] || { echo 'operation or release id not allowed' >&2; exit 2; }
+[[ "$instance" =~ ^(migrate|related|check|collectstatic):([0-9]{8}T[0-9]{6}Z-[0-9a-f]{12})$ ]] || { echo 'operation or release id not allowed' >&2; exit 2; }
 op=${BASH_REMATCH[1]}
 release_id=${BASH_REMATCH[2]}
 release_root=${RELEASE_ROOT:-/srv/django-6-blog}
@@ -12,6 +12,7 @@ approved=$(realpath -m -- "$release_root/releases")
 [[ "$resolved" == "$approved/$release_id" && ! -L "$release" ]] || { echo 'invalid release' >&2; exit 2; }
 case "$op" in
     migrate) args=(migrate --noinput) ;;
+    related) args=(rebuild_related_posts --if-missing) ;;
     check) args=(check --deploy) ;;
     collectstatic) args=(collectstatic --noinput) ;;
 esac
@@ -60,3 +60,7 @@ atomic_current "$release"
 published=1
 if [[ ${SKIP_READINESS:-0} != 1 ]]; then readiness_check; fi
 trap - EXIT
+if [[ -n ${WARM_CACHES_HOST:-} ]]; then
+    (cd "$release" && .venv/bin/python manage.py warm_caches --base-url "${WARM_CACHES_URL:-http://127.0.0.1:8036}" --host "$WARM_CACHES_HOST") \
+        || echo "cache warm-up failed; the release stays live" >&2
+fi
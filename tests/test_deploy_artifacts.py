@@ -542,3 +542,16 @@ def test_backup_service_has_one_orchestrator_and_timer_never_runs_restore():
     assert exec_starts == ["ExecStart=/srv/django-6-blog/current/scripts/backup/run-backup.sh"]
     assert "[Timer]" in timer and "Unit=" not in timer
     assert "restore" not in timer.lower()
+
+
+def test_related_posts_timer_runs_only_the_pending_worker():
+    service = (ROOT / "deploy/systemd/django-6-blog-related-posts.service").read_text(encoding="utf-8")
+    timer = (ROOT / "deploy/systemd/django-6-blog-related-posts.timer").read_text(encoding="utf-8")
+    exec_starts = [line for line in service.splitlines() if line.startswith("ExecStart=")]
+    assert exec_starts == [
+        "ExecStart=/srv/django-6-blog/current/.venv/bin/python manage.py rebuild_related_posts --pending"
+    ]
+    assert "EnvironmentFile=/etc/django-6-blog/" in service and "User=django-blog" in service
+    assert "[Timer]" in timer and "Unit=" not in timer
+    for example in (".env.production.example", "deploy/systemd/django-6-blog.env.example"):
+        assert "RELATED_POSTS_DEFERRED=true" in (ROOT / example).read_text(encoding="utf-8")
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import importlib.util
 import os
 import subprocess
 import sys
@@ -64,6 +65,10 @@ def run_settings(overrides=None, remove=()):
         ({}, ("DATABASE_URL",)),
         ({}, ("DJANGO_MEDIA_STORAGE",)),
         ({}, ("MEDIA_S3_BUCKET_NAME",)),
+        ({"DJANGO_CACHE_BACKEND": "locmem"}, ()),
+        ({"DJANGO_CACHE_BACKEND": "dummy"}, ()),
+        ({"DJANGO_CACHE_LOCATION": "relative/cache"}, ()),
+        ({"DJANGO_CACHE_BACKEND": "memcached"}, ()),
     ],
 )
 def test_production_settings_fail_closed(overrides, remove):
@@ -136,6 +141,36 @@ print(json.dumps({
     assert "statement_timeout=2000" in result.stdout
 
 
+def test_production_cache_is_shared_between_workers():
+    script = """
+from config import settings_production as s
+cache = s.CACHES['default']
+assert cache['BACKEND'].endswith('FileBasedCache'), cache
+assert cache['LOCATION'] == '/var/cache/django-6-blog', cache
+"""
+    env = os.environ.copy()
+    env.update(BASE_ENV)
+    result = subprocess.run(
+        [sys.executable, "-c", script], env=env, text=True, capture_output=True, timeout=10
+    )
+    assert result.returncode == 0, result.stderr
+
+
+
+@pytest.mark.parametrize(
+    ("backend", "module", "location"),
+    [("memcached", "pymemcache", "unix:/run/memcached/memcached.sock"), ("redis", "redis", "redis://127.0.0.1:6379/1")],
+)
+def test_network_cache_backends_require_their_client_library(backend, module, location):
+    result = run_settings({"DJANGO_CACHE_BACKEND": backend, "DJANGO_CACHE_LOCATION": location})
+
+    if importlib.util.find_spec(module) is None:
+        assert result.returncode != 0
+        assert f"DJANGO_CACHE_BACKEND={backend} needs the '{module}' package" in result.stderr
+    else:
+        assert result.returncode == 0, result.stderr
+
+
 def test_local_settings_keep_sqlite_defaults():
     script = """
 import json
@@ -143,6 +178,7 @@ from config import settings as s
 print(json.dumps({
     'engine': s.DATABASES['default']['ENGINE'],
     'storage': s.STORAGES['default']['BACKEND'],
+    'cache': s.CACHES['default']['BACKEND'],
 }))
 """
     env = os.environ.copy()
@@ -155,3 +191,4 @@ print(json.dumps({
     assert result.returncode == 0, result.stderr
     assert "django.db.backends.sqlite3" in result.stdout
     assert "django.core.files.storage.FileSystemStorage" in result.stdout
+    assert "LocMemCache" in result.stdout
@@ -41,6 +41,7 @@ def test_checkout_adapter_is_fixed_origin_exact_sha_boundary():
     assert "EnvironmentFile=$env_file" in text
     assert "manage.py check --deploy" in text
     assert "manage.py migrate --noinput" in text
+    assert "manage.py rebuild_related_posts --if-missing" in text
     assert "manage.py collectstatic --noinput" in text
     assert "/api/v1/health/ready/" in text
     assert "--resolve exception-blog.ru:443:127.0.0.1" in text
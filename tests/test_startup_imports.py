@@ -0,0 +1,105 @@
+"""Startup import budget: what every manage.py run and worker boot pays."""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)$")
+# Loaded only when Markdown is rendered or an image is decoded.
+LAZY_MODULES = {
+    "PIL.Image",
+    "markdown",
+    "pymdownx",
+    "bs4",
+    "pygments",
+    "blog.services.markdown_converter",
+    "blog.content_import.media_bundle",
+}
+# Sum of self import times; about half of it is used today. Override on slow runners.
+IMPORT_BUDGET_MS = float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+
+def importtime(*args: str) -> dict[str, int]:
+    env = {
+        name: value
+        for name, value in os.environ.items()
+        if not name.startswith(("DJANGO_", "DATABASE_", "MEDIA_"))
+    }
+    env["DJANGO_SETTINGS_MODULE"] = "config.settings"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env=env,
+        text=True,
+        capture_output=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return {
+        match.group(2): int(match.group(1))
+        for line in result.stderr.splitlines()
+        if (match := LINE_RE.match(line))
+    }
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ("-c", "import django; django.setup()"),
+        ("manage.py", "help", "publish_scheduled"),
+        ("manage.py", "help", "cleanup_publish_packages"),
+    ],
+    ids=["setup", "publish_scheduled", "cleanup_publish_packages"],
+)
+def test_startup_does_not_load_rendering_stack(args):
+    modules = importtime(*args)
+
+    # ``blog.models`` itself is loaded by ``import_module``, which importtime
+    # does not report; its own imports show that it ran.
+    assert "blog.thumbnails" in modules
+    assert LAZY_MODULES.isdisjoint(modules), sorted(LAZY_MODULES & modules.keys())
+
+
+def test_startup_import_time_stays_within_budget():
+    # Best of three fresh interpreters, so one slow disk read does not fail CI.
+    total_ms = min(sum(importtime("-c", "import django; django.setup()").values()) / 1000 for _ in range(3))
+
+    assert total_ms < IMPORT_BUDGET_MS, f"startup imports took {total_ms:.0f} ms"
+
+
+def test_lazy_boundaries_still_render():
+    script = """
+import django
+django.setup()
+import sys
+from blog.content_import import collect_note_media_bundle, split_frontmatter
+from blog.services import convert_markdown_to_html
+assert "markdown" not in sys.modules
+assert "<strong>" in convert_markdown_to_html("**bold**")
+assert "markdown" in sys.modules and "bs4" in sys.modules
+from blog.thumbnails import render_thumbnails
+from io import BytesIO
+from PIL import Image
+buffer = BytesIO()
+Image.new("RGB", (800, 600), "red").save(buffer, format="JPEG")
+assert set(render_thumbnails(buffer.getvalue())) == {"thumbnail_og", "thumbnail_card"}
+print(split_frontmatter("---\\ntitle: x\\n---\\nbody")[1].strip(), callable(collect_note_media_bundle))
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "config.settings"},
+        text=True,
+        capture_output=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.split() == ["body", "True"]